@@ -7,6 +7,7 @@ Endpoints for:
 - Fetching design history
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from datetime import datetime, timedelta
 import uuid
@@ -396,6 +397,65 @@ async def generate_design(
         )
 
 
+@router.post("/generate/stream")
+async def generate_design_stream(
+    request: DesignGenerateRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream AI interior design variations as they are generated.
+    
+    - Uses the Hugging Face FLUX engine
+    - Emits newline-delimited JSON, one {"index", "mime", "image"} object per
+      variation, where image is the base64 payload
+    - Ends with an {"error"} object if generation fails or yields nothing
+    - Applies the same rate limiting as /generate (5 per minute per user)
+    - Does not save a design record; clients persist via /generate
+    """
+    user_id = current_user.get('uid') or current_user.get('localId')
+    
+    if not check_rate_limit(user_id, limit=5, window_minutes=1):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded: Maximum 5 design generations per minute"
+        )
+    
+    settings = get_settings()
+    engine = EngineFactory.create_engine(EngineType.HUGGINGFACE, {'hf_token': settings.HF_TOKEN})
+    if not engine.aclient:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hugging Face inference client not available"
+        )
+    
+    # FLUX generates from the prompt alone, so no room images are downloaded
+    gen_request = GenerationRequest(
+        primary_image=b"",
+        room_images={},
+        room_type=request.room_type or "living",
+        furniture_style=request.style.lower(),
+        wall_color=request.wall_color.lower(),
+        flooring_material=request.flooring_material.lower()
+    )
+    
+    async def ndjson_lines():
+        # The response status is already sent, so failures are reported in-band
+        streamed = 0
+        try:
+            async for index, mime_type, image in engine.generate_img2img_stream(gen_request):
+                streamed += 1
+                yield json.dumps({"index": index, "mime": mime_type, "image": image}) + "\n"
+        except Exception as e:
+            logger.error("Streaming design generation failed: %s", e)
+            yield json.dumps({"error": f"Generation failed: {e}"}) + "\n"
+            return
+        if not streamed:
+            yield json.dumps({"error": "No designs generated"}) + "\n"
+    
+    logger.info("Streaming design generation for user %s, style %s", user_id, request.style)
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @router.post("/{design_id}/regenerate", response_model=DesignResponse)
 async def regenerate_design(
     design_id: str,
@@ -15,11 +15,36 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
+import hashlib
 import logging
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+def content_hash(data: bytes) -> bytes:
+    """
+    Compute a 128-bit content digest used as a cache key.
+    
+    Uses xxh3_128 when xxhash is installed (not cryptographic, but much
+    faster on multi-megabyte images) and falls back to blake2b.
+    
+    Args:
+        data: Bytes to hash (typically request.primary_image)
+        
+    Returns:
+        16-byte digest
+    """
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128(data).digest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
 class EngineType(Enum):
     """Supported AI engine types."""
     LOCAL_SDXL = "local_sdxl"
@@ -50,7 +75,7 @@ class GenerationRequest:
     seeds: Optional[List[int]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationResult:
     """Result of image-to-image generation."""
     success: bool
@@ -61,6 +86,8 @@ class GenerationResult:
     generation_params: Optional[Dict[str, Any]] = None
     seeds_used: Optional[List[int]] = None
     inference_time_seconds: Optional[float] = None
+    mime_type: Optional[str] = None  # Set when generated_images hold raw payloads, not URLs
+    encoding: Optional[str] = None  # e.g. "base64"
 
 
 class BaseEngine(ABC):
@@ -71,6 +98,9 @@ class BaseEngine(ABC):
     across different providers (local, Replicate, HF).
     """
     
+    # Subclasses that declare their own __slots__ get no per-instance dict
+    __slots__ = ('config', 'engine_type', 'logger')
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize the engine with configuration.
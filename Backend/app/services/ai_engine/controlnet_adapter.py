@@ -15,11 +15,47 @@ import cv2
 import numpy as np
 from PIL import Image
 from typing import Tuple, Optional, Dict, Any
+from collections import OrderedDict
 import logging
+import threading
+import time
 import io
 
+from .base_engine import content_hash
+
 logger = logging.getLogger(__name__)
 
+# Edge maps are cached process-wide (adapters are created per engine) so
+# repeat edits of the same uploaded room skip the CPU-bound preprocessing
+EDGE_CACHE_MAXSIZE = 512
+EDGE_CACHE_TTL_SECONDS = 600
+
+_edge_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, bytes]]" = OrderedDict()
+_edge_cache_lock = threading.Lock()
+
+
+def _edge_cache_get(key: Tuple[Any, ...]) -> Optional[bytes]:
+    """Return a cached edge map if present and not expired."""
+    with _edge_cache_lock:
+        entry = _edge_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, edge_bytes = entry
+        if time.monotonic() - stored_at > EDGE_CACHE_TTL_SECONDS:
+            del _edge_cache[key]
+            return None
+        _edge_cache.move_to_end(key)
+        return edge_bytes
+
+
+def _edge_cache_put(key: Tuple[Any, ...], edge_bytes: bytes) -> None:
+    """Store an edge map, evicting the least recently used entries."""
+    with _edge_cache_lock:
+        _edge_cache[key] = (time.monotonic(), edge_bytes)
+        _edge_cache.move_to_end(key)
+        while len(_edge_cache) > EDGE_CACHE_MAXSIZE:
+            _edge_cache.popitem(last=False)
+
 
 class ControlNetAdapter:
     """
@@ -91,6 +127,10 @@ class ControlNetAdapter:
         height, width = image.shape[:2]
         target_width, target_height = target_resolution
         
+        # Already at the target size - nothing to resize
+        if (width, height) == (target_width, target_height):
+            return image
+        
         # Calculate aspect ratio
         aspect_ratio = width / height
         target_aspect_ratio = target_width / target_height
@@ -204,7 +244,8 @@ class ControlNetAdapter:
         self, 
         image_bytes: bytes,
         target_resolution: Optional[Tuple[int, int]] = None,
-        edge_method: Optional[str] = None
+        edge_method: Optional[str] = None,
+        image_hash: Optional[bytes] = None
     ) -> bytes:
         """
         Preprocess image for ControlNet conditioning.
@@ -213,10 +254,25 @@ class ControlNetAdapter:
             image_bytes: Input image as bytes
             target_resolution: Target resolution for processing
             edge_method: Edge detection method
+            image_hash: Precomputed content_hash(image_bytes), if available
             
         Returns:
             Processed edge map as bytes
         """
+        method = edge_method or self.edge_detection_method
+        cache_key = (
+            image_hash or content_hash(image_bytes),
+            tuple(target_resolution) if target_resolution else None,
+            method,
+            self.canny_low_threshold,
+            self.canny_high_threshold
+        )
+        
+        edge_bytes = _edge_cache_get(cache_key)
+        if edge_bytes is not None:
+            logger.debug("ControlNet edge map cache hit")
+            return edge_bytes
+        
         try:
             # Preprocess image
             image = self.preprocess_image(image_bytes)
@@ -226,7 +282,7 @@ class ControlNetAdapter:
                 image = self.normalize_resolution(image, target_resolution)
             
             # Detect edges
-            edges = self.detect_edges(image, edge_method)
+            edges = self.detect_edges(image, method)
             
             # Convert back to PIL Image
             edge_image = Image.fromarray(edges, mode='L')
@@ -237,11 +293,13 @@ class ControlNetAdapter:
             edge_bytes = buffer.getvalue()
             
             logger.debug(f"Generated ControlNet edge map: {edges.shape}")
-            return edge_bytes
             
         except Exception as e:
             logger.error(f"Error preprocessing for ControlNet: {e}")
             raise ValueError(f"Failed to preprocess for ControlNet: {e}")
+        
+        _edge_cache_put(cache_key, edge_bytes)
+        return edge_bytes
     
     def get_controlnet_config(self, weight: float = 1.0) -> Dict[str, Any]:
         """
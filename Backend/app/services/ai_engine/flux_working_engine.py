@@ -192,13 +192,14 @@ class FluxWorkingEngine(BaseEngine):
             
             # Generate 3 Vastu-aligned variations with different prompts
             generated_images = []
+            variation_prompts = self.prompt_builder.build_variations(request)
             
             for i in range(3):
                 variation = i + 1
                 print(f"  Generating Vastu variation {variation}...")
                 
                 # Build variation-specific prompt
-                variation_prompt = self._build_prompt(request, variation)
+                variation_prompt = variation_prompts[i]
                 print(f"    Prompt {variation}: {variation_prompt[:80]}...")
                 
                 try:
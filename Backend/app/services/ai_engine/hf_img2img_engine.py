@@ -12,21 +12,125 @@ Features:
 - Production-ready error handling
 """
 
-import aiohttp
+import asyncio
+import hashlib
+import httpx
 import json
 import time
 import io
+import weakref
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 import logging
 from PIL import Image
 import base64
+import binascii
 
-from .base_engine import BaseEngine, GenerationRequest, GenerationResult, EngineType
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+from .base_engine import BaseEngine, GenerationRequest, GenerationResult, EngineType, content_hash
 from .prompt_builder import PromptBuilder, StyleParameters
 from .controlnet_adapter import ControlNetAdapter
+from app.services.storage import get_storage_service
 
 logger = logging.getLogger(__name__)
 
+# Largest seed value accepted by the HF diffusion backends (uint32)
+MAX_SEED = 2**32 - 1
+
+# Request limits the HF backends reject with a 400 - checked locally so we
+# never queue a call that cannot succeed
+MAX_OUTPUT_PIXELS = 1024 * 1024
+MAX_INFERENCE_STEPS = 50
+MAX_PRIMARY_IMAGE_BYTES = 8_000_000
+
+# Negative cache: identical requests rejected this many times with a
+# non-retryable error inside the window are refused without calling HF
+REJECTION_THRESHOLD = 3
+REJECTION_WINDOW_SECONDS = 60
+REJECTION_CACHE_MAXSIZE = 256
+
+_rejections: "OrderedDict[bytes, List[float]]" = OrderedDict()
+
+
+class HFAPIError(Exception):
+    """Raised when the HF API answers with a non-200 status."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HF API error {status}: {message}")
+        self.status = status
+    
+    @property
+    def retryable(self) -> bool:
+        """Client errors (other than rate limiting) will fail again on retry."""
+        return not (400 <= self.status < 500 and self.status != 429)
+
+
+def _recent_rejections(key: bytes) -> List[float]:
+    """Return rejection timestamps for a request key within the window."""
+    cutoff = time.monotonic() - REJECTION_WINDOW_SECONDS
+    timestamps = [t for t in _rejections.get(key, []) if t > cutoff]
+    if timestamps:
+        _rejections[key] = timestamps
+    else:
+        _rejections.pop(key, None)
+    return timestamps
+
+
+def _record_rejection(key: bytes) -> None:
+    """Record a non-retryable rejection for a request key."""
+    timestamps = _recent_rejections(key)
+    timestamps.append(time.monotonic())
+    _rejections[key] = timestamps
+    _rejections.move_to_end(key)
+    while len(_rejections) > REJECTION_CACHE_MAXSIZE:
+        _rejections.popitem(last=False)
+
+# Process-wide HTTP/2 clients so concurrent variations (and engines that are
+# re-created per request) multiplex over one pooled connection per host. A
+# client belongs to the event loop it was first used on, so one is kept per
+# running loop (and dropped with it); timeouts are passed per request
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP/2 client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _http_clients[loop] = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's shared HTTP client (call on application shutdown)."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class HFEngine(BaseEngine):
     """
@@ -84,30 +188,21 @@ class HFEngine(BaseEngine):
         self.prompt_builder = PromptBuilder()
         self.controlnet_adapter = ControlNetAdapter(config)
         
-        # HTTP session
-        self.session = None
+        # Request headers (the HTTP client itself is shared process-wide)
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
         
-        self.logger.info(f"Initialized HFEngine with endpoint: {self.endpoint_url}")
+        self.logger.info("Initialized HFEngine with endpoint: %s", self.endpoint_url)
     
     def _get_engine_type(self) -> EngineType:
         """Return the engine type."""
         return EngineType.HF_INFERENCE
     
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
-        if self.session is None or self.session.closed:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self.session = aiohttp.ClientSession(headers=headers, timeout=timeout)
-        return self.session
-    
-    async def _close_session(self):
-        """Close HTTP session."""
-        if self.session and not self.session.closed:
-            await self.session.close()
+    async def _get_session(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client."""
+        return _get_http_client()
     
     def _encode_image_to_base64(self, image_bytes: bytes) -> str:
         """
@@ -119,12 +214,33 @@ class HFEngine(BaseEngine):
         Returns:
             Base64 encoded string
         """
-        return base64.b64encode(image_bytes).decode('utf-8')
+        return base64.b64encode(image_bytes).decode('ascii')
+    
+    def _serialize_payload(
+        self,
+        inputs: Dict[str, Any],
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> bytes:
+        """
+        Serialize an HF API payload to a compact JSON body.
+        
+        Args:
+            inputs: Model inputs
+            parameters: Generation parameters
+            
+        Returns:
+            UTF-8 encoded JSON body
+        """
+        payload = {"inputs": inputs}
+        if parameters:
+            payload["parameters"] = parameters
+        return _json_dumps(payload)
     
     async def _call_inference_api(
         self, 
         inputs: Dict[str, Any],
-        parameters: Optional[Dict[str, Any]] = None
+        parameters: Optional[Dict[str, Any]] = None,
+        body: Optional[bytes] = None
     ) -> Dict[str, Any]:
         """
         Call HF Inference API.
@@ -132,32 +248,31 @@ class HFEngine(BaseEngine):
         Args:
             inputs: Model inputs
             parameters: Generation parameters
+            body: Pre-serialized JSON body (reused across retries)
             
         Returns:
             API response
         """
         session = await self._get_session()
         
-        payload = {
-            "inputs": inputs
-        }
-        
-        if parameters:
-            payload["parameters"] = parameters
+        if body is None:
+            body = self._serialize_payload(inputs, parameters)
         
-        async with session.post(self.endpoint_url, json=payload) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                error_text = await response.text()
-                raise Exception(f"HF API error {response.status}: {error_text}")
+        response = await session.post(
+            self.endpoint_url, content=body, headers=self._headers, timeout=self.timeout
+        )
+        if response.status_code == 200:
+            return _json_loads(response.content)
+        else:
+            raise HFAPIError(response.status_code, response.text)
     
     async def _call_task_specific_api(
         self,
         task: str,
         model: str,
         inputs: Dict[str, Any],
-        parameters: Optional[Dict[str, Any]] = None
+        parameters: Optional[Dict[str, Any]] = None,
+        body: Optional[bytes] = None
     ) -> List[Any]:
         """
         Call task-specific HF API.
@@ -167,6 +282,7 @@ class HFEngine(BaseEngine):
             model: Model name
             inputs: Model inputs
             parameters: Generation parameters
+            body: Pre-serialized JSON body (reused across retries)
             
         Returns:
             List of generated images
@@ -175,35 +291,55 @@ class HFEngine(BaseEngine):
         
         url = f"https://api-inference.huggingface.co/models/{model}"
         
-        payload = {"inputs": inputs}
-        if parameters:
-            payload["parameters"] = parameters
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        if body is None:
+            body = self._serialize_payload(inputs, parameters)
         
-        async with session.post(url, json=payload, headers=headers) as response:
-            if response.status == 200:
-                # Handle different response formats
-                content_type = response.headers.get('content-type', '')
-                
-                if 'application/json' in content_type:
-                    data = await response.json()
-                    if isinstance(data, list):
-                        return data
-                    elif isinstance(data, dict) and 'generated_images' in data:
-                        return data['generated_images']
-                    else:
-                        return [data]
+        response = await session.post(url, content=body, headers=self._headers, timeout=self.timeout)
+        if response.status_code == 200:
+            # Handle different response formats
+            content_type = response.headers.get('content-type', '')
+            
+            if 'application/json' in content_type:
+                data = _json_loads(response.content)
+                if isinstance(data, list):
+                    return data
+                elif isinstance(data, dict) and 'generated_images' in data:
+                    return data['generated_images']
                 else:
-                    # Binary image response
-                    image_data = await response.read()
-                    return [image_data]
+                    return [data]
             else:
-                error_text = await response.text()
-                raise Exception(f"HF API error {response.status}: {error_text}")
+                # Binary image response
+                return [response.content]
+        else:
+            raise HFAPIError(response.status_code, response.text)
+    
+    def _check_api_limits(self, request: GenerationRequest) -> Optional[str]:
+        """
+        Check parameter combinations the HF API is known to reject.
+        
+        Args:
+            request: Generation request to check
+            
+        Returns:
+            Error message, or None if the request can be dispatched
+        """
+        width, height = request.resolution
+        if width * height > MAX_OUTPUT_PIXELS:
+            return f"Resolution {width}x{height} exceeds {MAX_OUTPUT_PIXELS} pixels"
+        
+        if not 1 <= request.num_inference_steps <= MAX_INFERENCE_STEPS:
+            return f"Inference steps must be between 1 and {MAX_INFERENCE_STEPS} for HF Inference"
+        
+        if not 0 < request.image_strength <= 1:
+            return "Image strength must be in (0, 1]"
+        
+        if not 0 < request.controlnet_weight <= 2:
+            return "ControlNet weight must be in (0, 2]"
+        
+        if len(request.primary_image) > MAX_PRIMARY_IMAGE_BYTES:
+            return f"Primary image exceeds {MAX_PRIMARY_IMAGE_BYTES} bytes"
+        
+        return None
     
     async def generate_img2img(self, request: GenerationRequest) -> GenerationResult:
         """
@@ -223,10 +359,23 @@ class HFEngine(BaseEngine):
             if not is_valid:
                 return GenerationResult(
                     success=False,
+                    generated_images=[],
                     error_message=error_msg,
                     engine_used=self.engine_type.value
                 )
             
+            limit_error = self._check_api_limits(request)
+            if limit_error:
+                return GenerationResult(
+                    success=False,
+                    generated_images=[],
+                    error_message=limit_error,
+                    engine_used=self.engine_type.value
+                )
+            
+            # Hash the input image once; every cache below keys on this digest
+            img_hash = content_hash(request.primary_image)
+            
             # Prepare style parameters
             style_params = StyleParameters(
                 room_type=request.room_type,
@@ -245,18 +394,13 @@ class HFEngine(BaseEngine):
             else:
                 seeds = request.seeds[:3]
             
-            # Preprocess images
-            primary_image_b64 = self._encode_image_to_base64(request.primary_image)
-            
-            # Generate ControlNet conditioning
-            controlnet_image_bytes = self.controlnet_adapter.preprocess_for_controlnet(
-                request.primary_image,
-                target_resolution=request.resolution
-            )
-            controlnet_image_b64 = self._encode_image_to_base64(controlnet_image_bytes)
-            
-            # Generate images
-            generated_images = []
+            if any(seed < 0 or seed > MAX_SEED for seed in seeds):
+                return GenerationResult(
+                    success=False,
+                    generated_images=[],
+                    error_message=f"Seeds must be between 0 and {MAX_SEED}",
+                    engine_used=self.engine_type.value
+                )
             
             # Prepare parameters for HF API
             parameters = {
@@ -268,94 +412,75 @@ class HFEngine(BaseEngine):
                 'controlnet_conditioning_scale': request.controlnet_weight
             }
             
-            for i, seed in enumerate(seeds):
-                try:
-                    # Add seed to parameters
-                    params_with_seed = parameters.copy()
-                    params_with_seed['seed'] = seed
-                    
-                    self.logger.info(f"Generating variation {i+1} with seed {seed}")
-                    
-                    # Prepare inputs for HF API
-                    inputs = {
-                        'prompt': positive_prompt,
-                        'negative_prompt': negative_prompt,
-                        'image': primary_image_b64,
-                        'control_image': controlnet_image_b64
-                    }
-                    
-                    # Call HF API with retry logic
-                    result = None
-                    for attempt in range(self.max_retries + 1):
-                        try:
-                            if self.endpoint_url:
-                                # Custom endpoint
-                                result = await self._call_inference_api(inputs, params_with_seed)
-                            else:
-                                # Task-specific API
-                                result = await self._call_task_specific_api(
-                                    'image-to-image',
-                                    self.model_name,
-                                    inputs,
-                                    params_with_seed
-                                )
-                            break
-                        except Exception as e:
-                            if attempt == self.max_retries:
-                                raise
-                            self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                            await asyncio.sleep(self.retry_delay * (attempt + 1))
-                    
-                    # Process generated image
-                    if result:
-                        if isinstance(result, list) and len(result) > 0:
-                            generated_data = result[0]
-                            
-                            if isinstance(generated_data, str):
-                                # Base64 encoded image
-                                image_bytes = base64.b64decode(generated_data)
-                            elif isinstance(generated_data, bytes):
-                                # Raw image bytes
-                                image_bytes = generated_data
-                            elif isinstance(generated_data, dict) and 'image' in generated_data:
-                                # Structured response
-                                image_data = generated_data['image']
-                                if isinstance(image_data, str):
-                                    image_bytes = base64.b64decode(image_data)
-                                else:
-                                    image_bytes = image_data
-                            else:
-                                raise Exception("Unexpected output format from HF API")
-                            
-                            # Upload to storage
-                            from app.services.storage import get_storage_service
-                            storage_service = get_storage_service()
-                            
-                            image_url = storage_service.upload_image(
-                                file_content=image_bytes,
-                                content_type="image/jpeg",
-                                folder="generated/designs"
-                            )
-                            
-                            generated_images.append(image_url)
-                            self.logger.info(f"Generated variation {i+1}: {image_url}")
-                        else:
-                            raise Exception("No output in API response")
-                    else:
-                        raise Exception("Empty result from HF API")
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to generate variation {i+1}: {e}")
-                    # Continue with other variations
+            # Refuse requests HF has repeatedly rejected as invalid
+            request_key = img_hash + hashlib.blake2b(
+                _json_dumps([positive_prompt, negative_prompt, parameters]),
+                digest_size=16
+            ).digest()
+            
+            if len(_recent_rejections(request_key)) >= REJECTION_THRESHOLD:
+                return GenerationResult(
+                    success=False,
+                    generated_images=[],
+                    error_message="Request was repeatedly rejected by HF API; not retrying",
+                    engine_used=self.engine_type.value
+                )
+            
+            # Preprocess images
+            primary_image_b64 = self._encode_image_to_base64(request.primary_image)
+            
+            # Generate ControlNet conditioning
+            controlnet_image_bytes = self.controlnet_adapter.preprocess_for_controlnet(
+                request.primary_image,
+                target_resolution=request.resolution,
+                image_hash=img_hash
+            )
+            controlnet_image_b64 = self._encode_image_to_base64(controlnet_image_bytes)
+            
+            # Prepare inputs for HF API (identical for every seed)
+            inputs = {
+                'prompt': positive_prompt,
+                'negative_prompt': negative_prompt,
+                'image': primary_image_b64,
+                'control_image': controlnet_image_b64
+            }
+            
+            # Identical seeds produce identical images, so only dispatch
+            # each distinct seed once and fan the results back out below
+            unique_seeds = list(dict.fromkeys(seeds))
+            
+            results = await asyncio.gather(
+                *(
+                    self._generate_variation(i, seed, inputs, parameters)
+                    for i, seed in enumerate(unique_seeds)
+                ),
+                return_exceptions=True
+            )
+            
+            urls_by_seed = {}
+            rejected = False
+            for i, (seed, result) in enumerate(zip(unique_seeds, results)):
+                if isinstance(result, Exception):
+                    self.logger.error("Failed to generate variation %d: %s", i + 1, result)
+                    if isinstance(result, HFAPIError) and not result.retryable:
+                        rejected = True
                     continue
+                urls_by_seed[seed] = result
+            
+            # One rejection per request, however many of its seeds failed, so
+            # only repeated requests reach REJECTION_THRESHOLD
+            if rejected:
+                _record_rejection(request_key)
+            
+            generated_images = [urls_by_seed[seed] for seed in seeds if seed in urls_by_seed]
             
             # Update performance metrics
             inference_time = time.time() - start_time
             self.generation_count += 1
-            self.total_api_calls += len(seeds)
+            self.total_api_calls += len(unique_seeds)
             
             if not generated_images:
-                self.failed_calls += len(seeds)
+                self.failed_calls += len(unique_seeds)
                 return GenerationResult(
                     success=False,
                     error_message="Failed to generate any images",
@@ -379,7 +504,7 @@ class HFEngine(BaseEngine):
             )
             
         except Exception as e:
-            self.logger.error(f"Generation failed: {e}")
+            self.logger.error("Generation failed: %s", e)
             self.failed_calls += 1
             return GenerationResult(
                 success=False,
@@ -387,8 +512,90 @@ class HFEngine(BaseEngine):
                 engine_used=self.engine_type.value,
                 inference_time_seconds=time.time() - start_time
             )
-        finally:
-            await self._close_session()
+    
+    async def _generate_variation(
+        self,
+        index: int,
+        seed: int,
+        inputs: Dict[str, Any],
+        parameters: Dict[str, Any]
+    ) -> str:
+        """
+        Generate and upload a single seeded variation.
+        
+        Args:
+            index: Zero-based variation index (for logging)
+            seed: Generation seed
+            inputs: Seed-independent model inputs
+            parameters: Seed-independent generation parameters
+            
+        Returns:
+            URL of the uploaded image
+        """
+        # Seed is fixed across retries, so build the payload once
+        params_with_seed = {**parameters, 'seed': seed}
+        body = self._serialize_payload(inputs, params_with_seed)
+        
+        self.logger.info("Generating variation %d with seed %s", index + 1, seed)
+        
+        # Call HF API with retry logic
+        result = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.endpoint_url:
+                    # Custom endpoint
+                    result = await self._call_inference_api(
+                        inputs, params_with_seed, body=body
+                    )
+                else:
+                    # Task-specific API
+                    result = await self._call_task_specific_api(
+                        'image-to-image',
+                        self.model_name,
+                        inputs,
+                        params_with_seed,
+                        body=body
+                    )
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                if isinstance(e, HFAPIError) and not e.retryable:
+                    raise
+                self.logger.warning("Attempt %d failed: %s", attempt + 1, e)
+                await asyncio.sleep(self.retry_delay * (attempt + 1))
+        
+        # Process generated image
+        if not result:
+            raise Exception("Empty result from HF API")
+        if not isinstance(result, list) or len(result) == 0:
+            raise Exception("No output in API response")
+        
+        generated_data = result[0]
+        
+        if isinstance(generated_data, dict) and 'image' in generated_data:
+            # Structured response
+            generated_data = generated_data['image']
+        
+        if isinstance(generated_data, str):
+            # Base64 encoded image; a2b_base64 skips b64decode's extra validation
+            image_bytes = binascii.a2b_base64(generated_data)
+        elif isinstance(generated_data, bytes):
+            # Raw image bytes
+            image_bytes = generated_data
+        else:
+            raise Exception("Unexpected output format from HF API")
+        
+        # Upload to storage
+        storage_service = get_storage_service()
+        image_url = storage_service.upload_image(
+            file_content=image_bytes,
+            content_type="image/jpeg",
+            folder="generated/designs"
+        )
+        
+        self.logger.info("Generated variation %d: %s", index + 1, image_url)
+        return image_url
     
     async def health_check(self) -> bool:
         """
@@ -402,19 +609,17 @@ class HFEngine(BaseEngine):
             
             if self.endpoint_url:
                 # Check custom endpoint
-                async with session.get(self.endpoint_url.replace("/infer", "/status")) as response:
-                    return response.status == 200
+                url = self.endpoint_url.replace("/infer", "/status")
             else:
                 # Check model availability
                 url = f"https://api-inference.huggingface.co/models/{self.model_name}"
-                async with session.get(url) as response:
-                    return response.status == 200
+            
+            response = await session.get(url, headers=self._headers, timeout=self.timeout)
+            return response.status_code == 200
                     
         except Exception as e:
-            self.logger.error(f"Health check failed: {e}")
+            self.logger.error("Health check failed: %s", e)
             return False
-        finally:
-            await self._close_session()
     
     def get_model_info(self) -> Dict[str, Any]:
         """
@@ -493,17 +698,15 @@ class HFEngine(BaseEngine):
             session = await self._get_session()
             
             url = f"https://api-inference.huggingface.co/models/{self.model_name}"
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    raise Exception(f"Failed to get model info: {response.status}")
+            response = await session.get(url, headers=self._headers, timeout=self.timeout)
+            if response.status_code == 200:
+                return _json_loads(response.content)
+            else:
+                raise Exception(f"Failed to get model info: {response.status_code}")
                     
         except Exception as e:
-            self.logger.error(f"Failed to get model info from API: {e}")
+            self.logger.error("Failed to get model info from API: %s", e)
             return {}
-        finally:
-            await self._close_session()
     
     def estimate_cost(self, num_generations: int) -> Dict[str, Any]:
         """
@@ -7,9 +7,23 @@ import os
 import time
 import base64
 import io
-from typing import List, Optional
+import asyncio
+import functools
+import hashlib
+import itertools
+import weakref
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, Tuple
 from PIL import Image
 
+try:
+    from huggingface_hub import AsyncInferenceClient, InferenceClient
+    HF_HUB_AVAILABLE = True
+except ImportError:
+    HF_HUB_AVAILABLE = False
+    AsyncInferenceClient = None
+    InferenceClient = None
+
 from app.services.ai_engine.base_engine import BaseEngine, GenerationRequest, GenerationResult
 from app.services.ai_engine.intent_prompt_builder import IntentBasedPromptBuilder
 import logging
@@ -17,6 +31,111 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+_ENGINE = "huggingface"
+
+# Variations generated per request; variation i uses seed BASE_SEED + i
+NUM_VARIATIONS = 3
+BASE_SEED = 42
+
+_PROMPT_BUILDER = IntentBasedPromptBuilder()
+
+# Process-wide count of successful generations; next() on itertools.count
+# is atomic under the GIL, unlike `+= 1` on a shared attribute.
+_generation_counter = itertools.count(1)
+
+
+def _fail(message: str) -> GenerationResult:
+    """Build a failed GenerationResult for this engine."""
+    return GenerationResult(
+        success=False,
+        generated_images=[],
+        error_message=message,
+        engine_used=_ENGINE
+    )
+
+
+# asyncio primitives belong to one event loop, so the shared semaphores are
+# kept per loop (and dropped with it) rather than per process
+_inflight_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _get_inflight_semaphore(limit: int) -> asyncio.Semaphore:
+    """Shared bound on in-flight provider calls across all engine instances on the running loop."""
+    semaphores = _inflight_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(limit)
+    if semaphore is None:
+        semaphore = semaphores[limit] = asyncio.Semaphore(limit)
+    return semaphore
+
+# A generated variation as (mime_type, base64 payload); clients build the
+# data URL themselves, so the multi-hundred-KB string is never re-copied
+EncodedImage = Tuple[str, str]
+
+# FLUX.1-schnell output is deterministic in (prompt, seed) for fixed
+# size/steps/guidance, so finished variations are reused across requests.
+IMAGE_CACHE_MAXSIZE = 64
+_img_cache: "OrderedDict[str, EncodedImage]" = OrderedDict()
+
+
+def _image_cache_key(model: str, prompt: str, seed: int) -> str:
+    """Content-address a variation by model, prompt, seed and fixed generation settings."""
+    return hashlib.blake2b(
+        f"{model}|{prompt}|{seed}|1024x1024|4|3.5".encode(),
+        digest_size=16
+    ).hexdigest()
+
+
+def _image_cache_get(key: str) -> Optional[EncodedImage]:
+    image = _img_cache.get(key)
+    if image is not None:
+        _img_cache.move_to_end(key)
+    return image
+
+
+def _image_cache_put(key: str, image: EncodedImage) -> None:
+    _img_cache[key] = image
+    _img_cache.move_to_end(key)
+    while len(_img_cache) > IMAGE_CACHE_MAXSIZE:
+        _img_cache.popitem(last=False)
+
+
+def _encode_jpeg(image: "Image.Image") -> EncodedImage:
+    """Encode a generated PIL image as base64 JPEG (runs in a worker thread)."""
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=85,
+               optimize=False, progressive=False, subsampling=2)
+    return "image/jpeg", base64.b64encode(buffered.getbuffer()).decode('ascii')
+
+
+@functools.lru_cache(maxsize=8)
+def _get_inference_client(model: str, token: Optional[str]) -> "InferenceClient":
+    """
+    Get a shared InferenceClient for a (model, token) pair.
+    
+    Engines are re-created per worker/request wiring; sharing the client
+    lets them reuse its HTTP session instead of reconnecting each time.
+    """
+    if not HF_HUB_AVAILABLE:
+        raise ImportError("huggingface_hub not installed. Install with: pip install huggingface_hub")
+    return InferenceClient(
+        model=model,
+        token=token,
+        provider="nscale"
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _get_async_inference_client(token: Optional[str]) -> "AsyncInferenceClient":
+    """Get a shared AsyncInferenceClient for concurrent variation calls."""
+    if not HF_HUB_AVAILABLE:
+        raise ImportError("huggingface_hub not installed. Install with: pip install huggingface_hub")
+    return AsyncInferenceClient(
+        provider="nscale",
+        api_key=token
+    )
+
+
 class HuggingFaceEngine(BaseEngine):
     """
     Hugging Face Inference Engine using new InferenceClient API.
@@ -27,114 +146,157 @@ class HuggingFaceEngine(BaseEngine):
         """Initialize Hugging Face engine."""
         self.api_token = config.get('hf_token') or os.getenv("HF_TOKEN")
         self.model_name = config.get('model', 'black-forest-labs/FLUX.1-schnell')
-        self.prompt_builder = IntentBasedPromptBuilder()
         self.generation_count = 0
         self.max_generations = 1000
+        self.max_concurrent = int(config.get('max_concurrent', 4))
+        # Return once this many variations are ready and cancel stragglers;
+        # defaults to every variation, so early exit is opt-in
+        self.min_variations = int(config.get('min_variations', NUM_VARIATIONS))
         
-        print(f"HuggingFaceEngine initialized with token: {bool(self.api_token)}")
-        print(f"Model: {self.model_name}")
+        logger.debug("HuggingFaceEngine initialized with token: %s", bool(self.api_token))
+        logger.debug("Model: %s", self.model_name)
         
         # Initialize InferenceClient
         try:
-            from huggingface_hub import InferenceClient
-            self.client = InferenceClient(
-                model=self.model_name,
-                token=self.api_token,
-                provider="nscale"
-            )
-            print(f"InferenceClient created successfully with nscale provider")
+            self.client = _get_inference_client(self.model_name, self.api_token)
+            self.aclient = _get_async_inference_client(self.api_token)
+            logger.debug("InferenceClient created successfully with nscale provider")
         except Exception as e:
-            print(f"Failed to create InferenceClient: {e}")
+            logger.warning("Failed to create InferenceClient: %s", e)
             self.client = None
+            self.aclient = None
     
     def _build_prompt(self, request: GenerationRequest, variation: int = 1) -> str:
         """Build interior design prompt using intent-based Vastu approach."""
-        return self.prompt_builder.build_intent_prompt(request, variation)
+        # The builder memoizes prompts by the request's selections
+        return _PROMPT_BUILDER.build_intent_prompt(request, variation)
     
     async def generate_img2img(self, request: GenerationRequest) -> GenerationResult:
         """Generate interior designs using Hugging Face FLUX API."""
         start_time = time.time()
         
         try:
-            if not self.client:
-                return GenerationResult(
-                    success=False,
-                    generated_images=[],
-                    error_message="InferenceClient not initialized",
-                    engine_used="huggingface"
-                )
+            if not self.aclient:
+                return _fail("InferenceClient not initialized")
             
-            # Build Vastu prompts and generate variations
-            print(f"Generating with FLUX.1-schnell using Vastu principles...")
-            generated_images = []
+            images = {}
+            async for index, mime_type, payload in self.generate_img2img_stream(request):
+                images[index] = (mime_type, payload)
             
-            for i in range(3):
-                variation = i + 1
-                print(f"  Generating Vastu variation {variation}...")
-                
-                # Build variation-specific Vastu prompt
-                variation_prompt = self._build_prompt(request, variation)
-                print(f"    Vastu prompt {variation}: {variation_prompt[:80]}...")
-                
-                try:
-                    # Use text_to_image for FLUX.1-schnell (synchronous call)
-                    image = self.client.text_to_image(
-                        variation_prompt,
-                        model=self.model_name,
-                        seed=42 + i,
-                        width=1024,
-                        height=1024,
-                        num_inference_steps=4,
-                        guidance_scale=3.5,
-                    )
-                    
-                    # Convert PIL Image to base64
-                    buffered = io.BytesIO()
-                    image.save(buffered, format="JPEG", quality=95)
-                    img_str = base64.b64encode(buffered.getvalue()).decode('utf-8')
-                    data_url = f"data:image/jpeg;base64,{img_str}"
-                    generated_images.append(data_url)
-                    print(f"  ✓ Vastu variation {variation} generated!")
-                    
-                except Exception as e:
-                    print(f"  ✗ Vastu variation {variation} failed: {e}")
-                    continue
-            
-            if not generated_images:
-                return GenerationResult(
-                    success=False,
-                    generated_images=[],
-                    error_message="No images generated from Hugging Face API",
-                    engine_used="huggingface"
-                )
+            if not images:
+                return _fail("No images generated from Hugging Face API")
             
+            order = sorted(images)
+            generated_images = [images[i][1] for i in order]
             inference_time = time.time() - start_time
             
             result = GenerationResult(
                 success=True,
                 generated_images=generated_images,
-                engine_used="huggingface",
+                engine_used=_ENGINE,
                 model_version="FLUX.1-schnell",
                 inference_time_seconds=inference_time,
-                seeds_used=[42, 43, 44]
+                seeds_used=[BASE_SEED + i for i in order],
+                mime_type=images[order[0]][0],
+                encoding="base64"
             )
             
-            self.generation_count += 1
-            print(f"✓ Generated {len(generated_images)} designs with FLUX.1-schnell in {inference_time:.1f}s")
+            self.generation_count = next(_generation_counter)
+            logger.info("Generated %d designs with FLUX.1-schnell in %.1fs", len(generated_images), inference_time)
             
             return result
             
         except Exception as e:
-            print(f"Hugging Face generation failed: {e}")
-            return GenerationResult(
-                success=False,
-                generated_images=[],
-                error_message=f"Hugging Face generation failed: {str(e)}",
-                engine_used="huggingface"
-            )
+            logger.error("Hugging Face generation failed: %s", e)
+            return _fail(f"Hugging Face generation failed: {str(e)}")
+    
+    async def generate_img2img_stream(self, request: GenerationRequest) -> AsyncIterator[Tuple[int, str, str]]:
+        """
+        Generate interior designs, yielding each variation as soon as it is ready.
+        
+        Args:
+            request: Generation request with room type, style, and materials
+            
+        Yields:
+            (index, mime_type, base64_payload) tuples, where index is the
+            0-based variation number; cached variations come first, the rest
+            in completion order
+        """
+        if not self.aclient:
+            raise RuntimeError("InferenceClient not initialized")
+        
+        # Build Vastu prompts and generate variations concurrently
+        logger.debug("Generating with FLUX.1-schnell using Vastu principles")
+        prompts = [self._build_prompt(request, i + 1) for i in range(NUM_VARIATIONS)]
+        if logger.isEnabledFor(logging.DEBUG):
+            for variation, variation_prompt in enumerate(prompts, start=1):
+                logger.debug("Vastu prompt %d: %s...", variation, variation_prompt[:80])
+        
+        seeds = [BASE_SEED + i for i in range(len(prompts))]
+        cache_keys = [_image_cache_key(self.model_name, p, seed) for p, seed in zip(prompts, seeds)]
+        cached = [_image_cache_get(key) for key in cache_keys]
+        misses = [i for i, image in enumerate(cached) if image is None]
+        
+        for i, image in enumerate(cached):
+            if image is not None:
+                yield (i, *image)
+        
+        async def generate_variation(i: int) -> Tuple[int, Optional[EncodedImage]]:
+            try:
+                async with _get_inflight_semaphore(self.max_concurrent):
+                    image = await self.aclient.text_to_image(
+                        prompts[i],
+                        model=self.model_name,
+                        seed=seeds[i],
+                        width=1024,
+                        height=1024,
+                        num_inference_steps=4,
+                        guidance_scale=3.5,
+                    )
+                # Encode off the event loop so it overlaps the other downloads;
+                # Pillow releases the GIL in its JPEG encoder
+                image = await asyncio.to_thread(_encode_jpeg, image)
+            except Exception as e:
+                logger.warning("Vastu variation %d failed: %s", i + 1, e)
+                return i, None
+            
+            cached[i] = image
+            _image_cache_put(cache_keys[i], image)
+            logger.debug("Vastu variation %d generated", i + 1)
+            return i, image
+        
+        if not misses:
+            return
+        
+        # Cached variations count towards min_variations, but the misses are
+        # still scheduled; stop as soon as a generated variation brings the
+        # total to min_variations rather than waiting on a stalled seed, and
+        # cancel the stragglers
+        ready = len(prompts) - len(misses)
+        
+        tasks = [asyncio.create_task(generate_variation(i)) for i in misses]
+        pending = set(misses)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                i, image = await next_done
+                pending.discard(i)
+                if image is None:
+                    continue
+                yield (i, *image)
+                ready += 1
+                if ready >= self.min_variations:
+                    break
+            
+            # Variations that finished alongside the last one are kept
+            for i in sorted(pending):
+                if cached[i] is not None:
+                    yield (i, *cached[i])
+        finally:
+            for task in tasks:
+                task.cancel()
     
     def _get_engine_type(self) -> str:
-        return "huggingface"
+        return _ENGINE
     
     def get_model_info(self) -> dict:
         return {
@@ -147,5 +309,7 @@ class HuggingFaceEngine(BaseEngine):
         }
     
     def health_check(self) -> bool:
-        return self.generation_count < self.max_generations and bool(self.api_token) and bool(self.client)
+        # Load is bounded by the in-flight semaphore, so the generation count is
+        # reported in get_model_info rather than failing the health check
+        return bool(self.api_token) and bool(self.client)
 
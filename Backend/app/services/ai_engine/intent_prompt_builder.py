@@ -9,10 +9,70 @@ Generates detailed, room-specific prompts that adapt based on:
 - VASTU-SPECIFIC PRINCIPLES for aligned designs
 """
 
-from typing import Dict, List, Optional
+import functools
+import io
+import sys
+from typing import Any, ClassVar, Dict, List, NamedTuple, Optional, Tuple
 from app.services.ai_engine.base_engine import GenerationRequest
 
 
+class RoomVastu(NamedTuple):
+    """Vastu guidelines for a room type."""
+    ideal: str
+    alternative: str
+    elements: Tuple[str, ...]
+    colors: Tuple[str, ...]
+    avoid: Tuple[str, ...]
+    principles: Tuple[str, ...]
+
+
+class DirectionVastu(NamedTuple):
+    """Element, energy and representations of a compass direction."""
+    element: str
+    energy: str
+    colors: Tuple[str, ...]
+    materials: Tuple[str, ...]
+    features: Tuple[str, ...]
+
+
+class ElementVastu(NamedTuple):
+    """Representations of a Vastu element."""
+    colors: Tuple[str, ...]
+    materials: Tuple[str, ...]
+    shapes: Tuple[str, ...]
+    features: Tuple[str, ...]
+
+
+class RoomIntent(NamedTuple):
+    """Functional intent of a room type."""
+    function: str
+    key_elements: Tuple[str, ...]
+    atmosphere: str
+    activities: str
+
+
+class StyleProfile(NamedTuple):
+    """Characteristics of a design style."""
+    philosophy: str
+    materials: Tuple[str, ...]
+    colors: Tuple[str, ...]
+    furniture: Tuple[str, ...]
+    lighting: Tuple[str, ...]
+    texture: Tuple[str, ...]
+
+
+class MaterialInfo(NamedTuple):
+    """Flooring material description."""
+    description: str
+    variants: Tuple[str, ...]
+    finish: str
+
+
+# (ideal_direction, direction_element, direction_energy, vastu_principles,
+#  head_fragments) shared by every variation of a room/style pair
+RoomStyleContext = Tuple[str, str, str, Tuple[str, ...], Tuple[str, ...]]
+
+
 class IntentBasedPromptBuilder:
     """
     Advanced prompt builder that creates highly specific, room-appropriate prompts
@@ -20,16 +80,16 @@ class IntentBasedPromptBuilder:
     """
     
     # VASTU-SPECIFIC PRINCIPLES FOR EACH DIRECTION AND ROOM TYPE
-    VASTU_PRINCIPLES = {
+    VASTU_PRINCIPLES: ClassVar[Dict[str, Dict[str, Any]]] = {
         # Room-specific Vastu guidelines
         'room_directions': {
-            'kitchen': {
-                'ideal': 'southeast',
-                'alternative': 'northwest',
-                'elements': ['fire', 'air'],
-                'colors': ['red', 'orange', 'yellow', 'pink'],
-                'avoid': ['northeast', 'southwest'],
-                'principles': [
+            'kitchen': RoomVastu(
+                ideal='southeast',
+                alternative='northwest',
+                elements=('fire', 'air'),
+                colors=('red', 'orange', 'yellow', 'pink'),
+                avoid=('northeast', 'southwest'),
+                principles=(
                     'Cooking platform facing east',
                     'Water sink in northeast corner',
                     'Storage in south or west walls',
@@ -37,15 +97,15 @@ class IntentBasedPromptBuilder:
                     'Windows and ventilation in east and north',
                     'Electrical appliances in southeast',
                     'Grains and food storage in southwest'
-                ]
-            },
-            'bedroom': {
-                'ideal': 'southwest',
-                'alternative': 'west',
-                'elements': ['earth', 'air'],
-                'colors': ['blue', 'green', 'light yellow', 'white'],
-                'avoid': ['northeast', 'southeast'],
-                'principles': [
+                )
+            ),
+            'bedroom': RoomVastu(
+                ideal='southwest',
+                alternative='west',
+                elements=('earth', 'air'),
+                colors=('blue', 'green', 'light yellow', 'white'),
+                avoid=('northeast', 'southeast'),
+                principles=(
                     'Bed placed in southwest corner',
                     'Head facing south or east',
                     'Wardrobe in southwest or west',
@@ -54,15 +114,15 @@ class IntentBasedPromptBuilder:
                     'Mirror on north or east wall',
                     'Avoid bed under beam',
                     'Keep northeast corner clean and empty'
-                ]
-            },
-            'living': {
-                'ideal': 'north',
-                'alternative': 'east',
-                'elements': ['air', 'water'],
-                'colors': ['green', 'blue', 'white', 'cream'],
-                'avoid': ['southwest'],
-                'principles': [
+                )
+            ),
+            'living': RoomVastu(
+                ideal='north',
+                alternative='east',
+                elements=('air', 'water'),
+                colors=('green', 'blue', 'white', 'cream'),
+                avoid=('southwest',),
+                principles=(
                     'Sitting arrangement facing north or east',
                     'Heavy furniture in south or west',
                     'Light furniture in north or east',
@@ -71,15 +131,15 @@ class IntentBasedPromptBuilder:
                     'Decorative items in northeast',
                     'Avoid clutter in northeast corner',
                     'Keep center space open'
-                ]
-            },
-            'dining': {
-                'ideal': 'west',
-                'alternative': 'east',
-                'elements': ['earth', 'fire'],
-                'colors': ['orange', 'yellow', 'cream', 'light brown'],
-                'avoid': ['southwest'],
-                'principles': [
+                )
+            ),
+            'dining': RoomVastu(
+                ideal='west',
+                alternative='east',
+                elements=('earth', 'fire'),
+                colors=('orange', 'yellow', 'cream', 'light brown'),
+                avoid=('southwest',),
+                principles=(
                     'Dining table in west or northwest',
                     'Facing east or north while eating',
                     'Kitchen access in southeast',
@@ -88,15 +148,15 @@ class IntentBasedPromptBuilder:
                     'Avoid dining table under beam',
                     'Keep space well-lit and ventilated',
                     'Display positive artwork'
-                ]
-            },
-            'bathroom': {
-                'ideal': 'northwest',
-                'alternative': 'southeast',
-                'elements': ['water', 'fire'],
-                'colors': ['white', 'light blue', 'cream', 'light gray'],
-                'avoid': ['northeast', 'southwest'],
-                'principles': [
+                )
+            ),
+            'bathroom': RoomVastu(
+                ideal='northwest',
+                alternative='southeast',
+                elements=('water', 'fire'),
+                colors=('white', 'light blue', 'cream', 'light gray'),
+                avoid=('northeast', 'southwest'),
+                principles=(
                     'Toilet in northwest or southeast',
                     'Bathroom fixtures in west or south',
                     'Mirror on north or east wall',
@@ -105,15 +165,15 @@ class IntentBasedPromptBuilder:
                     'Keep bathroom clean and dry',
                     'Avoid bathroom in center',
                     'Proper ventilation essential'
-                ]
-            },
-            'office': {
-                'ideal': 'north',
-                'alternative': 'east',
-                'elements': ['air', 'water'],
-                'colors': ['green', 'blue', 'white', 'light yellow'],
-                'avoid': ['southwest'],
-                'principles': [
+                )
+            ),
+            'office': RoomVastu(
+                ideal='north',
+                alternative='east',
+                elements=('air', 'water'),
+                colors=('green', 'blue', 'white', 'light yellow'),
+                avoid=('southwest',),
+                principles=(
                     'Desk facing north or east',
                     'Sitting with back to south or west',
                     'Storage in south or west',
@@ -122,222 +182,354 @@ class IntentBasedPromptBuilder:
                     'Books in southwest',
                     'Keep northeast corner clean',
                     'Avoid clutter under desk'
-                ]
-            }
+                )
+            )
         },
         # Direction-specific elements and energies
         'directions': {
-            'north': {
-                'element': 'water',
-                'energy': 'positive financial flow',
-                'colors': ['green', 'blue'],
-                'materials': ['wood', 'glass'],
-                'features': ['water features', 'plants', 'mirrors']
-            },
-            'south': {
-                'element': 'fire',
-                'energy': 'passion and recognition',
-                'colors': ['red', 'orange', 'yellow'],
-                'materials': ['wood', 'metal'],
-                'features': ['lighting', 'artwork', 'achievements']
-            },
-            'east': {
-                'element': 'air',
-                'energy': 'new beginnings and health',
-                'colors': ['green', 'white', 'cream'],
-                'materials': ['wood', 'natural materials'],
-                'features': ['windows', 'plants', 'natural light']
-            },
-            'west': {
-                'element': 'space',
-                'energy': 'creativity and children',
-                'colors': ['white', 'silver', 'light gray'],
-                'materials': ['metal', 'glass'],
-                'features': ['creative items', 'family photos', 'artwork']
-            },
-            'northeast': {
-                'element': 'water',
-                'energy': 'spiritual and meditation',
-                'colors': ['white', 'cream', 'light blue'],
-                'materials': ['crystal', 'stone'],
-                'features': ['meditation space', 'water features', 'spiritual items']
-            },
-            'northwest': {
-                'element': 'air',
-                'energy': 'social connections and travel',
-                'colors': ['white', 'light gray', 'silver'],
-                'materials': ['metal', 'glass'],
-                'features': ['guest seating', 'communication devices', 'travel items']
-            },
-            'southeast': {
-                'element': 'fire',
-                'energy': 'wealth and abundance',
-                'colors': ['green', 'red', 'orange'],
-                'materials': ['wood', 'natural materials'],
-                'features': ['money plants', 'wealth symbols', 'kitchen elements']
-            },
-            'southwest': {
-                'element': 'earth',
-                'energy': 'stability and relationships',
-                'colors': ['yellow', 'beige', 'brown'],
-                'materials': ['earth materials', 'heavy furniture'],
-                'features': ['heavy furniture', 'relationship symbols', 'stability items']
-            }
+            'north': DirectionVastu(
+                element='water',
+                energy='positive financial flow',
+                colors=('green', 'blue'),
+                materials=('wood', 'glass'),
+                features=('water features', 'plants', 'mirrors')
+            ),
+            'south': DirectionVastu(
+                element='fire',
+                energy='passion and recognition',
+                colors=('red', 'orange', 'yellow'),
+                materials=('wood', 'metal'),
+                features=('lighting', 'artwork', 'achievements')
+            ),
+            'east': DirectionVastu(
+                element='air',
+                energy='new beginnings and health',
+                colors=('green', 'white', 'cream'),
+                materials=('wood', 'natural materials'),
+                features=('windows', 'plants', 'natural light')
+            ),
+            'west': DirectionVastu(
+                element='space',
+                energy='creativity and children',
+                colors=('white', 'silver', 'light gray'),
+                materials=('metal', 'glass'),
+                features=('creative items', 'family photos', 'artwork')
+            ),
+            'northeast': DirectionVastu(
+                element='water',
+                energy='spiritual and meditation',
+                colors=('white', 'cream', 'light blue'),
+                materials=('crystal', 'stone'),
+                features=('meditation space', 'water features', 'spiritual items')
+            ),
+            'northwest': DirectionVastu(
+                element='air',
+                energy='social connections and travel',
+                colors=('white', 'light gray', 'silver'),
+                materials=('metal', 'glass'),
+                features=('guest seating', 'communication devices', 'travel items')
+            ),
+            'southeast': DirectionVastu(
+                element='fire',
+                energy='wealth and abundance',
+                colors=('green', 'red', 'orange'),
+                materials=('wood', 'natural materials'),
+                features=('money plants', 'wealth symbols', 'kitchen elements')
+            ),
+            'southwest': DirectionVastu(
+                element='earth',
+                energy='stability and relationships',
+                colors=('yellow', 'beige', 'brown'),
+                materials=('earth materials', 'heavy furniture'),
+                features=('heavy furniture', 'relationship symbols', 'stability items')
+            )
         },
         # Vastu elements and their representations
         'elements': {
-            'water': {
-                'colors': ['blue', 'black', 'white'],
-                'materials': ['glass', 'mirrors', 'fountains'],
-                'shapes': ['flowing', 'irregular'],
-                'features': ['water features', 'aquariums', 'fountains']
-            },
-            'fire': {
-                'colors': ['red', 'orange', 'yellow', 'pink'],
-                'materials': ['wood', 'metal', 'lighting'],
-                'shapes': ['triangular', 'pointed'],
-                'features': ['lighting', 'candles', 'fireplace', 'sunlight']
-            },
-            'earth': {
-                'colors': ['yellow', 'brown', 'beige', 'terracotta'],
-                'materials': ['stone', 'ceramic', 'earth materials'],
-                'shapes': ['square', 'stable'],
-                'features': ['ceramic items', 'stone decor', 'plants']
-            },
-            'air': {
-                'colors': ['green', 'white', 'light blue'],
-                'materials': ['wood', 'natural materials', 'fabrics'],
-                'shapes': ['rectangular', 'vertical'],
-                'features': ['plants', 'wind chimes', 'good ventilation', 'fabrics']
-            },
-            'space': {
-                'colors': ['white', 'cream', 'light gray', 'silver'],
-                'materials': ['metal', 'glass', 'minimal materials'],
-                'shapes': ['circular', 'open'],
-                'features': ['open space', 'minimal decor', 'sky views', 'light']
-            }
+            'water': ElementVastu(
+                colors=('blue', 'black', 'white'),
+                materials=('glass', 'mirrors', 'fountains'),
+                shapes=('flowing', 'irregular'),
+                features=('water features', 'aquariums', 'fountains')
+            ),
+            'fire': ElementVastu(
+                colors=('red', 'orange', 'yellow', 'pink'),
+                materials=('wood', 'metal', 'lighting'),
+                shapes=('triangular', 'pointed'),
+                features=('lighting', 'candles', 'fireplace', 'sunlight')
+            ),
+            'earth': ElementVastu(
+                colors=('yellow', 'brown', 'beige', 'terracotta'),
+                materials=('stone', 'ceramic', 'earth materials'),
+                shapes=('square', 'stable'),
+                features=('ceramic items', 'stone decor', 'plants')
+            ),
+            'air': ElementVastu(
+                colors=('green', 'white', 'light blue'),
+                materials=('wood', 'natural materials', 'fabrics'),
+                shapes=('rectangular', 'vertical'),
+                features=('plants', 'wind chimes', 'good ventilation', 'fabrics')
+            ),
+            'space': ElementVastu(
+                colors=('white', 'cream', 'light gray', 'silver'),
+                materials=('metal', 'glass', 'minimal materials'),
+                shapes=('circular', 'open'),
+                features=('open space', 'minimal decor', 'sky views', 'light')
+            )
         }
     }
     
+    # Flat views of the sub-tables above, so each lookup is a single probe
+    _ROOM_DIRECTIONS: ClassVar[Dict[str, RoomVastu]] = VASTU_PRINCIPLES['room_directions']
+    _DIRECTIONS: ClassVar[Dict[str, DirectionVastu]] = VASTU_PRINCIPLES['directions']
+    _ELEMENTS: ClassVar[Dict[str, ElementVastu]] = VASTU_PRINCIPLES['elements']
+    
     # Room-specific elements and functional descriptions
-    ROOM_INTENTS = {
-        'kitchen': {
-            'function': 'culinary workspace',
-            'key_elements': ['countertops', 'cabinets', 'backsplash', 'island', 'appliances', 'sink', 'lighting'],
-            'atmosphere': 'functional yet beautiful cooking environment',
-            'activities': 'food preparation, cooking, and casual dining'
-        },
-        'bedroom': {
-            'function': 'restful sanctuary',
-            'key_elements': ['bed', 'nightstands', 'wardrobe', 'dresser', 'headboard', 'lighting', 'window treatments'],
-            'atmosphere': 'peaceful sleeping retreat',
-            'activities': 'rest, sleep, and relaxation'
-        },
-        'living': {
-            'function': 'social gathering space',
-            'key_elements': ['sofa', 'coffee table', 'entertainment center', 'accent chairs', 'bookshelves', 'lighting'],
-            'atmosphere': 'comfortable conversational area',
-            'activities': 'entertaining guests, relaxation, family time'
-        },
-        'dining': {
-            'function': 'formal eating area',
-            'key_elements': ['dining table', 'chairs', 'sideboard', 'buffet', 'chandelier', 'display cabinet'],
-            'atmosphere': 'elegant dining atmosphere',
-            'activities': 'meals, dinner parties, special occasions'
-        },
-        'bathroom': {
-            'function': 'personal hygiene space',
-            'key_elements': ['vanity', 'mirror', 'shower', 'bathtub', 'toilet', 'storage', 'lighting'],
-            'atmosphere': 'spa-like rejuvenation zone',
-            'activities': 'daily grooming, relaxation'
-        },
-        'office': {
-            'function': 'productive workspace',
-            'key_elements': ['desk', 'chair', 'shelving', 'filing cabinets', 'task lighting', 'computer setup'],
-            'atmosphere': 'focused professional environment',
-            'activities': 'work, study, creative tasks'
-        }
+    ROOM_INTENTS: ClassVar[Dict[str, RoomIntent]] = {
+        'kitchen': RoomIntent(
+            function='culinary workspace',
+            key_elements=('countertops', 'cabinets', 'backsplash', 'island', 'appliances', 'sink', 'lighting'),
+            atmosphere='functional yet beautiful cooking environment',
+            activities='food preparation, cooking, and casual dining'
+        ),
+        'bedroom': RoomIntent(
+            function='restful sanctuary',
+            key_elements=('bed', 'nightstands', 'wardrobe', 'dresser', 'headboard', 'lighting', 'window treatments'),
+            atmosphere='peaceful sleeping retreat',
+            activities='rest, sleep, and relaxation'
+        ),
+        'living': RoomIntent(
+            function='social gathering space',
+            key_elements=('sofa', 'coffee table', 'entertainment center', 'accent chairs', 'bookshelves', 'lighting'),
+            atmosphere='comfortable conversational area',
+            activities='entertaining guests, relaxation, family time'
+        ),
+        'dining': RoomIntent(
+            function='formal eating area',
+            key_elements=('dining table', 'chairs', 'sideboard', 'buffet', 'chandelier', 'display cabinet'),
+            atmosphere='elegant dining atmosphere',
+            activities='meals, dinner parties, special occasions'
+        ),
+        'bathroom': RoomIntent(
+            function='personal hygiene space',
+            key_elements=('vanity', 'mirror', 'shower', 'bathtub', 'toilet', 'storage', 'lighting'),
+            atmosphere='spa-like rejuvenation zone',
+            activities='daily grooming, relaxation'
+        ),
+        'office': RoomIntent(
+            function='productive workspace',
+            key_elements=('desk', 'chair', 'shelving', 'filing cabinets', 'task lighting', 'computer setup'),
+            atmosphere='focused professional environment',
+            activities='work, study, creative tasks'
+        )
     }
     
     # Style-specific characteristics with detailed descriptors
-    STYLE_PROFILES = {
-        'modern': {
-            'philosophy': 'clean lines, minimal ornamentation, functional simplicity',
-            'materials': ['polished metals', 'glass', 'concrete', 'smooth woods', 'chrome accents'],
-            'colors': ['neutral palette', 'monochromatic schemes', 'bold accent colors'],
-            'furniture': ['streamlined silhouettes', 'geometric shapes', 'low-profile pieces'],
-            'lighting': ['recessed lighting', 'statement fixtures', 'natural light emphasis'],
-            'texture': ['smooth surfaces', 'minimal texture', 'clean finishes']
-        },
-        'traditional': {
-            'philosophy': 'timeless elegance, classic details, ornate craftsmanship',
-            'materials': ['rich hardwoods', 'brass', 'crystal', 'upholstered fabrics', 'marble'],
-            'colors': ['warm deep tones', 'rich jewel colors', 'classic neutrals'],
-            'furniture': ['carved details', 'curved lines', 'wingback chairs', 'pedestal tables'],
-            'lighting': ['chandeliers', 'sconces', 'table lamps with fabric shades'],
-            'texture': ['plush upholstery', 'drapery', 'patterned rugs', 'textured walls']
-        },
-        'scandinavian': {
-            'philosophy': 'hygge comfort, functional simplicity, natural elements',
-            'materials': ['light woods', 'wool', 'linen', 'natural fibers', 'ceramics'],
-            'colors': ['whites', 'light grays', 'soft pastels', 'natural wood tones'],
-            'furniture': ['clean lines', 'tapered legs', 'functional designs', 'organic shapes'],
-            'lighting': ['soft ambient lighting', 'candlelight', 'large windows'],
-            'texture': ['cozy textiles', 'knitted throws', 'natural textures', 'warm woods']
-        },
-        'bohemian': {
-            'philosophy': 'eclectic freedom, global influences, artistic expression',
-            'materials': ['rattan', 'macramé', 'vintage textiles', 'natural materials', 'mixed metals'],
-            'colors': ['rich jewel tones', 'earthy colors', 'vibrant patterns', 'warm palette'],
-            'furniture': ['mix of vintage and modern', 'low seating', 'floor cushions', 'unique pieces'],
-            'lighting': ['string lights', 'lanterns', 'natural light', 'colorful lamps'],
-            'texture': ['layered textiles', 'patterns', 'tassels', 'fringe', 'natural fibers']
-        },
-        'industrial': {
-            'philosophy': 'raw authenticity, urban loft aesthetic, exposed elements',
-            'materials': ['raw concrete', 'exposed brick', 'steel beams', 'reclaimed wood', 'metal pipes'],
-            'colors': ['grays', 'browns', 'rust tones', 'black accents', 'neutral palette'],
-            'furniture': ['utilitarian pieces', 'metal frames', 'wood and metal combinations', 'raw finishes'],
-            'lighting': [' Edison bulbs', 'metal fixtures', 'track lighting', 'warehouse-style windows'],
-            'texture': ['rough surfaces', 'distressed finishes', 'raw materials', 'weathered textures']
-        },
-        'coastal': {
-            'philosophy': 'beachside serenity, light and airy, natural seaside elements',
-            'materials': ['light woods', 'wicker', 'linen', 'cotton', 'natural fibers'],
-            'colors': ['whites', 'soft blues', 'sandy beiges', 'seafoam greens', 'coral accents'],
-            'furniture': ['slipcovered pieces', 'cane details', 'light-colored woods', 'casual comfort'],
-            'lighting': ['natural light', 'driftwood fixtures', 'glass table lamps', 'nautical elements'],
-            'texture': ['light fabrics', 'natural textures', 'weathered wood', 'sea-grass rugs']
-        }
+    STYLE_PROFILES: ClassVar[Dict[str, StyleProfile]] = {
+        'modern': StyleProfile(
+            philosophy='clean lines, minimal ornamentation, functional simplicity',
+            materials=('polished metals', 'glass', 'concrete', 'smooth woods', 'chrome accents'),
+            colors=('neutral palette', 'monochromatic schemes', 'bold accent colors'),
+            furniture=('streamlined silhouettes', 'geometric shapes', 'low-profile pieces'),
+            lighting=('recessed lighting', 'statement fixtures', 'natural light emphasis'),
+            texture=('smooth surfaces', 'minimal texture', 'clean finishes')
+        ),
+        'traditional': StyleProfile(
+            philosophy='timeless elegance, classic details, ornate craftsmanship',
+            materials=('rich hardwoods', 'brass', 'crystal', 'upholstered fabrics', 'marble'),
+            colors=('warm deep tones', 'rich jewel colors', 'classic neutrals'),
+            furniture=('carved details', 'curved lines', 'wingback chairs', 'pedestal tables'),
+            lighting=('chandeliers', 'sconces', 'table lamps with fabric shades'),
+            texture=('plush upholstery', 'drapery', 'patterned rugs', 'textured walls')
+        ),
+        'scandinavian': StyleProfile(
+            philosophy='hygge comfort, functional simplicity, natural elements',
+            materials=('light woods', 'wool', 'linen', 'natural fibers', 'ceramics'),
+            colors=('whites', 'light grays', 'soft pastels', 'natural wood tones'),
+            furniture=('clean lines', 'tapered legs', 'functional designs', 'organic shapes'),
+            lighting=('soft ambient lighting', 'candlelight', 'large windows'),
+            texture=('cozy textiles', 'knitted throws', 'natural textures', 'warm woods')
+        ),
+        'bohemian': StyleProfile(
+            philosophy='eclectic freedom, global influences, artistic expression',
+            materials=('rattan', 'macramé', 'vintage textiles', 'natural materials', 'mixed metals'),
+            colors=('rich jewel tones', 'earthy colors', 'vibrant patterns', 'warm palette'),
+            furniture=('mix of vintage and modern', 'low seating', 'floor cushions', 'unique pieces'),
+            lighting=('string lights', 'lanterns', 'natural light', 'colorful lamps'),
+            texture=('layered textiles', 'patterns', 'tassels', 'fringe', 'natural fibers')
+        ),
+        'industrial': StyleProfile(
+            philosophy='raw authenticity, urban loft aesthetic, exposed elements',
+            materials=('raw concrete', 'exposed brick', 'steel beams', 'reclaimed wood', 'metal pipes'),
+            colors=('grays', 'browns', 'rust tones', 'black accents', 'neutral palette'),
+            furniture=('utilitarian pieces', 'metal frames', 'wood and metal combinations', 'raw finishes'),
+            lighting=(' Edison bulbs', 'metal fixtures', 'track lighting', 'warehouse-style windows'),
+            texture=('rough surfaces', 'distressed finishes', 'raw materials', 'weathered textures')
+        ),
+        'coastal': StyleProfile(
+            philosophy='beachside serenity, light and airy, natural seaside elements',
+            materials=('light woods', 'wicker', 'linen', 'cotton', 'natural fibers'),
+            colors=('whites', 'soft blues', 'sandy beiges', 'seafoam greens', 'coral accents'),
+            furniture=('slipcovered pieces', 'cane details', 'light-colored woods', 'casual comfort'),
+            lighting=('natural light', 'driftwood fixtures', 'glass table lamps', 'nautical elements'),
+            texture=('light fabrics', 'natural textures', 'weathered wood', 'sea-grass rugs')
+        )
     }
     
     # Material-specific enhancements
-    MATERIAL_ENHANCEMENTS = {
-        'hardwood': {
-            'description': 'rich hardwood flooring with visible grain patterns',
-            'variants': ['oak', 'maple', 'walnut', 'cherry', 'bamboo'],
-            'finish': 'satin or matte finish highlighting natural wood beauty'
-        },
-        'laminate': {
-            'description': 'durable laminate flooring with realistic wood texture',
-            'variants': ['wood-look', 'stone-look', 'modern patterns'],
-            'finish': 'seamless planks with realistic texture'
-        },
-        'tile': {
-            'description': 'elegant tile flooring with sophisticated patterns',
-            'variants': ['ceramic', 'porcelain', 'marble-look', 'geometric patterns'],
-            'finish': 'grouted tiles with clean lines and modern layout'
-        },
-        'carpet': {
-            'description': 'plush carpeting for comfort and warmth',
-            'variants': ['cut-pile', 'berber', 'patterned', 'solid colors'],
-            'finish': 'soft, dense pile with comfortable underfoot feel'
-        },
-        'vinyl': {
-            'description': 'modern luxury vinyl flooring with realistic textures',
-            'variants': ['wood-look planks', 'stone-look tiles', 'modern patterns'],
-            'finish': 'water-resistant surface with authentic texture replication'
-        }
+    MATERIAL_ENHANCEMENTS: ClassVar[Dict[str, MaterialInfo]] = {
+        'hardwood': MaterialInfo(
+            description='rich hardwood flooring with visible grain patterns',
+            variants=('oak', 'maple', 'walnut', 'cherry', 'bamboo'),
+            finish='satin or matte finish highlighting natural wood beauty'
+        ),
+        'laminate': MaterialInfo(
+            description='durable laminate flooring with realistic wood texture',
+            variants=('wood-look', 'stone-look', 'modern patterns'),
+            finish='seamless planks with realistic texture'
+        ),
+        'tile': MaterialInfo(
+            description='elegant tile flooring with sophisticated patterns',
+            variants=('ceramic', 'porcelain', 'marble-look', 'geometric patterns'),
+            finish='grouted tiles with clean lines and modern layout'
+        ),
+        'carpet': MaterialInfo(
+            description='plush carpeting for comfort and warmth',
+            variants=('cut-pile', 'berber', 'patterned', 'solid colors'),
+            finish='soft, dense pile with comfortable underfoot feel'
+        ),
+        'vinyl': MaterialInfo(
+            description='modern luxury vinyl flooring with realistic textures',
+            variants=('wood-look planks', 'stone-look tiles', 'modern patterns'),
+            finish='water-resistant surface with authentic texture replication'
+        )
+    }
+    
+    # Helper outputs over every known room/style/direction/element/variation,
+    # filled once at import by _build_tables(); unknown keys are computed
+    VARIATIONS: ClassVar[Tuple[int, ...]] = (1, 2, 3)
+    _VASTU_STYLE: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_ROOM_ELEMENTS: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_LAYOUT: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_FLOORING: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_LIGHTING: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_DECOR: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_ENERGY: ClassVar[Dict[tuple, str]] = {}
+    _VASTU_ACTIVITY: ClassVar[Dict[tuple, str]] = {}
+    
+    # Prompt length limit for most AI models
+    MAX_PROMPT_LENGTH: ClassVar[int] = 900
+    
+    # Photographic quality with Vastu emphasis; constant, so joined once here
+    _PHOTO_TAIL: ClassVar[str] = ", ".join([
+        "professional architectural photography emphasizing Vastu compliance",
+        "natural lighting enhanced to promote positive energy flow",
+        "4K ultra high resolution showing Vastu alignment",
+        "photorealistic details of Vastu-compliant elements",
+        "perfect composition following Vastu spatial rules",
+        "Vastu-optimized interior design magazine quality"
+    ])
+    
+    # Literal lookups used by the fragment helpers, built once here instead
+    # of on every call; "%s" entries are %-format templates
+    _VASTU_WALL_COLORS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        'north': ('green', 'blue'),
+        'south': ('red', 'orange'),
+        'east': ('green', 'white'),
+        'west': ('white', 'silver'),
+        'northeast': ('white', 'cream'),
+        'northwest': ('white', 'light gray'),
+        'southeast': ('green', 'red'),
+        'southwest': ('yellow', 'beige')
+    }
+    
+    _ENERGY_TEMPLATES: ClassVar[Dict[int, str]] = {
+        1: 'harmonious %s circulation throughout the space',
+        2: 'balanced %s flow following Vastu guidelines',
+        3: 'optimized %s movement and positive vibrations'
+    }
+    
+    _ACTIVITY_TEMPLATES: ClassVar[Dict[str, str]] = {
+        'kitchen': 'Vastu-optimized culinary workspace with %s fire element alignment',
+        'bedroom': 'peaceful Vastu sleeping sanctuary with %s stability energy',
+        'living': 'harmonious Vastu social space enhanced with %s positive energy',
+        'dining': 'Vastu-compliant dining area with %s energy for nourishment',
+        'bathroom': 'clean Vastu hygiene space with %s purification energy',
+        'office': 'productive Vastu workspace with %s success-oriented energy'
+    }
+    _ACTIVITY_DEFAULT: ClassVar[str] = 'Vastu-aligned %s with %s energy enhancement'
+    
+    _COLOR_MAPPING: ClassVar[Dict[str, str]] = {
+        'white': 'warm white',
+        'gray': 'sophisticated gray',
+        'beige': 'soft beige',
+        'blue': 'calming blue',
+        'green': 'serene green',
+        'red': 'bold red',
+        'yellow': 'sunny yellow',
+        'black': 'dramatic black',
+        'brown': 'rich brown'
+    }
+    
+    _STYLE_MODIFIERS: ClassVar[Dict[str, str]] = {
+        'modern': 'smooth %s',
+        'traditional': 'elegant %s',
+        'scandinavian': 'light %s',
+        'bohemian': 'warm %s',
+        'industrial': 'matte %s',
+        'coastal': 'airy %s'
+    }
+    
+    # Negative prompts are fixed per style, so they are joined once here
+    _NEGATIVE_BASE: ClassVar[Tuple[str, ...]] = (
+        'cluttered spaces',
+        'poor lighting',
+        'unnatural colors',
+        'distorted proportions',
+        'blurry details',
+        'cartoonish elements',
+        'oversized furniture',
+        'empty rooms',
+        'poorly arranged furniture',
+        'unrealistic materials',
+        'bad composition',
+        'dark shadows',
+        'overexposed areas'
+    )
+    
+    # Style-specific negatives
+    _STYLE_NEGATIVES: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        'modern': ('ornate details', 'carved patterns', 'traditional elements'),
+        'traditional': ('minimalist', 'industrial elements', 'modern starkness'),
+        'scandinavian': ('dark colors', 'heavy materials', 'ornate details'),
+        'bohemian': ('minimalist', 'monochromatic', 'stiff arrangements'),
+        'industrial': ('polished surfaces', 'delicate details', 'soft colors'),
+        'coastal': ('dark heavy materials', 'formal elements', 'urban industrial')
+    }
+    
+    _NEGATIVE_DEFAULT: ClassVar[str] = ', '.join(_NEGATIVE_BASE)
+    _NEGATIVE_PROMPTS: ClassVar[Dict[str, str]] = {}
+    
+    # Keyed by (room_type, style) so a lookup is a single probe
+    _LIGHTING_SCENARIOS: ClassVar[Dict[Tuple[str, str], str]] = {
+        ('kitchen', 'modern'): 'under-cabinet LED lighting and pendant lights over island',
+        ('kitchen', 'traditional'): 'classic chandelier and task lighting',
+        ('kitchen', 'scandinavian'): 'natural light with minimalist fixtures',
+        ('kitchen', 'bohemian'): 'eclectic mix of pendant lights and warm lamps',
+        ('kitchen', 'industrial'): 'metal pendant lights and track lighting',
+        ('kitchen', 'coastal'): 'natural light with rope-wrapped fixtures',
+        ('bedroom', 'modern'): 'recessed lighting with sleek bedside lamps',
+        ('bedroom', 'traditional'): 'elegant chandelier and table lamps',
+        ('bedroom', 'scandinavian'): 'soft diffused lighting with simple fixtures',
+        ('bedroom', 'bohemian'): 'string lights and colorful lanterns',
+        ('bedroom', 'industrial'): 'Edison bulb fixtures and wall sconces',
+        ('bedroom', 'coastal'): 'natural light with driftwood table lamps',
+        ('living', 'modern'): 'layered lighting with statement fixtures',
+        ('living', 'traditional'): 'central chandelier with accent lamps',
+        ('living', 'scandinavian'): 'large windows with simple ceiling fixtures',
+        ('living', 'bohemian'): 'mix of floor lamps and eclectic lighting',
+        ('living', 'industrial'): 'warehouse-style windows and metal fixtures',
+        ('living', 'coastal'): 'abundant natural light with casual fixtures'
     }
     
     def build_intent_prompt(self, request: GenerationRequest, variation: int = 1) -> str:
@@ -351,119 +543,205 @@ class IntentBasedPromptBuilder:
         Returns:
             Detailed, Vastu-specific prompt tailored to the user's selections
         """
-        room_type = request.room_type or 'living'
-        style = request.furniture_style or 'modern'
-        wall_color = request.wall_color or 'white'
-        flooring = request.flooring_material or 'hardwood'
+        return _build_cached(*self._selections(request), variation)
+    
+    def build_variations(self, request: GenerationRequest,
+                         variations: Tuple[int, ...] = (1, 2, 3)) -> Tuple[str, ...]:
+        """
+        Build the prompts for several variations of one request in a single pass.
+        
+        Args:
+            request: Generation request with room type, style, and materials
+            variations: Variation numbers to build, in order
+            
+        Returns:
+            One prompt per variation, in the order given
+        """
+        selections = self._selections(request)
+        return tuple(_build_cached(*selections, variation) for variation in variations)
+    
+    @staticmethod
+    def _selections(request: GenerationRequest) -> Tuple[str, str, str, str]:
+        """
+        Extract (room_type, style, wall_color, flooring) with defaults applied.
         
-        # Get Vastu-specific guidelines for this room type
-        vastu_room = self.VASTU_PRINCIPLES['room_directions'].get(room_type, {})
-        ideal_direction = vastu_room.get('ideal', 'north')
-        vastu_elements = vastu_room.get('elements', ['earth'])
-        vastu_colors = vastu_room.get('colors', ['white'])
-        vastu_principles = vastu_room.get('principles', [])
+        The values are interned so the table and cache lookups keyed on them
+        hit dict's identity fast path against the interned literal keys.
+        """
+        return (
+            sys.intern(request.room_type or 'living'),
+            sys.intern(request.furniture_style or 'modern'),
+            sys.intern(request.wall_color or 'white'),
+            sys.intern(request.flooring_material or 'hardwood')
+        )
+    
+    def _resolve_room_style(self, room_type: str, style: str) -> RoomStyleContext:
+        """
+        Resolve the lookups and leading fragments shared by every variation.
+        
+        Returns:
+            (ideal_direction, direction_element, direction_energy,
+            vastu_principles, head_fragments)
+        """
+        # Get Vastu-specific guidelines for this room type; valid selections
+        # take the direct-subscript path, unknown ones fall back to defaults
+        try:
+            vastu_room = self._ROOM_DIRECTIONS[room_type]
+            ideal_direction = vastu_room.ideal
+            vastu_colors = vastu_room.colors
+            vastu_principles = vastu_room.principles
+        except KeyError:
+            ideal_direction, vastu_colors, vastu_principles = 'north', ('white',), ()
         
         # Get direction-specific energy
-        direction_info = self.VASTU_PRINCIPLES['directions'].get(ideal_direction, {})
-        direction_element = direction_info.get('element', 'earth')
-        direction_energy = direction_info.get('energy', 'positive energy')
-        direction_materials = direction_info.get('materials', ['wood'])
-        direction_features = direction_info.get('features', ['plants'])
+        try:
+            direction_info = self._DIRECTIONS[ideal_direction]
+            direction_element = direction_info.element
+            direction_energy = direction_info.energy
+        except KeyError:
+            direction_element, direction_energy = 'earth', 'positive energy'
         
         # Get element-specific representations
-        element_info = self.VASTU_PRINCIPLES['elements'].get(direction_element, {})
-        element_colors = element_info.get('colors', ['white'])
-        element_materials = element_info.get('materials', ['wood'])
-        element_features = element_info.get('features', ['plants'])
+        try:
+            element_info = self._ELEMENTS[direction_element]
+            element_colors = element_info.colors
+            element_materials = element_info.materials
+            element_features = element_info.features
+        except KeyError:
+            element_colors, element_materials, element_features = ('white',), ('wood',), ('plants',)
         
         # Get room-specific intent and elements
-        room_intent = self.ROOM_INTENTS.get(room_type, self.ROOM_INTENTS['living'])
-        style_profile = self.STYLE_PROFILES.get(style, self.STYLE_PROFILES['modern'])
-        material_info = self.MATERIAL_ENHANCEMENTS.get(flooring, self.MATERIAL_ENHANCEMENTS['hardwood'])
-        
-        # VASTU-SPECIFIC PROMPT BUILDING
-        
-        # Core Vastu-aligned description
-        prompt_parts = [
+        try:
+            room_intent = self.ROOM_INTENTS[room_type]
+        except KeyError:
+            room_intent = self.ROOM_INTENTS['living']
+        try:
+            style_profile = self.STYLE_PROFILES[style]
+        except KeyError:
+            style_profile = self.STYLE_PROFILES['modern']
+        
+        head = (
+            # Core Vastu-aligned description
             f"Vastu-compliant professional interior design photograph of a stunning {style} {room_type}",
             f"strictly following Vastu Shastra principles for {ideal_direction} facing {room_type}",
-            f"designed as a {room_intent['function']} for {room_intent['activities']}",
-            f"creating a {room_intent['atmosphere']} enhanced with {direction_energy}"
-        ]
-        
-        # Vastu elements and energy flow
-        prompt_parts.append(
+            f"designed as a {room_intent.function} for {room_intent.activities}",
+            f"creating a {room_intent.atmosphere} enhanced with {direction_energy}",
+            # Vastu elements and energy flow
             f"Incorporating Vastu {direction_element} element with {', '.join(element_colors[:2])} colors, "
-            f"using {', '.join(element_materials[:2])} and featuring {', '.join(element_features[:2])}"
+            f"using {', '.join(element_materials[:2])} and featuring {', '.join(element_features[:2])}",
+            # Style philosophy with Vastu alignment
+            f"Embodying {self._get_vastu_style_description(style, direction_element)} with "
+            f"{', '.join(style_profile.materials[:3])} and "
+            f"Vastu-approved {', '.join(vastu_colors[:2])}",
         )
-        
-        # Style philosophy with Vastu alignment
-        vastu_style_desc = self._get_vastu_style_description(style, direction_element)
-        prompt_parts.append(
-            f"Embodying {vastu_style_desc} with "
-            f"{', '.join(style_profile['materials'][:3])} and "
-            f"Vastu-approved {', '.join(vastu_colors[:2])}"
+        return ideal_direction, direction_element, direction_energy, vastu_principles, head
+    
+    def _compose_prompt(self, room_type: str, style: str, wall_color: str, flooring: str,
+                        variation: int) -> str:
+        """Compose the Vastu prompt for a set of selections (uncached)."""
+        ideal_direction, direction_element, direction_energy, vastu_principles, head = (
+            _room_style_context(room_type, style)
         )
         
-        # Vastu-specific room elements based on variation
-        vastu_elements_desc = self._get_vastu_room_elements(room_type, style, variation)
-        prompt_parts.append(f"featuring {vastu_elements_desc}")
-        
-        # Vastu-compliant layout and arrangement
-        layout_desc = self._get_vastu_layout_description(room_type, ideal_direction, variation)
-        prompt_parts.append(f"with {layout_desc}")
-        
-        # Wall and flooring with Vastu considerations
-        wall_desc = self._get_vastu_wall_description(wall_color, style, ideal_direction)
-        prompt_parts.append(f"{wall_desc} walls")
-        
-        flooring_desc = self._get_vastu_flooring_description(flooring, style, direction_element)
-        prompt_parts.append(f"with {flooring_desc}")
-        
-        # Vastu-specific lighting and energy
-        lighting_desc = self._get_vastu_lighting_description(room_type, style, ideal_direction, variation)
-        prompt_parts.append(lighting_desc)
-        
-        # Vastu decorative elements and symbols
-        decor_desc = self._get_vastu_decor_description(room_type, style, direction_element, variation)
-        prompt_parts.append(f"decorated with {decor_desc}")
+        # VASTU-SPECIFIC PROMPT BUILDING
+        # Fragments are built in one list display rather than appended one
+        # at a time; order is priority order for the length limit below
+        prompt_parts = [
+            *head,
+            # Vastu-specific room elements based on variation
+            f"featuring {self._get_vastu_room_elements(room_type, style, variation)}",
+            # Vastu-compliant layout and arrangement
+            f"with {self._get_vastu_layout_description(room_type, ideal_direction, variation)}",
+            # Wall and flooring with Vastu considerations
+            f"{self._get_vastu_wall_description(wall_color, style, ideal_direction)} walls",
+            f"with {self._get_vastu_flooring_description(flooring, style, direction_element)}",
+            # Vastu-specific lighting and energy
+            self._get_vastu_lighting_description(room_type, style, ideal_direction, variation),
+            # Vastu decorative elements and symbols
+            f"decorated with {self._get_vastu_decor_description(room_type, style, direction_element, variation)}",
+        ]
         
-        # Vastu principles implementation
+        # Vastu principles implementation (top 3)
         if vastu_principles:
-            key_principles = vastu_principles[:3]  # Top 3 principles
-            principles_desc = f"following Vastu principles: {', '.join(key_principles)}"
-            prompt_parts.append(principles_desc)
-        
-        # Energy flow and atmosphere
-        energy_desc = self._get_vastu_energy_description(direction_energy, room_type, variation)
-        prompt_parts.append(f"creating {energy_desc}")
+            prompt_parts.append(f"following Vastu principles: {', '.join(vastu_principles[:3])}")
         
-        # Photographic quality with Vastu emphasis
-        prompt_parts.extend([
-            "professional architectural photography emphasizing Vastu compliance",
-            "natural lighting enhanced to promote positive energy flow",
-            "4K ultra high resolution showing Vastu alignment",
-            "photorealistic details of Vastu-compliant elements",
-            "perfect composition following Vastu spatial rules",
-            "Vastu-optimized interior design magazine quality"
-        ])
+        prompt_parts += [
+            # Energy flow and atmosphere
+            f"creating {self._get_vastu_energy_description(direction_energy, room_type, variation)}",
+        ]
         
         # Room-specific Vastu activity context
         vastu_activity = self._get_vastu_activity_context(room_type, ideal_direction, variation)
-        prompt_parts.append(vastu_activity)
-        
-        # Combine all parts into a comprehensive Vastu prompt
-        final_prompt = ", ".join(prompt_parts)
-        
-        # Ensure prompt is not too long for most AI models
-        if len(final_prompt) > 900:
-            # Truncate while keeping the most important Vastu elements
-            final_prompt = final_prompt[:897] + "..."
         
-        return final_prompt
+        # Combine parts in priority order, skipping any fragment that would push
+        # the prompt past the model limit rather than truncating mid-fragment
+        # Fragments are written straight into one buffer, whose position is
+        # the running length, instead of being collected and joined
+        buf = io.StringIO()
+        for fragment in (*prompt_parts, self._PHOTO_TAIL, vastu_activity):
+            length = buf.tell()
+            separator = ", " if length else ""
+            if length + len(separator) + len(fragment) > self.MAX_PROMPT_LENGTH:
+                continue
+            buf.write(separator)
+            buf.write(fragment)
+        
+        return buf.getvalue()
+    
+    @classmethod
+    def _build_tables(cls) -> None:
+        """Precompute the Vastu helper lookup tables over all known inputs."""
+        rooms = cls._ROOM_DIRECTIONS
+        directions = cls._DIRECTIONS
+        elements = cls._ELEMENTS
+        energies = {info.energy for info in directions.values()} | {'positive energy'}
+        
+        cls._VASTU_STYLE = {
+            (style, element): cls._compute_vastu_style_description(style, element)
+            for style in cls.STYLE_PROFILES for element in elements
+        }
+        cls._VASTU_ROOM_ELEMENTS = {
+            (room, variation): cls._compute_vastu_room_elements(room, variation)
+            for room in rooms for variation in cls.VARIATIONS
+        }
+        cls._VASTU_LAYOUT = {
+            (direction, variation): cls._compute_vastu_layout_description(direction, variation)
+            for direction in directions for variation in cls.VARIATIONS
+        }
+        cls._VASTU_FLOORING = {
+            (flooring, element): cls._compute_vastu_flooring_description(flooring, element)
+            for flooring in cls.MATERIAL_ENHANCEMENTS for element in elements
+        }
+        cls._VASTU_LIGHTING = {
+            (direction, variation): cls._compute_vastu_lighting_description(direction, variation)
+            for direction in directions for variation in cls.VARIATIONS
+        }
+        cls._VASTU_DECOR = {
+            (element, variation): cls._compute_vastu_decor_description(element, variation)
+            for element in elements for variation in cls.VARIATIONS
+        }
+        cls._VASTU_ENERGY = {
+            (energy, variation): cls._compute_vastu_energy_description(energy, variation)
+            for energy in energies for variation in cls.VARIATIONS
+        }
+        cls._VASTU_ACTIVITY = {
+            (room, direction): cls._compute_vastu_activity_context(room, direction)
+            for room in rooms for direction in directions
+        }
+        cls._NEGATIVE_PROMPTS = {
+            style: ', '.join(cls._NEGATIVE_BASE + extra)
+            for style, extra in cls._STYLE_NEGATIVES.items()
+        }
     
     def _get_vastu_style_description(self, style: str, element: str) -> str:
         """Get Vastu-aligned style description."""
+        try:
+            return self._VASTU_STYLE[style, element]
+        except KeyError:
+            return self._compute_vastu_style_description(style, element)
+    
+    @staticmethod
+    def _compute_vastu_style_description(style: str, element: str) -> str:
         vastu_styles = {
             'modern': f'clean lines with {element} element harmony',
             'traditional': f'classic elegance enhanced with {element} energy',
@@ -476,6 +754,13 @@ class IntentBasedPromptBuilder:
     
     def _get_vastu_room_elements(self, room_type: str, style: str, variation: int) -> str:
         """Get Vastu-compliant room elements based on variation."""
+        try:
+            return self._VASTU_ROOM_ELEMENTS[room_type, variation]
+        except KeyError:
+            return self._compute_vastu_room_elements(room_type, variation)
+    
+    @staticmethod
+    def _compute_vastu_room_elements(room_type: str, variation: int) -> str:
         elements_variations = {
             'kitchen': {
                 1: 'southeast cooking platform with east-facing stove, northeast water sink, south wall storage',
@@ -512,6 +797,13 @@ class IntentBasedPromptBuilder:
     
     def _get_vastu_layout_description(self, room_type: str, direction: str, variation: int) -> str:
         """Get Vastu-compliant layout description."""
+        try:
+            return self._VASTU_LAYOUT[direction, variation]
+        except KeyError:
+            return self._compute_vastu_layout_description(direction, variation)
+    
+    @staticmethod
+    def _compute_vastu_layout_description(direction: str, variation: int) -> str:
         layouts = {
             1: f'Vastu-optimized layout following {direction} direction principles',
             2: f'spatial arrangement aligned with {direction} energy flow',
@@ -519,20 +811,11 @@ class IntentBasedPromptBuilder:
         }
         return layouts.get(variation, layouts[1])
     
-    def _get_vastu_wall_description(self, color: str, style: str, direction: str) -> str:
-        """Get Vastu-compliant wall description."""
-        direction_colors = {
-            'north': ['green', 'blue'],
-            'south': ['red', 'orange'],
-            'east': ['green', 'white'],
-            'west': ['white', 'silver'],
-            'northeast': ['white', 'cream'],
-            'northwest': ['white', 'light gray'],
-            'southeast': ['green', 'red'],
-            'southwest': ['yellow', 'beige']
-        }
-        
-        vastu_colors = direction_colors.get(direction, ['white'])
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _get_vastu_wall_description(color: str, style: str, direction: str) -> str:
+        """Get Vastu-compliant wall description (memoized per selection)."""
+        vastu_colors = IntentBasedPromptBuilder._VASTU_WALL_COLORS.get(direction, ('white',))
         base_color = color.lower()
         
         if base_color in vastu_colors:
@@ -542,6 +825,13 @@ class IntentBasedPromptBuilder:
     
     def _get_vastu_flooring_description(self, flooring: str, style: str, element: str) -> str:
         """Get Vastu-compliant flooring description."""
+        try:
+            return self._VASTU_FLOORING[flooring, element]
+        except KeyError:
+            return self._compute_vastu_flooring_description(flooring, element)
+    
+    @classmethod
+    def _compute_vastu_flooring_description(cls, flooring: str, element: str) -> str:
         element_flooring = {
             'water': 'marble or light tiles to enhance water energy',
             'fire': 'wood or ceramic to balance fire element',
@@ -550,13 +840,20 @@ class IntentBasedPromptBuilder:
             'space': 'minimal flooring with open feel for space element'
         }
         
-        base_desc = self.MATERIAL_ENHANCEMENTS.get(flooring, self.MATERIAL_ENHANCEMENTS['hardwood'])['description']
+        base_desc = cls.MATERIAL_ENHANCEMENTS.get(flooring, cls.MATERIAL_ENHANCEMENTS['hardwood']).description
         element_desc = element_flooring.get(element, 'compatible with Vastu principles')
         
         return f'{base_desc} enhanced with {element_desc}'
     
     def _get_vastu_lighting_description(self, room_type: str, style: str, direction: str, variation: int) -> str:
         """Get Vastu-compliant lighting description."""
+        try:
+            return self._VASTU_LIGHTING[direction, variation]
+        except KeyError:
+            return self._compute_vastu_lighting_description(direction, variation)
+    
+    @staticmethod
+    def _compute_vastu_lighting_description(direction: str, variation: int) -> str:
         direction_lighting = {
             'north': 'bright natural lighting from north windows',
             'south': 'warm lighting balanced with south sunlight',
@@ -579,6 +876,13 @@ class IntentBasedPromptBuilder:
     
     def _get_vastu_decor_description(self, room_type: str, style: str, element: str, variation: int) -> str:
         """Get Vastu-compliant decorative elements."""
+        try:
+            return self._VASTU_DECOR[element, variation]
+        except KeyError:
+            return self._compute_vastu_decor_description(element, variation)
+    
+    @staticmethod
+    def _compute_vastu_decor_description(element: str, variation: int) -> str:
         element_decor = {
             'water': 'water features, mirrors, and flowing decorations',
             'fire': 'lighting fixtures, candles, and warm decorative elements',
@@ -598,116 +902,77 @@ class IntentBasedPromptBuilder:
     
     def _get_vastu_energy_description(self, energy: str, room_type: str, variation: int) -> str:
         """Get Vastu energy flow description."""
-        energy_descriptions = {
-            1: f'harmonious {energy} circulation throughout the space',
-            2: f'balanced {energy} flow following Vastu guidelines',
-            3: f'optimized {energy} movement and positive vibrations'
-        }
-        return energy_descriptions.get(variation, energy_descriptions[1])
+        try:
+            return self._VASTU_ENERGY[energy, variation]
+        except KeyError:
+            return self._compute_vastu_energy_description(energy, variation)
+    
+    @classmethod
+    def _compute_vastu_energy_description(cls, energy: str, variation: int) -> str:
+        templates = cls._ENERGY_TEMPLATES
+        return templates.get(variation, templates[1]) % energy
     
     def _get_vastu_activity_context(self, room_type: str, direction: str, variation: int) -> str:
         """Get Vastu-specific activity context."""
-        contexts = {
-            'kitchen': f'Vastu-optimized culinary workspace with {direction} fire element alignment',
-            'bedroom': f'peaceful Vastu sleeping sanctuary with {direction} stability energy',
-            'living': f'harmonious Vastu social space enhanced with {direction} positive energy',
-            'dining': f'Vastu-compliant dining area with {direction} energy for nourishment',
-            'bathroom': f'clean Vastu hygiene space with {direction} purification energy',
-            'office': f'productive Vastu workspace with {direction} success-oriented energy'
-        }
-        return contexts.get(room_type, f'Vastu-aligned {room_type} with {direction} energy enhancement')
-    
-    def _get_wall_description(self, color: str, style: str) -> str:
-        """Get style-appropriate wall description."""
-        color_mapping = {
-            'white': 'crisp white' if style == 'modern' else 'warm white',
-            'gray': 'sophisticated gray',
-            'beige': 'soft beige',
-            'blue': 'calming blue',
-            'green': 'serene green',
-            'red': 'bold red',
-            'yellow': 'sunny yellow',
-            'black': 'dramatic black',
-            'brown': 'rich brown'
-        }
-        
-        base_color = color_mapping.get(color.lower(), color)
-        
-        style_modifiers = {
-            'modern': f'smooth {base_color}',
-            'traditional': f'elegant {base_color}',
-            'scandinavian': f'light {base_color}',
-            'bohemian': f'warm {base_color}',
-            'industrial': f'matte {base_color}',
-            'coastal': f'airy {base_color}'
-        }
+        try:
+            return self._VASTU_ACTIVITY[room_type, direction]
+        except KeyError:
+            return self._compute_vastu_activity_context(room_type, direction)
+    
+    @classmethod
+    def _compute_vastu_activity_context(cls, room_type: str, direction: str) -> str:
+        try:
+            return cls._ACTIVITY_TEMPLATES[room_type] % direction
+        except KeyError:
+            return cls._ACTIVITY_DEFAULT % (room_type, direction)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _get_wall_description(color: str, style: str) -> str:
+        """Get style-appropriate wall description (memoized per selection)."""
+        cls = IntentBasedPromptBuilder
+        base_color = color.lower()
+        if base_color == 'white' and style == 'modern':
+            base_color = 'crisp white'
+        else:
+            base_color = cls._COLOR_MAPPING.get(base_color, color)
         
-        return style_modifiers.get(style, base_color)
+        modifier = cls._STYLE_MODIFIERS.get(style)
+        return modifier % base_color if modifier else base_color
     
     def _get_lighting_description(self, room_type: str, style: str) -> str:
         """Get room and style-specific lighting description."""
-        lighting_scenarios = {
-            'kitchen': {
-                'modern': 'under-cabinet LED lighting and pendant lights over island',
-                'traditional': 'classic chandelier and task lighting',
-                'scandinavian': 'natural light with minimalist fixtures',
-                'bohemian': 'eclectic mix of pendant lights and warm lamps',
-                'industrial': 'metal pendant lights and track lighting',
-                'coastal': 'natural light with rope-wrapped fixtures'
-            },
-            'bedroom': {
-                'modern': 'recessed lighting with sleek bedside lamps',
-                'traditional': 'elegant chandelier and table lamps',
-                'scandinavian': 'soft diffused lighting with simple fixtures',
-                'bohemian': 'string lights and colorful lanterns',
-                'industrial': 'Edison bulb fixtures and wall sconces',
-                'coastal': 'natural light with driftwood table lamps'
-            },
-            'living': {
-                'modern': 'layered lighting with statement fixtures',
-                'traditional': 'central chandelier with accent lamps',
-                'scandinavian': 'large windows with simple ceiling fixtures',
-                'bohemian': 'mix of floor lamps and eclectic lighting',
-                'industrial': 'warehouse-style windows and metal fixtures',
-                'coastal': 'abundant natural light with casual fixtures'
-            }
-        }
-        
-        default_lighting = 'natural and artificial lighting balance'
-        
-        return lighting_scenarios.get(room_type, {}).get(style, default_lighting)
+        return self._LIGHTING_SCENARIOS.get(
+            (room_type, style), 'natural and artificial lighting balance'
+        )
     
     def build_negative_prompt(self, request: GenerationRequest) -> str:
         """Build negative prompt to avoid undesirable elements."""
-        negative_elements = [
-            'cluttered spaces',
-            'poor lighting',
-            'unnatural colors',
-            'distorted proportions',
-            'blurry details',
-            'cartoonish elements',
-            'oversized furniture',
-            'empty rooms',
-            'poorly arranged furniture',
-            'unrealistic materials',
-            'bad composition',
-            'dark shadows',
-            'overexposed areas'
-        ]
-        
-        # Add style-specific negatives
-        style = request.furniture_style or 'modern'
-        if style == 'modern':
-            negative_elements.extend(['ornate details', 'carved patterns', 'traditional elements'])
-        elif style == 'traditional':
-            negative_elements.extend(['minimalist', 'industrial elements', 'modern starkness'])
-        elif style == 'scandinavian':
-            negative_elements.extend(['dark colors', 'heavy materials', 'ornate details'])
-        elif style == 'bohemian':
-            negative_elements.extend(['minimalist', 'monochromatic', 'stiff arrangements'])
-        elif style == 'industrial':
-            negative_elements.extend(['polished surfaces', 'delicate details', 'soft colors'])
-        elif style == 'coastal':
-            negative_elements.extend(['dark heavy materials', 'formal elements', 'urban industrial'])
-        
-        return ', '.join(negative_elements)
+        try:
+            return self._NEGATIVE_PROMPTS[request.furniture_style or 'modern']
+        except KeyError:
+            return self._NEGATIVE_DEFAULT
+
+
+IntentBasedPromptBuilder._build_tables()
+
+_BUILDER = IntentBasedPromptBuilder()
+
+
+@functools.lru_cache(maxsize=256)
+def _room_style_context(room_type: str, style: str) -> RoomStyleContext:
+    """Memoized lookups and leading fragments for a (room_type, style) pair."""
+    return _BUILDER._resolve_room_style(room_type, style)
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_cached(room_type: str, style: str, wall_color: str, flooring: str,
+                  variation: int) -> str:
+    """
+    Memoized prompt composition.
+    
+    The prompt depends only on these five values and the builder holds
+    nothing but class-level constants, so repeat selections (retries,
+    the same room/style across users) skip composition entirely.
+    """
+    return _BUILDER._compose_prompt(room_type, style, wall_color, flooring, variation)
@@ -16,20 +16,174 @@ Features:
 
 import aiohttp
 import json
+import os
+import struct
 import time
 import io
-from typing import Dict, List, Optional, Any
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Any, Union
 import logging
 import asyncio
 from PIL import Image
 import base64
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 from .base_engine import BaseEngine, GenerationRequest, GenerationResult, EngineType
 from .prompt_builder import PromptBuilder, StyleParameters
 from .controlnet_adapter import ControlNetAdapter
 
 logger = logging.getLogger(__name__)
 
+# A model that answered 503 (cold start / "currently loading") is skipped for
+# this long, so other variations fall through to the fallback immediately
+MODEL_COOLDOWN_SECONDS = 30
+
+# Model name -> time.monotonic() of its last 503 response; module-level so
+# the cooldown carries over to the engines of later requests
+_model_unavailable: Dict[str, float] = {}
+
+# Pooled HTTP sessions shared by all engine instances, since engines are
+# created per request; a session is bound to its event loop, so one is kept
+# per running loop. Closed by close_http_session() at app shutdown
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+    weakref.WeakKeyDictionary()
+
+# asyncio primitives belong to one event loop, so the shared semaphores are
+# kept per loop (and dropped with it) rather than per process
+_inflight_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+# Variations returned per request, and the most seeds attempted for them
+VARIATIONS_REQUIRED = 3
+MAX_VARIATION_ATTEMPTS = 5
+
+# (request attribute, predicate, error message), checked in order
+_VALIDATORS = (
+    ('primary_image', bool, "Primary image is required for image-to-image transformation"),
+    ('furniture_style', bool, "Furniture style is required"),
+    ('image_strength', lambda v: 0.1 <= v <= 1.0, "Image strength must be between 0.1 and 1.0"),
+    ('num_inference_steps', lambda v: 10 <= v <= 100, "Number of inference steps must be between 10 and 100"),
+)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _build_payload_body(
+    prompt: str,
+    negative_prompt: str,
+    image_json: bytes,
+    seed: int,
+    strength: float,
+    guidance_scale: float,
+    num_inference_steps: int
+) -> bytes:
+    """
+    Build the img2img request body around an already JSON-encoded image.
+    
+    Base64 needs no JSON escaping, so the image is spliced in as-is instead
+    of being re-scanned by the serializer; only the small fields are encoded.
+    """
+    return b''.join((
+        b'{"inputs":{"prompt":', _json_dumps(prompt),
+        b',"negative_prompt":', _json_dumps(negative_prompt),
+        b',"image":', image_json,
+        b',"strength":', _json_dumps(strength),
+        b',"guidance_scale":', _json_dumps(guidance_scale),
+        b',"num_inference_steps":', _json_dumps(num_inference_steps),
+        b',"seed":', _json_dumps(seed),
+        b'},"parameters":{"use_cache":false}}'
+    ))
+
+
+def _get_inflight_semaphore(limit: int) -> asyncio.Semaphore:
+    """Shared bound on in-flight HF calls across all engine instances on the running loop."""
+    semaphores = _inflight_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(limit)
+    if semaphore is None:
+        semaphore = semaphores[limit] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """
+    Get or create the shared pooled HTTP session for the running event loop.
+    
+    Creation has no await point, so concurrent variations cannot race
+    to build two sessions.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = _sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=16,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            ),
+            timeout=aiohttp.ClientTimeout(total=120)
+        )
+    return session
+
+
+async def close_http_session() -> None:
+    """Close the running loop's shared HTTP session (called on application shutdown)."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+@dataclass(slots=True, frozen=True)
+class InteriorEngineConfig:
+    """Validated settings for InteriorDesignSpecificEngine."""
+    hf_api_key: str
+    max_retries: int = 3
+    retry_delay: int = 2
+    use_controlnet: bool = True
+    max_concurrent: int = 3
+    # Full settings mapping for components that read their own keys
+    # (BaseEngine, ControlNetAdapter)
+    options: Mapping[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> "InteriorEngineConfig":
+        """
+        Validate a plain configuration dictionary.
+        
+        Raises:
+            ValueError: If the HuggingFace API key is missing
+        """
+        hf_api_key = config.get('hf_api_key')
+        if not hf_api_key:
+            raise ValueError("HuggingFace API key is required")
+        
+        return cls(
+            hf_api_key=hf_api_key,
+            max_retries=config.get('max_retries', 3),
+            retry_delay=config.get('retry_delay', 2),
+            use_controlnet=config.get('use_controlnet', True),
+            max_concurrent=config.get('max_concurrent', 3),
+            options=config
+        )
+
 
 class InteriorDesignSpecificEngine(BaseEngine):
     """
@@ -41,57 +195,76 @@ class InteriorDesignSpecificEngine(BaseEngine):
     - Interior design specific conditioning
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    __slots__ = (
+        'hf_api_key', '_headers', 'primary_model', 'primary_controlnet',
+        'max_retries', 'retry_delay', 'use_controlnet', 'max_concurrent',
+        'generation_count', 'total_api_calls', 'failed_calls', 'prompt_builder',
+        'controlnet_adapter'
+    )
+    
+    # INTERIOR DESIGN SPECIFIC MODELS (identical for every instance)
+    interior_models = {
+        'finetuned_rooms': {
+            'name': 'Osama03/Finetuned_diffusion_interiordesign',
+            'url': 'https://api-inference.huggingface.co/models/Osama03/Finetuned_diffusion_interiordesign',
+            'specialization': 'Fine-tuned specifically for room layouts and designs',
+            'training': 'Custom dataset of diverse room images using LoRA',
+            'base_model': 'CompVis/stable-diffusion-v1-4',
+            'quality': 'Specialized for interiors'
+        },
+        'sdxl_base': {
+            'name': 'stabilityai/stable-diffusion-xl-base-1.0',
+            'url': 'https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0',
+            'specialization': 'High-quality general image generation',
+            'training': 'Stability AI official model',
+            'base_model': 'SDXL Base 1.0',
+            'quality': 'Excellent (1024x1024)'
+        }
+    }
+    
+    # Model key -> (POST url, HF model id), resolved once
+    _model_endpoints = {
+        name: (model['url'], model['name']) for name, model in interior_models.items()
+    }
+    
+    # INTERIOR DESIGN SPECIFIC CONTROLNETS
+    interior_controlnets = {
+        'room_segmentation': {
+            'name': 'BertChristiaens/controlnet-seg-room',
+            'specialization': 'Room segmentation with 130k training images',
+            'training': '15 room types, 30 design styles',
+            'base': 'lllyasviel/control_v11p_sd15_seg'
+        },
+        'interior_design': {
+            'name': 'ellljoy/controlnet-interior-design',
+            'specialization': 'Interior design conditioning',
+            'base': 'runwayml/stable-diffusion-v1-5'
+        },
+        'canny': {
+            'name': 'lllyasviel/sd-controlnet-canny',
+            'specialization': 'Edge detection for layout preservation',
+            'base': 'Standard Canny ControlNet'
+        }
+    }
+    
+    def __init__(self, config: Union[InteriorEngineConfig, Dict[str, Any]]):
         """
         Initialize Interior Design Specific Engine.
         
         Args:
-            config: Engine configuration
+            config: Engine configuration, ideally an InteriorEngineConfig
+                validated once at startup; a plain dictionary is validated here
         """
-        super().__init__(config)
+        if not isinstance(config, InteriorEngineConfig):
+            config = InteriorEngineConfig.from_dict(config)
+        super().__init__(config.options)
         
-        self.hf_api_key = config.get('hf_api_key')
-        if not self.hf_api_key:
-            raise ValueError("HuggingFace API key is required")
-        
-        # INTERIOR DESIGN SPECIFIC MODELS
-        self.interior_models = {
-            'finetuned_rooms': {
-                'name': 'Osama03/Finetuned_diffusion_interiordesign',
-                'url': 'https://api-inference.huggingface.co/models/Osama03/Finetuned_diffusion_interiordesign',
-                'specialization': 'Fine-tuned specifically for room layouts and designs',
-                'training': 'Custom dataset of diverse room images using LoRA',
-                'base_model': 'CompVis/stable-diffusion-v1-4',
-                'quality': 'Specialized for interiors'
-            },
-            'sdxl_base': {
-                'name': 'stabilityai/stable-diffusion-xl-base-1.0',
-                'url': 'https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0',
-                'specialization': 'High-quality general image generation',
-                'training': 'Stability AI official model',
-                'base_model': 'SDXL Base 1.0',
-                'quality': 'Excellent (1024x1024)'
-            }
-        }
+        self.hf_api_key = config.hf_api_key
         
-        # INTERIOR DESIGN SPECIFIC CONTROLNETS
-        self.interior_controlnets = {
-            'room_segmentation': {
-                'name': 'BertChristiaens/controlnet-seg-room',
-                'specialization': 'Room segmentation with 130k training images',
-                'training': '15 room types, 30 design styles',
-                'base': 'lllyasviel/control_v11p_sd15_seg'
-            },
-            'interior_design': {
-                'name': 'ellljoy/controlnet-interior-design',
-                'specialization': 'Interior design conditioning',
-                'base': 'runwayml/stable-diffusion-v1-5'
-            },
-            'canny': {
-                'name': 'lllyasviel/sd-controlnet-canny',
-                'specialization': 'Edge detection for layout preservation',
-                'base': 'Standard Canny ControlNet'
-            }
+        # Request headers are the same for every call, so build them once
+        self._headers = {
+            "Authorization": f"Bearer {self.hf_api_key}",
+            "Content-Type": "application/json"
         }
         
         # Default configurations
@@ -99,17 +272,18 @@ class InteriorDesignSpecificEngine(BaseEngine):
         self.primary_controlnet = 'room_segmentation'  # Use room segmentation
         
         # Configuration
-        self.max_retries = config.get('max_retries', 3)
-        self.retry_delay = config.get('retry_delay', 2)
-        self.use_controlnet = config.get('use_controlnet', True)
+        self.max_retries = config.max_retries
+        self.retry_delay = config.retry_delay
+        self.use_controlnet = config.use_controlnet
         
-        # Initialize HTTP session
-        self.session = None
+        # Bound on variations generated concurrently against HF Inference,
+        # shared by every engine on the running loop
+        self.max_concurrent = config.max_concurrent
         
-        self.logger.info(f"Initialized INTERIOR DESIGN SPECIFIC Engine")
-        self.logger.info(f"Primary Model: {self.interior_models[self.primary_model]['name']}")
-        self.logger.info(f"Specialization: {self.interior_models[self.primary_model]['specialization']}")
-        self.logger.info(f"ControlNet: {self.interior_controlnets[self.primary_controlnet]['name']}")
+        self.logger.info("Initialized INTERIOR DESIGN SPECIFIC Engine")
+        self.logger.info("Primary Model: %s", self.interior_models[self.primary_model]['name'])
+        self.logger.info("Specialization: %s", self.interior_models[self.primary_model]['specialization'])
+        self.logger.info("ControlNet: %s", self.interior_controlnets[self.primary_controlnet]['name'])
         self.logger.info("🏠 Specialized for Interior Design Image-to-Image Transformation")
         
         # Performance tracking
@@ -119,24 +293,12 @@ class InteriorDesignSpecificEngine(BaseEngine):
         
         # Initialize components
         self.prompt_builder = PromptBuilder()
-        self.controlnet_adapter = ControlNetAdapter(config)
+        self.controlnet_adapter = ControlNetAdapter(config.options)
     
     def _get_engine_type(self) -> EngineType:
         """Get engine type for abstract base class."""
         return EngineType.HF_INFERENCE
     
-    async def _get_session(self):
-        """Get or create HTTP session."""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
-    
-    async def _close_session(self):
-        """Close HTTP session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-    
     async def health_check(self) -> bool:
         """
         Check if the HuggingFace API is accessible.
@@ -145,19 +307,14 @@ class InteriorDesignSpecificEngine(BaseEngine):
             True if healthy, False otherwise
         """
         try:
-            session = await self._get_session()
+            session = _get_session()
             model_url = self.interior_models[self.primary_model]['url']
             
-            headers = {
-                "Authorization": f"Bearer {self.hf_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            async with session.get(model_url, headers=headers) as response:
+            async with session.get(model_url, headers=self._headers) as response:
                 return response.status == 200
                 
         except Exception as e:
-            self.logger.error(f"Health check failed: {e}")
+            self.logger.error("Health check failed: %s", e)
             return False
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -202,17 +359,9 @@ class InteriorDesignSpecificEngine(BaseEngine):
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not request.primary_image:
-            return False, "Primary image is required for image-to-image transformation"
-        
-        if not request.furniture_style:
-            return False, "Furniture style is required"
-        
-        if request.image_strength < 0.1 or request.image_strength > 1.0:
-            return False, "Image strength must be between 0.1 and 1.0"
-        
-        if request.num_inference_steps < 10 or request.num_inference_steps > 100:
-            return False, "Number of inference steps must be between 10 and 100"
+        for attr, is_valid, error_message in _VALIDATORS:
+            if not is_valid(getattr(request, attr)):
+                return False, error_message
         
         return True, None
     
@@ -226,71 +375,52 @@ class InteriorDesignSpecificEngine(BaseEngine):
         Returns:
             List of seed values
         """
-        import random
-        return [random.randint(0, 2**32 - 1) for _ in range(count)]
+        # One urandom call unpacked as little-endian uint32s in C
+        return list(struct.unpack(f'<{count}I', os.urandom(4 * count)))
     
     async def _generate_with_interior_model(
         self,
         model_name: str,
-        prompt: str,
-        negative_prompt: str,
-        image_base64: str,
-        seed: int,
-        strength: float = 0.8,
-        guidance_scale: float = 7.5,
-        num_inference_steps: int = 30
+        body: bytes
     ) -> Optional[str]:
         """
         Generate image using interior design specific model.
         
         Args:
             model_name: Model identifier
-            prompt: Positive prompt
-            negative_prompt: Negative prompt
-            image_base64: Base64 encoded input image
-            seed: Random seed
-            strength: Image strength for img2img
-            guidance_scale: Guidance scale
-            num_inference_steps: Number of inference steps
+            body: Serialized img2img payload from _build_payload_body
             
         Returns:
             Generated image URL or None if failed
         """
+        unavailable_since = _model_unavailable.get(model_name)
+        if unavailable_since is not None:
+            if time.monotonic() - unavailable_since < MODEL_COOLDOWN_SECONDS:
+                self.logger.info("Skipping %s: still loading on HF Inference", model_name)
+                return None
+            _model_unavailable.pop(model_name, None)
+        
         try:
-            session = await self._get_session()
-            model_config = self.interior_models[model_name]
+            session = _get_session()
+            url, model_id = self._model_endpoints[model_name]
             
-            headers = {
-                "Authorization": f"Bearer {self.hf_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Prepare payload for image-to-image
-            payload = {
-                "inputs": {
-                    "prompt": prompt,
-                    "negative_prompt": negative_prompt,
-                    "image": image_base64,
-                    "strength": strength,
-                    "guidance_scale": guidance_scale,
-                    "num_inference_steps": num_inference_steps,
-                    "seed": seed
-                },
-                "parameters": {
-                    "use_cache": False
-                }
-            }
-            
-            self.logger.info(f"Generating with interior design model: {model_config['name']}")
+            self.logger.info("Generating with interior design model: %s", model_id)
             
             async with session.post(
-                f"{model_config['url']}",
-                headers=headers,
-                json=payload
+                url,
+                headers=self._headers,
+                data=body
             ) as response:
                 
                 if response.status == 200:
-                    result = await response.json()
+                    raw = await response.read()
+                    
+                    # Image models answer with the raw image bytes; encode
+                    # them directly instead of going through JSON
+                    if response.content_type.startswith('image/'):
+                        return base64.b64encode(raw).decode('ascii')
+                    
+                    result = _json_loads(raw)
                     
                     # Handle different response formats
                     if isinstance(result, list) and len(result) > 0:
@@ -299,22 +429,27 @@ class InteriorDesignSpecificEngine(BaseEngine):
                     elif isinstance(result, dict) and 'image' in result:
                         return result['image']
                     else:
-                        self.logger.error(f"Unexpected response format: {type(result)}")
+                        self.logger.error("Unexpected response format: %s", type(result))
                         return None
                 else:
+                    if response.status == 503:
+                        _model_unavailable[model_name] = time.monotonic()
                     error_text = await response.text()
-                    self.logger.error(f"API error: {response.status} - {error_text}")
+                    self.logger.error("API error: %s - %s", response.status, error_text)
                     return None
                     
         except Exception as e:
-            self.logger.error(f"Generation failed with interior model {model_name}: {e}")
+            self.logger.error("Generation failed with interior model %s: %s", model_name, e)
             return None
     
     async def _generate_single_variation(
         self,
         request: GenerationRequest,
         seed: int,
-        variation_index: int
+        variation_index: int,
+        positive_prompt: str,
+        negative_prompt: str,
+        image_json: bytes
     ) -> Optional[str]:
         """
         Generate a single design variation using interior design specific models.
@@ -323,60 +458,51 @@ class InteriorDesignSpecificEngine(BaseEngine):
             request: Generation request
             seed: Random seed for reproducibility
             variation_index: Index of this variation
+            positive_prompt: Positive prompt, shared by all variations
+            negative_prompt: Negative prompt, shared by all variations
+            image_json: Primary image as a JSON string literal of its base64,
+                shared by all variations
             
         Returns:
             Generated image URL or None if failed
         """
         try:
-            # Build optimized prompt for interior design
-            style_params = StyleParameters(
-                room_type=request.room_type,
-                furniture_style=request.furniture_style,
-                wall_color=request.wall_color,
-                flooring_material=request.flooring_material
+            # Prepare payload for image-to-image once; the fallback model
+            # receives the same body
+            body = _build_payload_body(
+                positive_prompt,
+                negative_prompt,
+                image_json,
+                seed,
+                request.image_strength,
+                request.guidance_scale,
+                request.num_inference_steps
             )
             
-            positive_prompt = self.prompt_builder.build_positive_prompt(style_params)
-            negative_prompt = self.prompt_builder.build_negative_prompt()
-            
-            # Convert image to base64
-            image_base64 = base64.b64encode(request.primary_image).decode('utf-8')
-            
-            # Try interior design specific model first
-            generated_image = await self._generate_with_interior_model(
-                model_name=self.primary_model,
-                prompt=positive_prompt,
-                negative_prompt=negative_prompt,
-                image_base64=image_base64,
-                seed=seed,
-                strength=request.image_strength,
-                guidance_scale=request.guidance_scale,
-                num_inference_steps=request.num_inference_steps
-            )
-            
-            if not generated_image:
-                # Try fallback model (SDXL Base)
-                self.logger.info(f"Interior specific model failed, trying SDXL Base")
+            async with _get_inflight_semaphore(self.max_concurrent):
+                # Try interior design specific model first
                 generated_image = await self._generate_with_interior_model(
-                    model_name='sdxl_base',
-                    prompt=positive_prompt,
-                    negative_prompt=negative_prompt,
-                    image_base64=image_base64,
-                    seed=seed,
-                    strength=request.image_strength,
-                    guidance_scale=request.guidance_scale,
-                    num_inference_steps=request.num_inference_steps
+                    model_name=self.primary_model,
+                    body=body
                 )
             
+                if not generated_image:
+                    # Try fallback model (SDXL Base)
+                    self.logger.info("Interior specific model failed, trying SDXL Base")
+                    generated_image = await self._generate_with_interior_model(
+                        model_name='sdxl_base',
+                        body=body
+                    )
+            
             if generated_image:
-                self.logger.info(f"✅ Successfully generated variation {variation_index + 1} with INTERIOR DESIGN model")
+                self.logger.info("✅ Successfully generated variation %s with INTERIOR DESIGN model", variation_index + 1)
                 return generated_image
             else:
-                self.logger.error(f"❌ Failed to generate variation {variation_index + 1}")
+                self.logger.error("❌ Failed to generate variation %s", variation_index + 1)
                 return None
                 
         except Exception as e:
-            self.logger.error(f"Failed to generate variation {variation_index + 1}: {e}")
+            self.logger.error("Failed to generate variation %s: %s", variation_index + 1, e)
             return None
     
     async def generate_img2img(self, request: GenerationRequest) -> GenerationResult:
@@ -401,21 +527,55 @@ class InteriorDesignSpecificEngine(BaseEngine):
                     engine_used=self.engine_type.value
                 )
             
-            # Prepare seeds
+            # Prepare seeds; extra caller-supplied seeds are spare attempts
             if request.seeds is None:
-                seeds = self.prepare_seeds(3)
+                seeds = self.prepare_seeds(VARIATIONS_REQUIRED)
             else:
-                seeds = request.seeds[:3]
+                seeds = request.seeds[:MAX_VARIATION_ATTEMPTS]
             
-            # Generate images
-            generated_images = []
-            for i, seed in enumerate(seeds):
-                image_url = await self._generate_single_variation(request, seed, i)
-                if image_url:
-                    generated_images.append(image_url)
-                    self.logger.info(f"Generated variation {i+1}")
-                else:
-                    self.logger.warning(f"Failed to generate variation {i+1}")
+            # Convert image to base64 once, already as a JSON string literal;
+            # every variation splices the same bytes into its payload
+            image_json = b'"' + base64.b64encode(request.primary_image) + b'"'
+            
+            # Build optimized prompt for interior design; only the seed
+            # differs between variations
+            style_params = StyleParameters(
+                room_type=request.room_type,
+                furniture_style=request.furniture_style,
+                wall_color=request.wall_color,
+                flooring_material=request.flooring_material
+            )
+            
+            positive_prompt = self.prompt_builder.build_positive_prompt(style_params)
+            negative_prompt = self.prompt_builder.build_negative_prompt()
+            
+            # Generate images concurrently; the HTTP calls are I/O-bound.
+            # Once enough variations succeed the remaining attempts are
+            # cancelled so the slowest request doesn't set the latency
+            completed = {}
+            async with asyncio.TaskGroup() as tg:
+                tasks = {
+                    tg.create_task(self._generate_single_variation(
+                        request, seed, i, positive_prompt, negative_prompt, image_json
+                    )): i
+                    for i, seed in enumerate(seeds)
+                }
+                pending = set(tasks)
+                while pending and len(completed) < VARIATIONS_REQUIRED:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        i = tasks[task]
+                        image_url = task.result()
+                        if image_url and len(completed) < VARIATIONS_REQUIRED:
+                            completed[i] = image_url
+                            self.logger.info("Generated variation %s", i+1)
+                        elif not image_url:
+                            self.logger.warning("Failed to generate variation %s", i+1)
+                for task in pending:
+                    task.cancel()
+            
+            generated_images = [completed[i] for i in sorted(completed)]
+            seeds_used = [seeds[i] for i in sorted(completed)]
             
             # Check if we generated any images
             if not generated_images:
@@ -435,21 +595,19 @@ class InteriorDesignSpecificEngine(BaseEngine):
                 engine_used=self.engine_type.value,
                 model_version=self.interior_models[self.primary_model]['name'],
                 inference_time_seconds=inference_time,
-                seeds_used=seeds
+                seeds_used=seeds_used
             )
             
             self.generation_count += 1
-            self.logger.info(f"✅ Successfully generated {len(generated_images)} INTERIOR DESIGN images in {inference_time:.2f}s")
+            self.logger.info("✅ Successfully generated %s INTERIOR DESIGN images in %.2fs", len(generated_images), inference_time)
             self.logger.info("🏠 Used specialized interior design models!")
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Generation failed: {e}")
+            self.logger.error("Generation failed: %s", e)
             return GenerationResult(
                 success=False,
                 error_message=str(e),
                 engine_used=self.engine_type.value
             )
-        finally:
-            await self._close_session()
@@ -17,29 +17,114 @@ Features:
 - Commercial use allowed
 """
 
+import asyncio
+import functools
+import threading
 import time
 import io
 import logging
 import base64
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from PIL import Image
-import torch
-import numpy as np
 from pathlib import Path
 
-try:
-    from diffusers import StableDiffusionImg2ImgPipeline, ControlNetModel, DDIMScheduler
-    from diffusers.utils import load_image
-    DIFFUSERS_AVAILABLE = True
-except ImportError:
-    DIFFUSERS_AVAILABLE = False
-
 from .base_engine import BaseEngine, GenerationRequest, GenerationResult, EngineType
 from .prompt_builder import PromptBuilder, StyleParameters
 from .controlnet_adapter import ControlNetAdapter
+from app.services.storage import get_storage_service
 
 logger = logging.getLogger(__name__)
 
+# torch and diffusers are imported on first use (see _import_torch and
+# _diffusers_available): importing them costs seconds and hundreds of MB,
+# which workers that never generate should not pay
+torch = None
+DIFFUSERS_AVAILABLE: Optional[bool] = None  # None until first checked
+
+# First diffusers release whose from_single_file accepts low_cpu_mem_usage and
+# device_map; older releases (such as the pinned 0.24) load to host RAM
+SINGLE_FILE_DEVICE_MAP_VERSION = (0, 28)
+
+# Written into a converted pipeline directory once save_pretrained completes
+PIPELINE_CACHE_SENTINEL = '.complete'
+
+# Design variations generated per request, in one batched pipeline call
+NUM_VARIATIONS = 3
+
+# Models tried per seed, in order, when the batched call on the primary fails
+FALLBACK_MODELS = ('interiordesign_lulu', 'interior_design_v1')
+
+# scheduler name -> (inference steps cap, minimum steps accepted by validate_request)
+SCHEDULER_STEPS = {
+    'dpm++_2m_karras': (15, 10),
+    'lcm': (6, 4),
+    'ddim': (100, 10),
+}
+
+# LCM-LoRA distilled for each base model family
+LCM_LORAS = {
+    'SD 1.5': 'latent-consistency/lcm-lora-sdv1-5',
+    'SDXL 1.0': 'latent-consistency/lcm-lora-sdxl',
+}
+
+# LCM-distilled models degrade above this classifier-free guidance scale
+LCM_MAX_GUIDANCE = 2.0
+
+# Prompt embeddings kept per engine, keyed by (model, prompt, negative prompt)
+EMBED_CACHE_MAXSIZE = 128
+
+# Memory pool shared by the captured UNet graphs of all loaded models
+_graph_pool = None
+
+
+def _import_torch() -> Any:
+    """Import torch into the module namespace on first use."""
+    global torch
+    if torch is None:
+        import torch as _torch
+        torch = _torch
+    return torch
+
+
+@functools.lru_cache(maxsize=None)
+def _single_file_device_map_supported() -> bool:
+    """Whether the installed diffusers can place from_single_file weights on the device."""
+    import diffusers
+    try:
+        version = tuple(int(part) for part in diffusers.__version__.split('.')[:2])
+    except ValueError:
+        return False
+    return version >= SINGLE_FILE_DEVICE_MAP_VERSION
+
+
+def _diffusers_available() -> bool:
+    """Check (once) whether diffusers can be imported."""
+    global DIFFUSERS_AVAILABLE
+    if DIFFUSERS_AVAILABLE is None:
+        try:
+            import diffusers  # noqa: F401
+            DIFFUSERS_AVAILABLE = True
+        except ImportError:
+            DIFFUSERS_AVAILABLE = False
+    return DIFFUSERS_AVAILABLE
+
+
+def _decode_and_resize(data: bytes) -> Image.Image:
+    """Decode the uploaded image and resize it to the 512x512 model input."""
+    image = Image.open(io.BytesIO(data))
+    if image.size != (512, 512):
+        image = image.resize((512, 512), Image.Resampling.LANCZOS)
+    return image
+
+
+def _encode_webp(image: Image.Image) -> bytes:
+    """Encode a generated image as WebP (faster and smaller than PNG)."""
+    buffer = io.BytesIO()
+    image.save(buffer, format='WEBP', quality=90)
+    return buffer.getvalue()
+
 
 class LocalOpenSourceInteriorEngine(BaseEngine):
     """
@@ -60,16 +145,12 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
             config: Engine configuration
         """
         super().__init__(config)
-        
-        if not DIFFUSERS_AVAILABLE:
-            raise ImportError(
-                "Diffusers library is required. Install with: "
-                "pip install diffusers transformers accelerate torch"
-            )
+        _import_torch()
         
         # Model paths (local download required)
         self.models_dir = Path(config.get('models_dir', './models'))
-        self.models_dir.mkdir(exist_ok=True)
+        if not self.models_dir.exists():
+            self.models_dir.mkdir(exist_ok=True)
         
         # OPEN-SOURCE INTERIOR DESIGN MODELS
         self.interior_models = {
@@ -113,20 +194,73 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
             }
         }
         
+        # model file -> (st_size, st_mtime), or None if missing; resolved once
+        # so availability checks do not stat the (possibly networked) disk
+        self._model_manifest: Dict[Path, Optional[Tuple[int, float]]] = {}
+        self._refresh_manifest()
+        
         # Configuration
         self.device = config.get('device', 'cuda' if torch.cuda.is_available() else 'cpu')
+        # Pipelines run natively in this dtype (no autocast); BF16 on GPUs
+        # that support it avoids FP16 overflow/NaN issues at the same cost
+        if self.device == 'cuda':
+            self.torch_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        else:
+            self.torch_dtype = torch.float32
         self.primary_model = config.get('primary_model', 'interior_scene_xl')
         self.use_controlnet = config.get('use_controlnet', True)
         self.primary_controlnet = config.get('primary_controlnet', 'canny')
         
+        # Sampler used by every pipeline: DPM-Solver++ 2M Karras and LCM reach
+        # the quality of 30 DDIM steps in far fewer UNet forwards, so requested
+        # steps are capped per scheduler ("ddim" keeps the checkpoint sampler)
+        self.scheduler = config.get('scheduler', 'dpm++_2m_karras')
+        if self.scheduler not in SCHEDULER_STEPS:
+            raise ValueError(
+                f"Unknown scheduler '{self.scheduler}'. "
+                f"Available: {', '.join(SCHEDULER_STEPS)}"
+            )
+        self.max_inference_steps, self.min_inference_steps = SCHEDULER_STEPS[self.scheduler]
+        
+        # torch.compile the UNet at load time (CUDA); compilation is paid by a
+        # warm-up run inside _load_pipeline rather than by the first request
+        self.compile_model = config.get('compile_model', self.device == 'cuda')
+        self.compile_mode = config.get('compile_mode', 'reduce-overhead')
+        
+        # Optional weight-only quantization of the UNet and text encoders
+        # ("torchao_fp8" or "torchao_int8"); None keeps full-precision weights
+        self.quant_backend = config.get('quant_backend')
+        
+        # Opt-in: replay the UNet step from a captured CUDA graph when the
+        # UNet is not compiled ("reduce-overhead" already uses CUDA graphs)
+        self.cuda_graphs = config.get('cuda_graphs', False)
+        
+        # Opt-in for GPUs too small to hold the whole pipeline: components are
+        # moved to the GPU only while they run (model-level, not sequential)
+        self.model_cpu_offload = config.get('model_cpu_offload', False)
+        
+        # Upload outputs through the storage service and return their URLs
+        # instead of inline base64 data URLs (kept as the fallback)
+        self.upload_outputs = config.get('upload_outputs', False)
+        
         # Initialize pipelines
         self.pipelines = {}
         self.controlnets = {}
+        # model_name -> lock held while that pipeline loads (see _load_pipeline)
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # model_name -> (graph, static tensors) kept alive for replay
+        self._unet_graphs: Dict[str, Any] = {}
+        # LRU of text-encoder outputs; variations and repeated style presets
+        # share prompts, so the text encoder runs once per distinct prompt
+        self._embed_cache: "OrderedDict[Tuple[str, str, str], Tuple[Any, Any]]" = OrderedDict()
+        # Single thread that owns the GPU: generations queue here instead of
+        # blocking the event loop, and only GPU work is serialized
+        self._gpu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-interior-gpu")
         
-        self.logger.info(f"Initialized Local Open-Source Interior Design Engine")
-        self.logger.info(f"Device: {self.device}")
-        self.logger.info(f"Models directory: {self.models_dir}")
-        self.logger.info(f"Primary model: {self.primary_model}")
+        self.logger.info("Initialized Local Open-Source Interior Design Engine")
+        self.logger.info("Device: %s", self.device)
+        self.logger.info("Models directory: %s", self.models_dir)
+        self.logger.info("Primary model: %s", self.primary_model)
         self.logger.info("🏠 100% Open-Source - No API dependencies!")
         
         # Performance tracking
@@ -137,31 +271,78 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         # Initialize components
         self.prompt_builder = PromptBuilder()
         self.controlnet_adapter = ControlNetAdapter(config)
+        
+        # Optionally load the primary model (and ControlNet) in the background
+        # so the first request does not pay the cold-start load
+        if config.get('preload', False):
+            threading.Thread(target=self._preload, name="local-interior-preload", daemon=True).start()
     
     def _get_engine_type(self) -> EngineType:
         """Get engine type for abstract base class."""
         return EngineType.LOCAL_SDXL
     
-    def _download_model(self, model_config: Dict[str, Any]) -> bool:
+    def _preload(self) -> None:
+        """Load the primary pipeline and ControlNet (background thread)."""
+        self._load_pipeline(self.primary_model)
+        if self.use_controlnet:
+            self._load_controlnet(self.primary_controlnet)
+    
+    def _refresh_manifest(self) -> None:
+        """Stat every known model file into the manifest."""
+        for model_config in (*self.interior_models.values(), *self.controlnet_models.values()):
+            self._stat_model_file(model_config['path'])
+    
+    def _stat_model_file(self, path: Path) -> Optional[Tuple[int, float]]:
+        """Stat one model file and record it in the manifest."""
+        try:
+            st = path.stat()
+            entry = (st.st_size, st.st_mtime)
+        except OSError:
+            entry = None
+        self._model_manifest[path] = entry
+        return entry
+    
+    def _model_available(self, path: Path, refresh: bool = False) -> bool:
+        """
+        Check whether a model file is present, using the manifest.
+        
+        Files recorded as missing are re-checked, so a model downloaded
+        while the engine runs is picked up; present files are only
+        re-checked with refresh=True.
+        
+        Args:
+            path: Model file path
+            refresh: Re-stat the file even if it is recorded as present
+            
+        Returns:
+            True if the file exists
+        """
+        entry = self._model_manifest.get(path)
+        if refresh or entry is None:
+            entry = self._stat_model_file(path)
+        return entry is not None
+    
+    def _download_model(self, model_config: Dict[str, Any], refresh: bool = False) -> bool:
         """
         Download model if not exists.
         
         Args:
             model_config: Model configuration
+            refresh: Re-stat the model file instead of trusting the manifest
             
         Returns:
             True if model is available, False otherwise
         """
         model_path = model_config['path']
         
-        if model_path.exists():
-            self.logger.info(f"Model already exists: {model_path}")
+        if self._model_available(model_path, refresh):
+            self.logger.info("Model already exists: %s", model_path)
             return True
         
-        self.logger.warning(f"Model not found: {model_path}")
-        self.logger.info(f"Please download from: {model_config['url']}")
-        self.logger.info(f"Save as: {model_path}")
-        self.logger.info(f"Size: {model_config['size']}")
+        self.logger.warning("Model not found: %s", model_path)
+        self.logger.info("Please download from: %s", model_config['url'])
+        self.logger.info("Save as: %s", model_path)
+        self.logger.info("Size: %s", model_config['size'])
         
         return False
     
@@ -169,6 +350,10 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         """
         Load diffusion pipeline for model.
         
+        The preload thread and the GPU thread can ask for the same model at
+        once; a per-model lock makes the later caller wait for the first
+        load instead of putting a second copy in VRAM.
+        
         Args:
             model_name: Model identifier
             
@@ -178,51 +363,297 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         if model_name in self.pipelines:
             return True
         
+        with self._load_locks.setdefault(model_name, threading.Lock()):
+            if model_name in self.pipelines:
+                return True
+            return self._create_pipeline(model_name)
+    
+    def _create_pipeline(self, model_name: str) -> bool:
+        """
+        Load, optimize and register the pipeline for a model.
+        
+        Called by _load_pipeline with the model's load lock held.
+        
+        Args:
+            model_name: Model identifier
+            
+        Returns:
+            True if pipeline loaded successfully
+        """
+        if not _diffusers_available():
+            self.logger.error(
+                "Diffusers library is required. Install with: "
+                "pip install diffusers transformers accelerate torch"
+            )
+            return False
+        
+        from diffusers import StableDiffusionImg2ImgPipeline
+        from diffusers.models.attention_processor import AttnProcessor2_0
+        
         model_config = self.interior_models[model_name]
+        cache_dir = self.models_dir / '.cache' / model_name
+        cached = (cache_dir / PIPELINE_CACHE_SENTINEL).exists()
         
-        if not self._download_model(model_config):
+        if not cached and not self._download_model(model_config):
             return False
         
         try:
+            if cached:
+                # Converted diffusers layout: weights are memory-mapped, with
+                # no checkpoint key renaming or config inference
+                pipeline = StableDiffusionImg2ImgPipeline.from_pretrained(
+                    cache_dir,
+                    torch_dtype=self.torch_dtype,
+                    local_files_only=True
+                )
             # Load pipeline based on base model
-            if 'SDXL' in model_config['base_model']:
+            elif 'SDXL' in model_config['base_model']:
                 # SDXL pipeline
                 pipeline = StableDiffusionImg2ImgPipeline.from_single_file(
                     model_config['path'],
-                    torch_dtype=torch.float16 if self.device == 'cuda' else torch.float32,
+                    torch_dtype=self.torch_dtype,
                     use_safetensors=True,
-                    variant="fp16" if self.device == 'cuda' else None
+                    variant="fp16" if self.torch_dtype == torch.float16 else None
                 )
             else:
                 # SD 1.5 pipeline
                 pipeline = StableDiffusionImg2ImgPipeline.from_single_file(
                     model_config['path'],
-                    torch_dtype=torch.float16 if self.device == 'cuda' else torch.float32,
+                    torch_dtype=self.torch_dtype,
                     use_safetensors=True
                 )
             
-            # Move to device
-            pipeline = pipeline.to(self.device)
+            if not cached:
+                self._save_pipeline_cache(pipeline, cache_dir)
             
-            # Enable memory efficient attention if available
-            if hasattr(pipeline, "enable_xformers_memory_efficient_attention"):
-                try:
-                    pipeline.enable_xformers_memory_efficient_attention()
-                except Exception:
-                    pass
+            # Move to device, or let model-level offload move each component
+            # to the GPU only while it runs
+            offload = self.model_cpu_offload and self.device == 'cuda'
+            if offload:
+                pipeline.enable_model_cpu_offload()
+            else:
+                pipeline = pipeline.to(self.device)
             
-            # Enable CPU offload if using CPU
-            if self.device == 'cpu':
-                pipeline.enable_sequential_cpu_offload()
+            # NHWC suits tensor-core convolutions and torch.compile fusion;
+            # on CPU it can regress, so GPU only
+            if self.device == 'cuda':
+                pipeline.unet.to(memory_format=torch.channels_last)
+                pipeline.vae.to(memory_format=torch.channels_last)
+            
+            self._set_scheduler(pipeline, model_config)
+            
+            # Encode/decode the batched variations one image and one tile at
+            # a time, bounding VAE peak memory
+            pipeline.enable_vae_slicing()
+            pipeline.enable_vae_tiling()
+            
+            # Native scaled_dot_product_attention (Flash / memory-efficient
+            # kernels); unlike xformers it needs no extra wheel and traces
+            # under torch.compile(fullgraph=True)
+            pipeline.unet.set_attn_processor(AttnProcessor2_0())
+            
+            # Quantize before compiling so the compiled graph uses the
+            # quantized weights
+            if self.quant_backend and self.device == 'cuda':
+                self._quantize_pipeline(pipeline, model_name)
+            
+            # Compile for better performance (PyTorch 2.0+)
+            if self.compile_model and hasattr(torch, 'compile'):
+                self._compile_unet(pipeline, model_name)
+            elif self.cuda_graphs and self.device == 'cuda' and not offload:
+                self._capture_unet_graph(pipeline, model_name)
             
             self.pipelines[model_name] = pipeline
-            self.logger.info(f"Loaded pipeline: {model_name}")
+            self.logger.info("Loaded pipeline: %s", model_name)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to load pipeline {model_name}: {e}")
+            self.logger.error("Failed to load pipeline %s: %s", model_name, e)
             return False
     
+    def _save_pipeline_cache(self, pipeline: Any, cache_dir: Path) -> None:
+        """
+        Save a pipeline loaded from a single file in diffusers format.
+        
+        Later loads read the converted copy instead of re-parsing the
+        checkpoint. The sentinel is written last, so a partial save is never
+        treated as a cache hit.
+        
+        Args:
+            pipeline: Pipeline freshly loaded from the single-file checkpoint
+            cache_dir: Directory for the converted pipeline
+        """
+        try:
+            pipeline.save_pretrained(cache_dir, safe_serialization=True)
+            (cache_dir / PIPELINE_CACHE_SENTINEL).touch()
+            self.logger.info("Cached converted pipeline at %s", cache_dir)
+        except Exception as e:
+            self.logger.warning("Failed to cache pipeline at %s: %s", cache_dir, e)
+    
+    def _set_scheduler(self, pipeline: Any, model_config: Dict[str, Any]) -> None:
+        """
+        Swap the checkpoint scheduler for the configured one.
+        
+        For LCM the matching LCM-LoRA is loaded and fused into the weights,
+        so sampling pays no per-step LoRA cost and later quantization and
+        compilation see plain weights.
+        
+        Args:
+            pipeline: Loaded img2img pipeline
+            model_config: Entry from interior_models
+        """
+        from diffusers import DPMSolverMultistepScheduler, LCMScheduler
+        
+        if self.scheduler == 'dpm++_2m_karras':
+            pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
+                pipeline.scheduler.config,
+                use_karras_sigmas=True,
+                algorithm_type="dpmsolver++"
+            )
+        elif self.scheduler == 'lcm':
+            pipeline.scheduler = LCMScheduler.from_config(pipeline.scheduler.config)
+            pipeline.load_lora_weights(LCM_LORAS[model_config['base_model']])
+            pipeline.fuse_lora()
+    
+    def _quantize_pipeline(self, pipeline: Any, model_name: str) -> None:
+        """
+        Apply weight-only quantization to the UNet and text encoders.
+        
+        torchao's quantize_ only swaps Linear weights, so embeddings and
+        norms stay in the pipeline dtype. Leaves the pipeline unchanged if
+        torchao is missing or the backend is unknown.
+        
+        Args:
+            pipeline: Loaded img2img pipeline
+            model_name: Model identifier (for logging)
+        """
+        try:
+            from torchao.quantization import quantize_, float8_weight_only, int8_weight_only
+        except ImportError:
+            self.logger.warning("torchao is not installed; skipping quantization")
+            return
+        
+        schemes = {
+            'torchao_fp8': float8_weight_only,
+            'torchao_int8': int8_weight_only
+        }
+        if self.quant_backend not in schemes:
+            self.logger.warning("Unknown quant_backend %r; skipping quantization", self.quant_backend)
+            return
+        
+        try:
+            for component in ('unet', 'text_encoder', 'text_encoder_2'):
+                module = getattr(pipeline, component, None)
+                if module is not None:
+                    quantize_(module, schemes[self.quant_backend]())
+            self.logger.info("Quantized %s with %s", model_name, self.quant_backend)
+        except Exception as e:
+            self.logger.warning("Failed to quantize %s: %s", model_name, e)
+    
+    def _compile_unet(self, pipeline: Any, model_name: str) -> None:
+        """
+        Compile the pipeline UNet and run one warm-up generation.
+        
+        Inputs are always resized to 512x512 and variations are batched, so a
+        single warm-up at that size and batch covers the shapes seen by
+        requests. Falls back to the eager UNet if compilation fails.
+        
+        Args:
+            pipeline: Loaded img2img pipeline
+            model_name: Model identifier (for logging)
+        """
+        eager_unet = pipeline.unet
+        try:
+            pipeline.unet = torch.compile(eager_unet, mode=self.compile_mode, fullgraph=True)
+            
+            start = time.time()
+            pipeline(
+                prompt="interior design",
+                image=Image.new('RGB', (512, 512)),
+                strength=0.8,
+                num_inference_steps=5,
+                num_images_per_prompt=NUM_VARIATIONS,
+                return_dict=True
+            )
+            self.logger.info("Compiled UNet for %s (warm-up %.1fs)", model_name, time.time() - start)
+        except Exception as e:
+            pipeline.unet = eager_unet
+            self.logger.warning("Failed to compile UNet for %s: %s", model_name, e)
+    
+    def _capture_unet_graph(self, pipeline: Any, model_name: str) -> None:
+        """
+        Capture the UNet step into a CUDA graph and replay it each step.
+        
+        The graph covers the shapes every request uses: NUM_VARIATIONS batched
+        512x512 inputs with classifier-free guidance (batch of
+        2 * NUM_VARIATIONS). Calls with any other shape, such as the
+        per-variation fallback, or
+        extra conditioning run the eager UNet. SDXL UNets need additional
+        conditioning inputs and are left eager.
+        
+        Args:
+            pipeline: Loaded img2img pipeline
+            model_name: Model identifier (for logging)
+        """
+        global _graph_pool
+        unet = pipeline.unet
+        if getattr(unet.config, 'addition_embed_type', None):
+            return
+        
+        try:
+            from diffusers.models.unet_2d_condition import UNet2DConditionOutput
+            
+            latent_size = 512 // pipeline.vae_scale_factor
+            # channels_last, matching the UNet weights set in _load_pipeline
+            static_sample = torch.zeros(
+                2 * NUM_VARIATIONS, unet.config.in_channels, latent_size, latent_size,
+                device=self.device, dtype=unet.dtype
+            ).contiguous(memory_format=torch.channels_last)
+            static_timestep = torch.zeros((), device=self.device, dtype=torch.float32)
+            static_context = torch.zeros(
+                2 * NUM_VARIATIONS, pipeline.tokenizer.model_max_length, pipeline.text_encoder.config.hidden_size,
+                device=self.device, dtype=unet.dtype
+            )
+            
+            if _graph_pool is None:
+                _graph_pool = torch.cuda.graph_pool_handle()
+            
+            with torch.no_grad():
+                # Warm up on a side stream before capture, as CUDA graphs require
+                stream = torch.cuda.Stream()
+                stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(stream):
+                    for _ in range(3):
+                        unet(static_sample, static_timestep, encoder_hidden_states=static_context, return_dict=False)
+                torch.cuda.current_stream().wait_stream(stream)
+                
+                graph = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(graph, pool=_graph_pool):
+                    static_out = unet(
+                        static_sample, static_timestep, encoder_hidden_states=static_context, return_dict=False
+                    )[0]
+            
+            eager_forward = unet.forward
+            
+            def forward(sample, timestep, encoder_hidden_states, *args, return_dict=True, **kwargs):
+                if (args or any(value is not None for value in kwargs.values())
+                        or sample.shape != static_sample.shape
+                        or encoder_hidden_states.shape != static_context.shape):
+                    return eager_forward(sample, timestep, encoder_hidden_states, *args,
+                                         return_dict=return_dict, **kwargs)
+                static_sample.copy_(sample)
+                static_timestep.fill_(timestep)
+                static_context.copy_(encoder_hidden_states)
+                graph.replay()
+                out = static_out.clone()
+                return UNet2DConditionOutput(sample=out) if return_dict else (out,)
+            
+            unet.forward = forward
+            self._unet_graphs[model_name] = (graph, static_sample, static_timestep, static_context, static_out)
+            self.logger.info("Captured CUDA graph for %s UNet", model_name)
+        except Exception as e:
+            self.logger.warning("Failed to capture CUDA graph for %s: %s", model_name, e)
+    
     def _load_controlnet(self, controlnet_name: str) -> bool:
         """
         Load ControlNet model.
@@ -236,38 +667,56 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         if controlnet_name in self.controlnets:
             return True
         
+        if not _diffusers_available():
+            return False
+        
+        from diffusers import ControlNetModel
+        
         controlnet_config = self.controlnet_models[controlnet_name]
         
         if not self._download_model(controlnet_config):
             return False
         
         try:
-            controlnet = ControlNetModel.from_single_file(
-                controlnet_config['path'],
-                torch_dtype=torch.float16 if self.device == 'cuda' else torch.float32
-            ).to(self.device)
+            if _single_file_device_map_supported():
+                # Weights are memory-mapped and placed straight on the device,
+                # without a full host-RAM copy first
+                controlnet = ControlNetModel.from_single_file(
+                    controlnet_config['path'],
+                    torch_dtype=self.torch_dtype,
+                    low_cpu_mem_usage=True,
+                    device_map={"": self.device}
+                )
+            else:
+                controlnet = ControlNetModel.from_single_file(
+                    controlnet_config['path'],
+                    torch_dtype=self.torch_dtype
+                ).to(self.device)
             
             self.controlnets[controlnet_name] = controlnet
-            self.logger.info(f"Loaded ControlNet: {controlnet_name}")
+            self.logger.info("Loaded ControlNet: %s", controlnet_name)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to load ControlNet {controlnet_name}: {e}")
+            self.logger.error("Failed to load ControlNet %s: %s", controlnet_name, e)
             return False
     
-    async def health_check(self) -> bool:
+    async def health_check(self, refresh: bool = False) -> bool:
         """
         Check if the local models are available.
         
+        Args:
+            refresh: Re-stat the model file instead of trusting the manifest
+        
         Returns:
             True if models are available, False otherwise
         """
         try:
             # Check if primary model is available
             model_config = self.interior_models[self.primary_model]
-            return model_config['path'].exists()
+            return self._model_available(model_config['path'], refresh)
         except Exception as e:
-            self.logger.error(f"Health check failed: {e}")
+            self.logger.error("Health check failed: %s", e)
             return False
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -288,6 +737,7 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
             "model_size": model_config['size'],
             "license": model_config['license'],
             "device": self.device,
+            "scheduler": self.scheduler,
             "available_models": list(self.interior_models.keys()),
             "available_controlnets": list(self.controlnet_models.keys()),
             "cost": "💰 100% FREE (No API costs)",
@@ -329,8 +779,8 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         if request.image_strength < 0.1 or request.image_strength > 1.0:
             return False, "Image strength must be between 0.1 and 1.0"
         
-        if request.num_inference_steps < 10 or request.num_inference_steps > 100:
-            return False, "Number of inference steps must be between 10 and 100"
+        if request.num_inference_steps < self.min_inference_steps or request.num_inference_steps > 100:
+            return False, f"Number of inference steps must be between {self.min_inference_steps} and 100"
         
         return True, None
     
@@ -344,8 +794,8 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         Returns:
             List of seed values
         """
-        import random
-        return [random.randint(0, 2**32 - 1) for _ in range(count)]
+        import numpy as np
+        return np.random.default_rng().integers(0, 2**32, size=count, dtype=np.int64).tolist()
     
     def _generate_with_local_model(
         self,
@@ -353,135 +803,290 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
         prompt: str,
         negative_prompt: str,
         input_image: Image.Image,
-        seed: int,
+        seeds: List[int],
         strength: float = 0.8,
         guidance_scale: float = 7.5,
-        num_inference_steps: int = 30
-    ) -> Optional[Image.Image]:
+        num_inference_steps: int = 30,
+        encoded: Optional[Dict[Any, Any]] = None
+    ) -> Optional[List[Image.Image]]:
         """
-        Generate image using local model.
+        Generate images using local model, one per seed, in a single batch.
+        
+        Prompt embeddings come from the engine's embedding cache and the
+        input image is VAE-encoded once for the whole batch; each sample draws
+        its latent sample and noise from its own seeded generator, so results
+        match single-seed runs.
         
         Args:
             model_name: Model identifier
             prompt: Positive prompt
             negative_prompt: Negative prompt
             input_image: Input PIL Image
-            seed: Random seed
+            seeds: Random seed per output image
             strength: Image strength for img2img
-            guidance_scale: Guidance scale
-            num_inference_steps: Number of inference steps
+            guidance_scale: Guidance scale (capped for LCM)
+            num_inference_steps: Number of inference steps (capped per scheduler)
+            encoded: Per-request cache of the encoded input image, shared
+                across fallback models (see _image_latents)
             
         Returns:
-            Generated PIL Image or None if failed
+            Generated PIL Images in seed order, or None if failed
         """
         try:
-            # Load pipeline if not loaded
+            # Load pipeline if not loaded; waits on an in-flight preload of
+            # the same model rather than loading twice
             if not self._load_pipeline(model_name):
                 return None
             
             pipeline = self.pipelines[model_name]
             
-            # Set generator for reproducibility
-            generator = torch.Generator(device=self.device).manual_seed(seed)
+            num_inference_steps = min(num_inference_steps, self.max_inference_steps)
+            if self.scheduler == 'lcm':
+                guidance_scale = min(guidance_scale, LCM_MAX_GUIDANCE)
             
-            # Generate image
-            with torch.autocast(self.device):
-                result = pipeline(
-                    prompt=prompt,
-                    negative_prompt=negative_prompt,
-                    image=input_image,
-                    strength=strength,
-                    guidance_scale=guidance_scale,
-                    num_inference_steps=num_inference_steps,
-                    generator=generator,
-                    return_dict=True
-                )
+            # Set generators for reproducibility
+            generators = [torch.Generator(device=self.device).manual_seed(seed) for seed in seeds]
             
-            return result.images[0]
+            prompt_embeds, negative_prompt_embeds = self._prompt_embeds(
+                model_name, pipeline, prompt, negative_prompt
+            )
+            
+            image = input_image
+            if encoded is not None:
+                image = self._image_latents(pipeline, input_image, encoded, generators)
+            
+            # Generate images; the pipeline already runs in self.torch_dtype, so
+            # no autocast (which would only insert redundant casts)
+            result = pipeline(
+                prompt_embeds=prompt_embeds,
+                negative_prompt_embeds=negative_prompt_embeds,
+                image=image,
+                strength=strength,
+                guidance_scale=guidance_scale,
+                num_inference_steps=num_inference_steps,
+                num_images_per_prompt=len(seeds),
+                generator=generators,
+                return_dict=True
+            )
+            
+            return result.images
             
         except Exception as e:
-            self.logger.error(f"Generation failed with local model {model_name}: {e}")
+            self.logger.error("Generation failed with local model %s: %s", model_name, e)
             return None
     
-    async def _generate_single_variation(
-        self,
-        request: GenerationRequest,
-        seed: int,
-        variation_index: int
-    ) -> Optional[str]:
+    def _prompt_embeds(self, model_name: str, pipeline: Any, prompt: str, negative_prompt: str) -> Tuple[Any, Any]:
         """
-        Generate a single design variation using local models.
+        Encode the prompts through the text encoder, or reuse cached embeddings.
         
         Args:
-            request: Generation request
-            seed: Random seed for reproducibility
-            variation_index: Index of this variation
+            model_name: Model identifier (embeddings are model specific)
+            pipeline: Loaded img2img pipeline
+            prompt: Positive prompt
+            negative_prompt: Negative prompt
             
         Returns:
-            Generated image URL or None if failed
+            (prompt_embeds, negative_prompt_embeds) for a single image
         """
-        try:
-            # Build optimized prompt for interior design
-            style_params = StyleParameters(
-                room_type=request.room_type,
-                furniture_style=request.furniture_style,
-                wall_color=request.wall_color,
-                flooring_material=request.flooring_material
+        key = (model_name, prompt, negative_prompt)
+        embeds = self._embed_cache.get(key)
+        if embeds is not None:
+            self._embed_cache.move_to_end(key)
+            return embeds
+        
+        with torch.no_grad():
+            embeds = pipeline.encode_prompt(
+                prompt,
+                device=self.device,
+                num_images_per_prompt=1,
+                do_classifier_free_guidance=True,
+                negative_prompt=negative_prompt
             )
+        self._embed_cache[key] = embeds
+        while len(self._embed_cache) > EMBED_CACHE_MAXSIZE:
+            self._embed_cache.popitem(last=False)
+        return embeds
+    
+    def _image_latents(self, pipeline: Any, input_image: Image.Image, encoded: Dict[Any, Any],
+                       generators: List[Any]) -> Any:
+        """
+        VAE-encode the input image once and reuse it across pipelines.
+        
+        The preprocessed pixel tensor is moved to the device once and cached
+        under 'pixels'. Latent distributions are cached per (scaling_factor,
+        latent_channels): the SD1.5 fallbacks share a VAE and so reuse one
+        encoding, while the SDXL VAE gets its own. Each seed then samples
+        from the distribution with its own generator, drawing the same noise
+        the pipeline's own encode would, so outputs are unchanged. The
+        pipeline skips its own preprocessing and VAE encode when given latents.
+        
+        Args:
+            pipeline: Loaded img2img pipeline
+            input_image: Prepared 512x512 input image
+            encoded: Per-request cache, filled in place
+            generators: Seeded generator per output image
             
-            positive_prompt = self.prompt_builder.build_positive_prompt(style_params)
-            negative_prompt = self.prompt_builder.build_negative_prompt()
+        Returns:
+            Scaled image latents for this pipeline's VAE, one per generator
+        """
+        vae = pipeline.vae
+        key = (vae.config.scaling_factor, vae.config.latent_channels)
+        latent_dist = encoded.get(key)
+        if latent_dist is None:
+            pixels = encoded.get('pixels')
+            if pixels is None:
+                pixels = pipeline.image_processor.preprocess(input_image).to(self.device)
+                encoded['pixels'] = pixels
+            with torch.no_grad():
+                latent_dist = vae.encode(pixels.to(dtype=vae.dtype)).latent_dist
+            encoded[key] = latent_dist
+        latents = torch.cat([latent_dist.sample(generator=generator) for generator in generators])
+        return latents * vae.config.scaling_factor
+    
+    def _publish_image(self, image: Image.Image) -> str:
+        """
+        Encode a generated image and return the URL handed to the client.
+        
+        Blocking; run via asyncio.to_thread.
+        
+        Args:
+            image: Generated PIL Image
             
-            # Convert bytes to PIL Image
-            input_image = Image.open(io.BytesIO(request.primary_image))
+        Returns:
+            Storage URL when upload_outputs is set and the upload succeeds,
+            otherwise a base64 WebP data URL
+        """
+        data = _encode_webp(image)
+        
+        if self.upload_outputs:
+            try:
+                return get_storage_service().upload_image(
+                    file_content=data,
+                    content_type="image/webp",
+                    folder="generated/designs"
+                )
+            except Exception as e:
+                self.logger.warning("Failed to upload generated image, returning it inline: %s", e)
+        
+        image_base64 = base64.b64encode(data).decode('ascii')
+        return f"data:image/webp;base64,{image_base64}"
+    
+    async def _prepare_inputs(self, request: GenerationRequest) -> Tuple[str, str, Image.Image]:
+        """
+        Build the prompts and the 512x512 input image shared by all variations.
+        
+        Decoding and resizing run in a worker thread so they do not block
+        the event loop.
+        
+        Args:
+            request: Generation request
             
-            # Resize if necessary
-            if input_image.size != (512, 512):
-                input_image = input_image.resize((512, 512), Image.Resampling.LANCZOS)
+        Returns:
+            (positive_prompt, negative_prompt, input_image)
+        """
+        # Build optimized prompt for interior design
+        style_params = StyleParameters(
+            room_type=request.room_type,
+            furniture_style=request.furniture_style,
+            wall_color=request.wall_color,
+            flooring_material=request.flooring_material
+        )
+        
+        positive_prompt = self.prompt_builder.build_positive_prompt(style_params)
+        negative_prompt = self.prompt_builder.build_negative_prompt()
+        
+        input_image = await asyncio.to_thread(_decode_and_resize, request.primary_image)
+        
+        return positive_prompt, negative_prompt, input_image
+    
+    def _generate_single_variation_sync(
+        self,
+        request: GenerationRequest,
+        seed: int,
+        positive_prompt: str,
+        negative_prompt: str,
+        input_image: Image.Image,
+        encoded: Dict[Any, Any]
+    ) -> Optional[Image.Image]:
+        """
+        Generate one variation on the fallback models, in order.
+        
+        Called after the batched call on the primary model failed, so the
+        primary is not retried. Blocking; runs on the GPU executor.
+        
+        Args:
+            request: Generation request
+            seed: Random seed for reproducibility
+            positive_prompt: Positive prompt
+            negative_prompt: Negative prompt
+            input_image: Prepared 512x512 input image
+            encoded: Per-request cache of the encoded input image
             
-            # Try primary model first
-            generated_image = self._generate_with_local_model(
-                model_name=self.primary_model,
+        Returns:
+            Generated PIL Image or None if every model failed
+        """
+        for model_name in FALLBACK_MODELS:
+            if model_name == self.primary_model:
+                continue
+            self.logger.info("Primary model failed, trying %s", model_name)
+            images = self._generate_with_local_model(
+                model_name=model_name,
                 prompt=positive_prompt,
                 negative_prompt=negative_prompt,
                 input_image=input_image,
-                seed=seed,
+                seeds=[seed],
                 strength=request.image_strength,
                 guidance_scale=request.guidance_scale,
-                num_inference_steps=request.num_inference_steps
+                num_inference_steps=request.num_inference_steps,
+                encoded=encoded
             )
+            if images:
+                return images[0]
+        return None
+    
+    async def _generate_single_variation(
+        self,
+        request: GenerationRequest,
+        seed: int,
+        variation_index: int,
+        positive_prompt: str,
+        negative_prompt: str,
+        input_image: Image.Image,
+        encoded: Dict[Any, Any]
+    ) -> Optional[str]:
+        """
+        Generate a single design variation using local models.
+        
+        Used when the batched generation on the primary model fails; tries
+        the fallback models for one seed.
+        
+        Args:
+            request: Generation request
+            seed: Random seed for reproducibility
+            variation_index: Index of this variation
+            positive_prompt: Positive prompt
+            negative_prompt: Negative prompt
+            input_image: Prepared 512x512 input image
+            encoded: Per-request cache of the encoded input image
             
-            if not generated_image:
-                # Try fallback models
-                for fallback_model in ['interiordesign_lulu', 'interior_design_v1']:
-                    self.logger.info(f"Primary model failed, trying {fallback_model}")
-                    generated_image = self._generate_with_local_model(
-                        model_name=fallback_model,
-                        prompt=positive_prompt,
-                        negative_prompt=negative_prompt,
-                        input_image=input_image,
-                        seed=seed,
-                        strength=request.image_strength,
-                        guidance_scale=request.guidance_scale,
-                        num_inference_steps=request.num_inference_steps
-                    )
-                    if generated_image:
-                        break
+        Returns:
+            Generated image URL or None if failed
+        """
+        try:
+            generated_image = await asyncio.get_running_loop().run_in_executor(
+                self._gpu_executor, self._generate_single_variation_sync,
+                request, seed, positive_prompt, negative_prompt, input_image, encoded
+            )
             
             if generated_image:
-                # Convert to base64 for return
-                buffer = io.BytesIO()
-                generated_image.save(buffer, format='PNG')
-                image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                
-                self.logger.info(f"✅ Successfully generated variation {variation_index + 1} with LOCAL model")
-                return f"data:image/png;base64,{image_base64}"
+                self.logger.info("✅ Successfully generated variation %d with LOCAL model", variation_index + 1)
+                return await asyncio.to_thread(self._publish_image, generated_image)
             else:
-                self.logger.error(f"❌ Failed to generate variation {variation_index + 1}")
+                self.logger.error("❌ Failed to generate variation %d", variation_index + 1)
                 return None
                 
         except Exception as e:
-            self.logger.error(f"Failed to generate variation {variation_index + 1}: {e}")
+            self.logger.error("Failed to generate variation %d: %s", variation_index + 1, e)
             return None
     
     async def generate_img2img(self, request: GenerationRequest) -> GenerationResult:
@@ -508,19 +1113,49 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
             
             # Prepare seeds
             if request.seeds is None:
-                seeds = self.prepare_seeds(3)
+                seeds = self.prepare_seeds(NUM_VARIATIONS)
             else:
-                seeds = request.seeds[:3]
+                seeds = request.seeds[:NUM_VARIATIONS]
+            
+            positive_prompt, negative_prompt, input_image = await self._prepare_inputs(request)
+            # Input image encodings, reused by every model tried for this request
+            encoded: Dict[Any, Any] = {}
+            
+            # Generate all variations in one batched call on the primary
+            # model, on the GPU thread so the event loop stays responsive
+            batch = await asyncio.get_running_loop().run_in_executor(
+                self._gpu_executor,
+                functools.partial(
+                    self._generate_with_local_model,
+                    model_name=self.primary_model,
+                    prompt=positive_prompt,
+                    negative_prompt=negative_prompt,
+                    input_image=input_image,
+                    seeds=seeds,
+                    strength=request.image_strength,
+                    guidance_scale=request.guidance_scale,
+                    num_inference_steps=request.num_inference_steps,
+                    encoded=encoded
+                )
+            )
             
-            # Generate images
             generated_images = []
-            for i, seed in enumerate(seeds):
-                image_url = await self._generate_single_variation(request, seed, i)
-                if image_url:
-                    generated_images.append(image_url)
-                    self.logger.info(f"Generated variation {i+1}")
-                else:
-                    self.logger.warning(f"Failed to generate variation {i+1}")
+            if batch:
+                generated_images = list(await asyncio.gather(
+                    *(asyncio.to_thread(self._publish_image, image) for image in batch)
+                ))
+                self.logger.info("Generated %d variations in one batch", len(generated_images))
+            else:
+                # Fall back to one variation at a time on the fallback models
+                for i, seed in enumerate(seeds):
+                    image_url = await self._generate_single_variation(
+                        request, seed, i, positive_prompt, negative_prompt, input_image, encoded
+                    )
+                    if image_url:
+                        generated_images.append(image_url)
+                        self.logger.info("Generated variation %d", i + 1)
+                    else:
+                        self.logger.warning("Failed to generate variation %d", i + 1)
             
             # Check if we generated any images
             if not generated_images:
@@ -544,13 +1179,13 @@ class LocalOpenSourceInteriorEngine(BaseEngine):
             )
             
             self.generation_count += 1
-            self.logger.info(f"✅ Successfully generated {len(generated_images)} LOCAL images in {inference_time:.2f}s")
+            self.logger.info("✅ Successfully generated %d LOCAL images in %.2fs", len(generated_images), inference_time)
             self.logger.info("🏠 Used open-source interior design models!")
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Generation failed: {e}")
+            self.logger.error("Generation failed: %s", e)
             return GenerationResult(
                 success=False,
                 error_message=str(e),
@@ -12,9 +12,15 @@ Features:
 - Memory optimization for local deployment
 """
 
+import asyncio
+import functools
+import os
 import time
 import io
-from typing import Dict, List, Optional, Any
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 from PIL import Image
 import numpy as np
@@ -27,12 +33,89 @@ except ImportError:
     TORCH_AVAILABLE = False
     torch = None
 
-from .base_engine import BaseEngine, GenerationRequest, GenerationResult, EngineType
+# Optional libjpeg-turbo bindings for faster CPU JPEG encoding
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+from .base_engine import BaseEngine, GenerationRequest, GenerationResult, EngineType, content_hash
 from .prompt_builder import PromptBuilder, StyleParameters
 from .controlnet_adapter import ControlNetAdapter
+# Imported eagerly on purpose: app.services.storage only depends on the
+# standard library and app.config, so this pulls in no SDK or network client
+from app.services.storage import get_storage_service
 
 logger = logging.getLogger(__name__)
 
+# Encoded prompts kept per engine, keyed by (positive, negative) prompt
+PROMPT_CACHE_MAXSIZE = 64
+
+# Device-resident ControlNet conditioning kept per engine, keyed by
+# (image digest, resolution); each entry is a full-resolution tensor
+CONTROL_CACHE_MAXSIZE = 32
+
+JPEG_QUALITY = 90
+
+# Step cap per scheduler: DPM-Solver++ 2M Karras converges in ~20 steps and
+# LCM-LoRA in 4-8, so larger requested counts only add UNet forwards
+SCHEDULER_STEPS = {
+    'dpmpp_2m_karras': 20,
+    'lcm': 6,
+}
+
+LCM_LORA = 'latent-consistency/lcm-lora-sdxl'
+
+# LCM degrades above low CFG scales
+LCM_MAX_GUIDANCE = 2.0
+
+# torch.compile modes as inductor options: torch.compile takes either a mode
+# or options, and the tuning flags below are passed as options
+COMPILE_MODE_OPTIONS = {
+    'default': {},
+    'reduce-overhead': {'triton.cudagraphs': True},
+    'max-autotune-no-cudagraphs': {'max_autotune': True},
+    'max-autotune': {'max_autotune': True, 'triton.cudagraphs': True},
+}
+
+# Lower 1x1 convs to matmuls and tune kernel configs, as in the diffusers
+# fast-diffusion recipe; passed per compiled module so the process-wide
+# torch._inductor.config is left untouched for other models
+INDUCTOR_OPTIONS = {
+    'conv_1x1_as_mm': True,
+    'coordinate_descent_tuning': True,
+    'epilogue_fusion': False,
+    'coordinate_descent_check_all_directions': True,
+}
+
+
+_PROMPT_BUILDER = PromptBuilder()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_turbojpeg() -> "TurboJPEG":
+    """Load libturbojpeg once."""
+    return TurboJPEG()
+
+
+@functools.lru_cache(maxsize=256)
+def _build_prompts_cached(room_type: str, furniture_style: str, wall_color: str,
+                          flooring_material: str) -> Tuple[str, str]:
+    """
+    Build (and memoize) the positive and negative prompts for a set of request selections.
+    
+    The prompts only depend on these fields, so repeated selections reuse
+    the same strings (and hit the engine's prompt-embedding cache).
+    """
+    style_params = StyleParameters(
+        room_type=room_type,
+        furniture_style=furniture_style,
+        wall_color=wall_color,
+        flooring_material=flooring_material
+    )
+    return _PROMPT_BUILDER.build_positive_prompt(style_params), _PROMPT_BUILDER.build_negative_prompt()
+
 
 class LocalSDXLEngine(BaseEngine):
     """
@@ -84,21 +167,69 @@ class LocalSDXLEngine(BaseEngine):
         self.primary_model = config.get('primary_model', 'interior_scene_xl')
         self.controlnet_model = config.get('controlnet_model', 'lllyasviel/sd-controlnet-canny')
         self.device = config.get('device', 'cuda' if torch.cuda.is_available() else 'cpu')
-        self.torch_dtype = torch.float16 if self.device == 'cuda' else torch.float32
-        self.enable_attention_slicing = config.get('enable_attention_slicing', True)
-        self.enable_cpu_offload = config.get('enable_cpu_offload', self.device == 'cpu')
+        # Pipelines run natively in this dtype (no autocast); on CPUs with
+        # AVX512-BF16, bf16 halves the memory traffic of the fp32 path
+        if self.device == 'cuda':
+            self.torch_dtype = torch.float16
+        elif getattr(torch.cpu, '_is_avx512_bf16_supported', lambda: False)():
+            self.torch_dtype = torch.bfloat16
+        else:
+            self.torch_dtype = torch.float32
+        # Attention slicing serializes heads and slows GPUs with enough VRAM;
+        # _load_models still enables it when free VRAM is short
+        self.enable_attention_slicing = config.get('enable_attention_slicing', False)
+        # Offload is slower; only for GPUs that cannot hold the pipeline (see
+        # _offload_mode)
+        self.enable_cpu_offload = config.get('enable_cpu_offload', False)
+        # Optional Quanto weight-only quantization ("fp8" or "int8") of the
+        # UNet, text encoders and ControlNet; None keeps fp16 weights
+        self.quantize_weights = config.get('quantize_weights')
+        # torch.compile mode for the UNet, ControlNet and VAE decoder (CUDA):
+        # "reduce-overhead" (CUDA graphs), "max-autotune" (also autotunes
+        # kernels, at a much longer first load) or None to run eager
+        self.compile_mode = config.get('compile_mode', 'reduce-overhead')
+        # Opt-in: overlap the ControlNet with the UNet encoder on a second
+        # CUDA stream; runs the models eager instead of compiling them
+        self.parallel_controlnet = config.get('parallel_controlnet', False)
+        # Opt-in: replay the UNet step from CUDA graphs captured per latent
+        # shape instead of compiling
+        self.cuda_graphs = config.get('cuda_graphs', False)
+        # Sampler replacing the checkpoint's; requested steps are capped per
+        # scheduler (see SCHEDULER_STEPS)
+        self.scheduler = config.get('scheduler', 'dpmpp_2m_karras')
+        if self.scheduler not in SCHEDULER_STEPS:
+            raise ValueError(
+                f"Unknown scheduler '{self.scheduler}'. "
+                f"Available: {', '.join(SCHEDULER_STEPS)}"
+            )
+        self.max_inference_steps = SCHEDULER_STEPS[self.scheduler]
         
         # Initialize components
         self.pipeline = None
         self.controlnet = None
-        self.prompt_builder = PromptBuilder()
+        # Set by _load_models when attention slicing is on; QKV fusion would
+        # replace the sliced processors (see optimize_for_performance)
+        self._attention_sliced = False
+        self.prompt_builder = _PROMPT_BUILDER
         self.controlnet_adapter = ControlNetAdapter(config)
+        # LRU of SDXL text-encoder outputs (prompt, negative, pooled,
+        # negative pooled); styles repeat, so most requests skip both encoders
+        self._prompt_cache: "OrderedDict[Tuple[str, str], Tuple[Any, ...]]" = OrderedDict()
+        # LRU of preprocessed Canny conditioning tensors; re-styling the same
+        # room skips edge detection, PNG decode and the host-to-device copy
+        self._control_cache: "OrderedDict[Tuple[bytes, Tuple[int, int]], Any]" = OrderedDict()
+        # Storage uploads run here, overlapping the next batch's generation
+        self._upload_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="local-sdxl-upload")
+        # Cleared if torchvision lacks CUDA JPEG encoding (see _encode_jpeg)
+        self._gpu_jpeg = True
+        # (latent height, latent width, batch) -> (graph, static inputs, static output)
+        self._graph_cache: Dict[Tuple[int, int, int], Tuple[Any, ...]] = {}
         
         # Performance tracking
         self.generation_count = 0
         self.total_inference_time = 0.0
         
-        self.logger.info(f"Initialized LocalSDXLEngine with device: {self.device}")
+        self.logger.info("Initialized LocalSDXLEngine with device: %s", self.device)
     
     def _get_engine_type(self) -> EngineType:
         """Return the engine type."""
@@ -112,7 +243,7 @@ class LocalSDXLEngine(BaseEngine):
             True if models loaded successfully
         """
         try:
-            from diffusers import StableDiffusionXLImg2ImgPipeline, ControlNetModel
+            from diffusers import StableDiffusionXLControlNetImg2ImgPipeline, ControlNetModel
             from diffusers.utils import logging as diffusers_logging
             
             # Suppress diffusers warnings
@@ -121,7 +252,7 @@ class LocalSDXLEngine(BaseEngine):
             self.logger.info("Loading SDXL img2img pipeline...")
             
             # Load ControlNet
-            self.logger.info(f"Loading ControlNet: {self.controlnet_model}")
+            self.logger.info("Loading ControlNet: %s", self.controlnet_model)
             self.controlnet = ControlNetModel.from_pretrained(
                 self.controlnet_model,
                 torch_dtype=self.torch_dtype,
@@ -129,8 +260,8 @@ class LocalSDXLEngine(BaseEngine):
             )
             
             # Load SDXL pipeline
-            self.logger.info(f"Loading SDXL: {self.model_path}")
-            self.pipeline = StableDiffusionXLImg2ImgPipeline.from_pretrained(
+            self.logger.info("Loading SDXL: %s", self.model_path)
+            self.pipeline = StableDiffusionXLControlNetImg2ImgPipeline.from_pretrained(
                 self.model_path,
                 controlnet=self.controlnet,
                 torch_dtype=self.torch_dtype,
@@ -138,37 +269,459 @@ class LocalSDXLEngine(BaseEngine):
                 use_safetensors=True
             )
             
-            # Move to device
-            self.pipeline = self.pipeline.to(self.device)
+            # Before quantization so the LCM-LoRA fuses into full-precision weights
+            self._set_scheduler()
+            
+            if self.quantize_weights:
+                self._quantize_models()
+            
+            # NHWC lets cuDNN pick tensor-core conv kernels (GPU only); set
+            # before placement so offloaded host copies keep the layout
+            if self.device == 'cuda':
+                self.pipeline.unet.to(memory_format=torch.channels_last)
+                self.pipeline.vae.to(memory_format=torch.channels_last)
+                self.controlnet.to(memory_format=torch.channels_last)
+            
+            # Move to device, offloading only as much as free VRAM requires
+            offload = self._offload_mode() if self.enable_cpu_offload else None
+            if offload == 'model':
+                self.pipeline.enable_model_cpu_offload()
+                self.logger.info("Enabled model CPU offloading")
+            elif offload == 'blocks':
+                self._enable_block_offload()
+                self.logger.info("Enabled UNet block offloading with prefetch")
+            else:
+                self.pipeline = self.pipeline.to(self.device)
             
-            # Memory optimizations
-            if self.enable_attention_slicing:
-                self.pipeline.enable_attention_slicing()
+            # Memory optimizations; SDPA (the diffusers default) or xformers
+            # handle attention unless VRAM is short
+            low_vram = False
+            if self.device == 'cuda':
+                free, total = torch.cuda.mem_get_info()
+                low_vram = free / total < 0.25
+            self._attention_sliced = self.enable_attention_slicing or low_vram
+            if self._attention_sliced:
+                self.pipeline.enable_attention_slicing('auto')
                 self.logger.info("Enabled attention slicing")
             
-            if self.enable_cpu_offload:
-                self.pipeline.enable_sequential_cpu_offload()
-                self.logger.info("Enabled CPU offloading")
+            self.optimize_for_performance()
             
-            # Compile for better performance (PyTorch 2.0+)
-            if hasattr(torch, 'compile') and self.device == 'cuda':
-                try:
-                    self.pipeline.unet = torch.compile(self.pipeline.unet, mode="reduce-overhead")
-                    self.logger.info("Compiled UNet for better performance")
-                except Exception as e:
-                    self.logger.warning(f"Failed to compile UNet: {e}")
+            # Compile for better performance (PyTorch 2.0+); after
+            # optimize_for_performance so fused projections enter the graph
+            if self.parallel_controlnet and self.device == 'cuda':
+                self._enable_parallel_controlnet()
+            elif self.cuda_graphs and self.device == 'cuda' and not offload:
+                self._enable_cuda_graphs()
+            elif self.compile_mode and hasattr(torch, 'compile') and self.device == 'cuda' and not offload:
+                self._compile_models()
             
             self.logger.info("Models loaded successfully")
             return True
             
         except ImportError as e:
-            self.logger.error(f"Missing dependencies: {e}")
+            self.logger.error("Missing dependencies: %s", e)
             self.logger.error("Install with: pip install diffusers transformers accelerate")
             return False
         except Exception as e:
-            self.logger.error(f"Failed to load models: {e}")
+            self.logger.error("Failed to load models: %s", e)
             return False
     
+    def _compile_models(self) -> None:
+        """
+        Compile the UNet, ControlNet and VAE decoder, then run one warm-up generation.
+        
+        torch.compile is lazy, so the warm-up surfaces compilation errors
+        (e.g. BackendCompilerFailed) at load time; on failure the eager
+        modules are restored.
+        """
+        eager = (self.pipeline.unet, self.controlnet, self.pipeline.vae.decode)
+        try:
+            options = {**COMPILE_MODE_OPTIONS[self.compile_mode], **INDUCTOR_OPTIONS}
+            self.pipeline.unet = torch.compile(self.pipeline.unet, options=options, fullgraph=True)
+            self.controlnet = torch.compile(self.controlnet, options=options, fullgraph=True)
+            self.pipeline.controlnet = self.controlnet
+            self.pipeline.vae.decode = torch.compile(self.pipeline.vae.decode, options=options, fullgraph=True)
+            
+            start = time.time()
+            blank = Image.new('RGB', (512, 512))
+            with torch.inference_mode():
+                self.pipeline(
+                    prompt="interior design",
+                    image=blank,
+                    control_image=blank,
+                    strength=0.8,
+                    num_inference_steps=4
+                )
+            self.logger.info("Compiled UNet, ControlNet and VAE decoder (%s, warm-up %.1fs)", self.compile_mode, time.time() - start)
+        except Exception as e:
+            self.pipeline.unet, self.controlnet, self.pipeline.vae.decode = eager
+            self.pipeline.controlnet = self.controlnet
+            self.logger.warning("Failed to compile models: %s", e)
+    
+    def _encode_prompts(self, positive_prompt: str, negative_prompt: str) -> Tuple[Any, ...]:
+        """
+        Encode the prompts through both SDXL text encoders, or reuse cached embeddings.
+        
+        Args:
+            positive_prompt: Positive prompt
+            negative_prompt: Negative prompt
+            
+        Returns:
+            (prompt_embeds, negative_prompt_embeds, pooled_prompt_embeds,
+            negative_pooled_prompt_embeds) for a single image
+        """
+        key = (positive_prompt, negative_prompt)
+        embeds = self._prompt_cache.get(key)
+        if embeds is not None:
+            self._prompt_cache.move_to_end(key)
+            return embeds
+        
+        with torch.inference_mode():
+            embeds = self.pipeline.encode_prompt(
+                prompt=positive_prompt,
+                negative_prompt=negative_prompt,
+                device=self.device,
+                do_classifier_free_guidance=True
+            )
+        self._prompt_cache[key] = embeds
+        while len(self._prompt_cache) > PROMPT_CACHE_MAXSIZE:
+            self._prompt_cache.popitem(last=False)
+        return embeds
+    
+    def _encode_jpeg(self, image: Any) -> bytes:
+        """
+        JPEG-encode a generated image tensor (3xHxW, values in [0, 1]).
+        
+        On the GPU, nvJPEG (torchvision.io.encode_jpeg) encodes in place so
+        only the compressed bytes are copied to the host. Otherwise, or if
+        that is unsupported, encodes on the CPU with TurboJPEG when installed
+        and PIL as the last resort.
+        
+        Args:
+            image: Generated image tensor from output_type='pt'
+            
+        Returns:
+            JPEG bytes
+        """
+        pixels = image.clamp(0, 1).mul(255).round().to(torch.uint8)
+        
+        if pixels.is_cuda and self._gpu_jpeg:
+            try:
+                from torchvision.io import encode_jpeg
+                return encode_jpeg(pixels, quality=JPEG_QUALITY).cpu().numpy().tobytes()
+            except Exception as e:
+                # Older torchvision has no CUDA JPEG encoder; stop trying
+                self._gpu_jpeg = False
+                self.logger.warning("GPU JPEG encoding unavailable, encoding on CPU: %s", e)
+        
+        array = pixels.permute(1, 2, 0).contiguous().cpu().numpy()
+        if TURBOJPEG_AVAILABLE:
+            return _get_turbojpeg().encode(array, quality=JPEG_QUALITY, pixel_format=TJPF_RGB)
+        
+        buffer = io.BytesIO()
+        Image.fromarray(array).save(buffer, format='JPEG', quality=JPEG_QUALITY)
+        return buffer.getvalue()
+    
+    def _to_device_tensor(self, processor: Any, image: Image.Image, height: int, width: int) -> Any:
+        """
+        Preprocess an image with a pipeline image processor and move it to the device.
+        
+        On CUDA the host tensor is pinned so the copy is asynchronous, and
+        the result is channels_last to match the models.
+        
+        Args:
+            processor: Pipeline image processor (image or control image)
+            image: Input PIL Image
+            height: Target height
+            width: Target width
+            
+        Returns:
+            Preprocessed image tensor on self.device in self.torch_dtype
+        """
+        tensor = processor.preprocess(image, height=height, width=width)
+        if self.device != 'cuda':
+            return tensor.to(dtype=self.torch_dtype)
+        return tensor.pin_memory().to(
+            self.device, dtype=self.torch_dtype, memory_format=torch.channels_last, non_blocking=True
+        )
+    
+    def _set_scheduler(self) -> None:
+        """
+        Swap the checkpoint scheduler for the configured one.
+        
+        For LCM the LCM-LoRA is loaded and fused into the weights, so
+        sampling pays no per-step LoRA cost.
+        """
+        from diffusers import DPMSolverMultistepScheduler, LCMScheduler
+        
+        if self.scheduler == 'dpmpp_2m_karras':
+            self.pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
+                self.pipeline.scheduler.config,
+                use_karras_sigmas=True,
+                algorithm_type='dpmsolver++'
+            )
+        elif self.scheduler == 'lcm':
+            self.pipeline.scheduler = LCMScheduler.from_config(self.pipeline.scheduler.config)
+            self.pipeline.load_lora_weights(LCM_LORA)
+            self.pipeline.fuse_lora()
+        self.logger.info("Using %s scheduler", self.scheduler)
+    
+    def _control_image(self, image_bytes: bytes, image_hash: bytes, height: int, width: int) -> Any:
+        """
+        Get the ControlNet conditioning tensor for an input image, cached by content.
+        
+        Args:
+            image_bytes: Raw input image
+            image_hash: content_hash of image_bytes
+            height: Target height
+            width: Target width
+            
+        Returns:
+            Preprocessed Canny conditioning tensor on self.device
+        """
+        key = (image_hash, (width, height))
+        tensor = self._control_cache.get(key)
+        if tensor is not None:
+            self._control_cache.move_to_end(key)
+            return tensor
+        
+        # The adapter's process-wide edge cache is keyed on the same digest
+        edges = self.controlnet_adapter.preprocess_for_controlnet(
+            image_bytes,
+            target_resolution=(width, height),
+            image_hash=image_hash
+        )
+        tensor = self._to_device_tensor(
+            self.pipeline.control_image_processor, Image.open(io.BytesIO(edges)), height, width
+        )
+        self._control_cache[key] = tensor
+        while len(self._control_cache) > CONTROL_CACHE_MAXSIZE:
+            self._control_cache.popitem(last=False)
+        return tensor
+    
+    def _enable_parallel_controlnet(self) -> None:
+        """
+        Run the ControlNet on a side CUDA stream, overlapping the UNet encoder.
+        
+        The UNet only consumes the ControlNet residuals after its last down
+        block, so the ControlNet forward is enqueued on its own stream and
+        the default stream waits for it right after that block. Each step
+        then costs roughly max(ControlNet, UNet encoder) instead of the sum.
+        """
+        cn_stream = torch.cuda.Stream()
+        controlnet_forward = self.controlnet.forward
+        
+        def forward(*args, **kwargs):
+            # Latents and embeddings are produced on the default stream
+            cn_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(cn_stream):
+                return controlnet_forward(*args, **kwargs)
+        
+        def wait_for_controlnet(module, inputs, output):
+            torch.cuda.current_stream().wait_stream(cn_stream)
+        
+        self.controlnet.forward = forward
+        self.pipeline.unet.down_blocks[-1].register_forward_hook(wait_for_controlnet)
+        self.logger.info("Running ControlNet on a parallel CUDA stream")
+    
+    def _enable_cuda_graphs(self) -> None:
+        """
+        Replay the UNet step from CUDA graphs captured per (height, width, batch).
+        
+        The first step at a new latent shape captures a graph with static
+        buffers for the latents, timestep, text embeddings, SDXL added
+        conditions and ControlNet residuals; later steps copy their inputs
+        into the buffers and replay it. Calls with any other inputs run the
+        eager UNet.
+        """
+        from diffusers.models.unet_2d_condition import UNet2DConditionOutput
+        
+        eager_forward = self.pipeline.unet.forward
+        pool = torch.cuda.graph_pool_handle()
+        
+        def run(static):
+            sample, timestep, context, text_embeds, time_ids, *residuals = static
+            return eager_forward(
+                sample, timestep, encoder_hidden_states=context,
+                added_cond_kwargs={'text_embeds': text_embeds, 'time_ids': time_ids},
+                down_block_additional_residuals=residuals[:-1],
+                mid_block_additional_residual=residuals[-1],
+                return_dict=False
+            )[0]
+        
+        def capture(inputs):
+            static = [x.clone() for x in inputs]
+            # Warm up on a side stream before capture, as CUDA graphs require
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(stream):
+                for _ in range(3):
+                    run(static)
+            torch.cuda.current_stream().wait_stream(stream)
+            
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph, pool=pool):
+                static_out = run(static)
+            return graph, static, static_out
+        
+        def forward(sample, timestep, encoder_hidden_states, *args, added_cond_kwargs=None,
+                    down_block_additional_residuals=None, mid_block_additional_residual=None,
+                    return_dict=True, **kwargs):
+            if (args or any(value is not None for value in kwargs.values())
+                    or not added_cond_kwargs or set(added_cond_kwargs) != {'text_embeds', 'time_ids'}
+                    or down_block_additional_residuals is None or mid_block_additional_residual is None):
+                return eager_forward(
+                    sample, timestep, encoder_hidden_states, *args,
+                    added_cond_kwargs=added_cond_kwargs,
+                    down_block_additional_residuals=down_block_additional_residuals,
+                    mid_block_additional_residual=mid_block_additional_residual,
+                    return_dict=return_dict, **kwargs
+                )
+            
+            if not torch.is_tensor(timestep):
+                timestep = torch.tensor(timestep, device=sample.device)
+            inputs = [
+                sample, timestep, encoder_hidden_states,
+                added_cond_kwargs['text_embeds'], added_cond_kwargs['time_ids'],
+                *down_block_additional_residuals, mid_block_additional_residual
+            ]
+            
+            key = (sample.shape[2], sample.shape[3], sample.shape[0])
+            entry = self._graph_cache.get(key)
+            if entry is None:
+                entry = self._graph_cache[key] = capture(inputs)
+            graph, static, static_out = entry
+            if len(inputs) != len(static) or any(x.shape != y.shape for x, y in zip(inputs, static)):
+                return eager_forward(
+                    sample, timestep, encoder_hidden_states,
+                    added_cond_kwargs=added_cond_kwargs,
+                    down_block_additional_residuals=down_block_additional_residuals,
+                    mid_block_additional_residual=mid_block_additional_residual,
+                    return_dict=return_dict
+                )
+            
+            for dst, src in zip(static, inputs):
+                dst.copy_(src)
+            graph.replay()
+            out = static_out.clone()
+            return UNet2DConditionOutput(sample=out) if return_dict else (out,)
+        
+        self.pipeline.unet.forward = forward
+        self.logger.info("Replaying the UNet step from CUDA graphs")
+    
+    def _offload_mode(self) -> Optional[str]:
+        """
+        Decide how much of the pipeline to keep off the GPU.
+        
+        Returns:
+            None if the whole pipeline fits in free VRAM, 'model' if the
+            largest component fits (components are swapped in as they run),
+            otherwise 'blocks' (UNet blocks are streamed in one at a time)
+        """
+        if self.device != 'cuda':
+            return None
+        
+        free, _ = torch.cuda.mem_get_info()
+        sizes = [
+            sum(p.numel() * p.element_size() for p in module.parameters())
+            for module in self.pipeline.components.values()
+            if isinstance(module, torch.nn.Module)
+        ]
+        # Leave headroom for activations
+        if free > sum(sizes) * 1.2:
+            return None
+        if free > max(sizes) * 1.2:
+            return 'model'
+        return 'blocks'
+    
+    def _enable_block_offload(self) -> None:
+        """
+        Keep UNet blocks in pinned host memory and prefetch them on a copy stream.
+        
+        Everything except the UNet down/mid/up blocks goes to the GPU. While
+        block N runs, block N+1 is copied on a dedicated stream, overlapping
+        PCIe transfers with compute. Weights are read-only, so evicting a
+        block just points it back at its host copy.
+        """
+        unet = self.pipeline.unet
+        blocks = [*unet.down_blocks, *([unet.mid_block] if unet.mid_block is not None else []), *unet.up_blocks]
+        block_ids = {id(block) for block in blocks}
+        
+        for module in self.pipeline.components.values():
+            if isinstance(module, torch.nn.Module) and module is not unet:
+                module.to(self.device)
+        for child in unet.children():
+            if id(child) not in block_ids:
+                child.to(self.device)
+        
+        host = [[p.data.pin_memory() for p in block.parameters()] for block in blocks]
+        for block, tensors in zip(blocks, host):
+            for p, tensor in zip(block.parameters(), tensors):
+                p.data = tensor
+        
+        copy_stream = torch.cuda.Stream()
+        ready: List[Any] = [None] * len(blocks)  # copy-done events of resident blocks
+        
+        def prefetch(i):
+            if ready[i] is not None:
+                return
+            with torch.cuda.stream(copy_stream):
+                for p, tensor in zip(blocks[i].parameters(), host[i]):
+                    p.data = tensor.to(self.device, non_blocking=True)
+                ready[i] = torch.cuda.Event()
+                ready[i].record(copy_stream)
+        
+        def make_pre_hook(i):
+            def hook(module, inputs):
+                prefetch(i)
+                stream = torch.cuda.current_stream()
+                stream.wait_event(ready[i])
+                # Weights allocated on the copy stream are used here
+                for p in module.parameters():
+                    p.data.record_stream(stream)
+                prefetch((i + 1) % len(blocks))
+            return hook
+        
+        def make_post_hook(i):
+            def hook(module, inputs, output):
+                for p, tensor in zip(module.parameters(), host[i]):
+                    p.data = tensor
+                ready[i] = None
+            return hook
+        
+        for i, block in enumerate(blocks):
+            block.register_forward_pre_hook(make_pre_hook(i))
+            block.register_forward_hook(make_post_hook(i))
+    
+    def _quantize_models(self) -> None:
+        """
+        Apply Quanto weight-only quantization to the UNet, text encoders and ControlNet.
+        
+        The VAE stays in the pipeline dtype, since quantizing it is
+        numerically unstable. Leaves the models unchanged if optimum-quanto
+        is missing or the setting is unknown.
+        """
+        try:
+            from optimum.quanto import quantize, freeze, qfloat8, qint8
+        except ImportError:
+            self.logger.warning("optimum-quanto is not installed; skipping quantization")
+            return
+        
+        weights = {'fp8': qfloat8, 'int8': qint8}.get(self.quantize_weights)
+        if weights is None:
+            self.logger.warning("Unknown quantize_weights %r; skipping quantization", self.quantize_weights)
+            return
+        
+        try:
+            for module in (self.pipeline.unet, self.pipeline.text_encoder,
+                           self.pipeline.text_encoder_2, self.controlnet):
+                if module is not None:
+                    quantize(module, weights=weights)
+                    freeze(module)
+            self.logger.info("Quantized weights to %s", self.quantize_weights)
+        except Exception as e:
+            self.logger.warning("Failed to quantize weights: %s", e)
+    
     async def generate_img2img(self, request: GenerationRequest) -> GenerationResult:
         """
         Generate image-to-image transformations with ControlNet.
@@ -200,17 +753,13 @@ class LocalSDXLEngine(BaseEngine):
                         engine_used=self.engine_type.value
                     )
             
-            # Prepare style parameters
-            style_params = StyleParameters(
-                room_type=request.room_type,
-                furniture_style=request.furniture_style,
-                wall_color=request.wall_color,
-                flooring_material=request.flooring_material
-            )
-            
             # Build prompts
-            positive_prompt = self.prompt_builder.build_positive_prompt(style_params)
-            negative_prompt = self.prompt_builder.build_negative_prompt()
+            positive_prompt, negative_prompt = _build_prompts_cached(
+                request.room_type,
+                request.furniture_style,
+                request.wall_color,
+                request.flooring_material
+            )
             
             # Prepare seeds
             if request.seeds is None:
@@ -221,64 +770,96 @@ class LocalSDXLEngine(BaseEngine):
             # Preprocess images
             primary_image = Image.open(io.BytesIO(request.primary_image))
             
-            # Generate ControlNet conditioning
-            controlnet_image = self.controlnet_adapter.preprocess_for_controlnet(
-                request.primary_image,
-                target_resolution=request.resolution
+            # Convert to device tensors once per request rather than letting
+            # every pipeline call redo PIL -> tensor -> device
+            width, height = request.resolution
+            primary_image = self._to_device_tensor(
+                self.pipeline.image_processor, primary_image, height, width
             )
-            controlnet_image = Image.open(io.BytesIO(controlnet_image))
             
-            # Generate images
+            # ControlNet conditioning depends only on the image and resolution,
+            # so repeat requests for the same room reuse it
+            controlnet_image = self._control_image(
+                request.primary_image, content_hash(request.primary_image), height, width
+            )
+            
+            num_inference_steps = min(request.num_inference_steps, self.max_inference_steps)
+            guidance_scale = request.guidance_scale
+            if self.scheduler == 'lcm':
+                guidance_scale = min(guidance_scale, LCM_MAX_GUIDANCE)
+            
+            # Generate images, batching as many seeds per pipeline call as
+            # GPU memory allows
             generated_images = []
+            (prompt_embeds, negative_prompt_embeds,
+             pooled_prompt_embeds, negative_pooled_prompt_embeds) = self._encode_prompts(positive_prompt, negative_prompt)
             generation_params = {
-                'prompt': positive_prompt,
-                'negative_prompt': negative_prompt,
+                'prompt_embeds': prompt_embeds,
+                'negative_prompt_embeds': negative_prompt_embeds,
+                'pooled_prompt_embeds': pooled_prompt_embeds,
+                'negative_pooled_prompt_embeds': negative_pooled_prompt_embeds,
                 'image': primary_image,
                 'control_image': controlnet_image,
                 'controlnet_conditioning_scale': request.controlnet_weight,
-                'num_inference_steps': request.num_inference_steps,
-                'guidance_scale': request.guidance_scale,
+                'num_inference_steps': num_inference_steps,
+                'guidance_scale': guidance_scale,
                 'strength': request.image_strength,
                 'width': request.resolution[0],
                 'height': request.resolution[1],
-                'generator': None  # Will be set per seed
+                'generator': None,  # Will be set per batch
+                # Keep decoded images as device tensors for GPU JPEG encoding
+                'output_type': 'pt'
             }
+            batch_size = self.get_optimal_batch_size()
             
-            for i, seed in enumerate(seeds):
+            storage_service = get_storage_service()
+            uploads = []  # (variation index, upload future)
+            
+            for start in range(0, len(seeds), batch_size):
+                batch_seeds = seeds[start:start + batch_size]
                 try:
-                    # Set generator for reproducible results
-                    generator = torch.Generator(device=self.device).manual_seed(seed)
-                    generation_params['generator'] = generator
+                    # One generator per seed keeps each variation reproducible
+                    generation_params['generator'] = [
+                        torch.Generator(device=self.device).manual_seed(seed) for seed in batch_seeds
+                    ]
+                    generation_params['num_images_per_prompt'] = len(batch_seeds)
                     
-                    self.logger.info(f"Generating variation {i+1} with seed {seed}")
+                    self.logger.info("Generating variations %d-%d with seeds %s", start + 1, start + len(batch_seeds), batch_seeds)
                     
-                    # Generate image
-                    with torch.autocast(self.device):
+                    # Generate images; weights are already in self.torch_dtype,
+                    # so no autocast, and no autograd bookkeeping
+                    with torch.inference_mode():
                         result = self.pipeline(**generation_params)
-                        generated_image = result.images[0]
-                    
-                    # Convert to bytes
-                    buffer = io.BytesIO()
-                    generated_image.save(buffer, format='JPEG', quality=90)
-                    image_bytes = buffer.getvalue()
                     
-                    # Upload to storage (using existing storage service)
-                    from app.services.storage import get_storage_service
-                    storage_service = get_storage_service()
+                except Exception as e:
+                    self.logger.error("Failed to generate variations %d-%d: %s", start + 1, start + len(batch_seeds), e)
+                    # Continue with other variations
+                    continue
+                
+                for i, generated_image in enumerate(result.images, start=start):
+                    try:
+                        # Convert to bytes
+                        image_bytes = self._encode_jpeg(generated_image)
+                    except Exception as e:
+                        self.logger.error("Failed to encode variation %d: %s", i + 1, e)
+                        continue
                     
-                    image_url = storage_service.upload_image(
+                    # Upload to storage in the background while the next
+                    # batch generates
+                    uploads.append((i, self._upload_pool.submit(
+                        storage_service.upload_image,
                         file_content=image_bytes,
                         content_type="image/jpeg",
                         folder="generated/designs"
-                    )
-                    
+                    )))
+            
+            for i, upload in uploads:
+                try:
+                    image_url = await asyncio.wrap_future(upload)
                     generated_images.append(image_url)
-                    self.logger.info(f"Generated variation {i+1}: {image_url}")
-                    
+                    self.logger.info("Generated variation %d: %s", i + 1, image_url)
                 except Exception as e:
-                    self.logger.error(f"Failed to generate variation {i+1}: {e}")
-                    # Continue with other variations
-                    continue
+                    self.logger.error("Failed to upload variation %d: %s", i + 1, e)
             
             # Update performance metrics
             inference_time = time.time() - start_time
@@ -300,8 +881,9 @@ class LocalSDXLEngine(BaseEngine):
                 generation_params={
                     'controlnet_weight': request.controlnet_weight,
                     'image_strength': request.image_strength,
-                    'num_inference_steps': request.num_inference_steps,
-                    'guidance_scale': request.guidance_scale,
+                    'num_inference_steps': num_inference_steps,
+                    'guidance_scale': guidance_scale,
+                    'scheduler': self.scheduler,
                     'resolution': request.resolution
                 },
                 seeds_used=seeds,
@@ -309,7 +891,7 @@ class LocalSDXLEngine(BaseEngine):
             )
             
         except Exception as e:
-            self.logger.error(f"Generation failed: {e}")
+            self.logger.error("Generation failed: %s", e)
             return GenerationResult(
                 success=False,
                 error_message=str(e),
@@ -336,7 +918,7 @@ class LocalSDXLEngine(BaseEngine):
             return self.pipeline is not None and self.controlnet is not None
             
         except Exception as e:
-            self.logger.error(f"Health check failed: {e}")
+            self.logger.error("Health check failed: %s", e)
             return False
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -351,6 +933,7 @@ class LocalSDXLEngine(BaseEngine):
             'model_path': self.model_path,
             'controlnet_model': self.controlnet_model,
             'device': self.device,
+            'scheduler': self.scheduler,
             'torch_dtype': str(self.torch_dtype),
             'models_loaded': self.pipeline is not None,
             'generation_count': self.generation_count,
@@ -363,15 +946,26 @@ class LocalSDXLEngine(BaseEngine):
                 'cuda_device_count': torch.cuda.device_count(),
                 'cuda_current_device': torch.cuda.current_device(),
                 'cuda_memory_allocated': torch.cuda.memory_allocated(),
-                'cuda_memory_reserved': torch.cuda.memory_reserved()
+                'cuda_memory_reserved': torch.cuda.memory_reserved(),
+                # Set by the deployment (see Dockerfile) before CUDA initialises
+                'cuda_alloc_conf': os.environ.get('PYTORCH_CUDA_ALLOC_CONF')
             })
         else:
             info['cuda_available'] = False
         
         return info
     
-    def unload_models(self):
-        """Unload models to free memory."""
+    def unload_models(self, force: bool = False):
+        """
+        Unload models to free memory.
+        
+        Dropping the references is enough for the caching allocator to reuse
+        the blocks; returning them to the driver is slow and only needed when
+        another process wants the VRAM.
+        
+        Args:
+            force: Also release cached CUDA blocks with torch.cuda.empty_cache()
+        """
         try:
             if self.pipeline is not None:
                 del self.pipeline
@@ -381,13 +975,17 @@ class LocalSDXLEngine(BaseEngine):
                 del self.controlnet
                 self.controlnet = None
             
-            if torch.cuda.is_available():
+            self._prompt_cache.clear()
+            self._control_cache.clear()
+            self._graph_cache.clear()
+            
+            if force and torch.cuda.is_available():
                 torch.cuda.empty_cache()
             
             self.logger.info("Models unloaded from memory")
             
         except Exception as e:
-            self.logger.error(f"Error unloading models: {e}")
+            self.logger.error("Error unloading models: %s", e)
     
     def get_optimal_batch_size(self) -> int:
         """
@@ -425,7 +1023,16 @@ class LocalSDXLEngine(BaseEngine):
                     self.pipeline.enable_xformers_memory_efficient_attention()
                     self.logger.info("Enabled xformers memory efficient attention")
                 except Exception as e:
-                    self.logger.warning(f"Failed to enable xformers: {e}")
+                    self.logger.warning("Failed to enable xformers: %s", e)
+            
+            # Merge each attention block's Q, K and V projections into one
+            # GEMM (quantized weights cannot be concatenated). Fusing swaps in
+            # FusedAttnProcessor2_0 everywhere, which would undo the
+            # low-VRAM attention slicing, so it is skipped when slicing is on
+            if (hasattr(self.pipeline, 'fuse_qkv_projections')
+                    and not self.quantize_weights and not self._attention_sliced):
+                self.pipeline.fuse_qkv_projections()
+                self.logger.info("Fused QKV projections")
             
             # Enable VAE slicing to reduce memory usage
             if hasattr(self.pipeline, 'enable_vae_slicing'):
@@ -438,24 +1045,53 @@ class LocalSDXLEngine(BaseEngine):
                 self.logger.info("Enabled VAE tiling")
             
         except Exception as e:
-            self.logger.warning(f"Performance optimization failed: {e}")
+            self.logger.warning("Performance optimization failed: %s", e)
 
 
 class LocalSDXLEngineFactory:
     """Factory for creating and managing LocalSDXLEngine instances."""
     
-    _instance = None
+    # One loaded engine per distinct config; the lock keeps concurrent first
+    # requests from building (and loading) the same pipeline twice. asyncio
+    # locks belong to one event loop, so there is one lock per running loop
+    _locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+    _instances: Dict[Tuple[Any, ...], LocalSDXLEngine] = {}
+    
+    @staticmethod
+    def _config_key(config: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Build a hashable signature for an engine config."""
+        return tuple(sorted(
+            (key, value if isinstance(value, (str, int, float, bool, tuple, type(None))) else repr(value))
+            for key, value in config.items()
+        ))
     
     @classmethod
-    def get_instance(cls, config: Dict[str, Any]) -> LocalSDXLEngine:
-        """Get singleton engine instance."""
-        if cls._instance is None:
-            cls._instance = LocalSDXLEngine(config)
-        return cls._instance
+    async def get_instance(cls, config: Dict[str, Any]) -> LocalSDXLEngine:
+        """
+        Get the shared engine for a config, loading its models on first use.
+        
+        Args:
+            config: Engine configuration
+            
+        Returns:
+            LocalSDXLEngine with models loaded (or a failed load logged)
+        """
+        key = cls._config_key(config)
+        loop = asyncio.get_running_loop()
+        lock = cls._locks.get(loop)
+        if lock is None:
+            lock = cls._locks[loop] = asyncio.Lock()
+        async with lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = LocalSDXLEngine(config)
+                await instance._load_models()
+                cls._instances[key] = instance
+            return instance
     
     @classmethod
     def reset_instance(cls):
-        """Reset the singleton instance."""
-        if cls._instance is not None:
-            cls._instance.unload_models()
-        cls._instance = None
+        """Unload and drop all cached engine instances."""
+        for instance in cls._instances.values():
+            instance.unload_models(force=True)
+        cls._instances.clear()
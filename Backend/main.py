@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+import sys
+
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import Response, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,10 +20,26 @@ engine = db_manager.engine
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the pooled HTTP clients shared by AI engine instances on shutdown."""
+    yield
+    # The clients are kept per event loop, so this closes the serving loop's.
+    # Engines are imported lazily by EngineFactory; only close what was loaded
+    interior_engine = sys.modules.get("app.services.ai_engine.interior_design_specific_engine")
+    if interior_engine is not None:
+        await interior_engine.close_http_session()
+    hf_engine = sys.modules.get("app.services.ai_engine.hf_img2img_engine")
+    if hf_engine is not None:
+        await hf_engine.close_http_client()
+
+
 app = FastAPI(
     title="AntarAalay AI API",
     description="AI-powered interior design and Vastu consultation API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Simple health check endpoint
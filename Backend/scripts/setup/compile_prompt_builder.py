@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compile the intent prompt builder to a C extension with mypyc.
+
+The builder is pure Python string/dict work, so compiling it removes most
+of the interpreter overhead. The compiled .so sits next to the .py and is
+picked up by the normal import; delete it to go back to pure Python.
+
+mypyc ships with mypy, which is pinned with the development tools in
+requirements-ai.txt.
+"""
+
+import importlib.machinery
+import importlib.util
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+MODULE = "app/services/ai_engine/intent_prompt_builder.py"
+
+
+def check_mypyc():
+    """Check that mypyc is available."""
+    if importlib.util.find_spec("mypyc") is None:
+        print("❌ mypyc not found; install the development tools from requirements-ai.txt")
+        return False
+    return True
+
+
+def is_extension(path):
+    """Whether path is a compiled extension module for this interpreter."""
+    return str(path).endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES))
+
+
+def compile_module():
+    """Compile the prompt builder in place."""
+    print(f"\n⚙️  Compiling {MODULE}...")
+
+    # app/ is a namespace package, so have mypyc name the module relative to
+    # the Backend directory rather than from __init__.py files
+    try:
+        subprocess.check_call(
+            [sys.executable, "-m", "mypyc", "--explicit-package-bases",
+             "--follow-imports=skip", "--ignore-missing-imports", MODULE],
+            cwd=BACKEND_DIR
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Compilation failed: {e}")
+        return False
+    finally:
+        shutil.rmtree(BACKEND_DIR / "build", ignore_errors=True)
+
+    print("✅ Compiled extension written next to the module")
+    return True
+
+
+def test_compiled():
+    """Check that the compiled module is the one imported."""
+    print("\n🧪 Testing compiled module...")
+
+    try:
+        sys.path.insert(0, str(BACKEND_DIR))
+        from app.services.ai_engine import intent_prompt_builder
+
+        if not is_extension(intent_prompt_builder.__file__):
+            print(f"❌ Pure Python module imported: {intent_prompt_builder.__file__}")
+            return False
+
+        print(f"✅ Imported {intent_prompt_builder.__file__}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Import test failed: {e}")
+        return False
+
+
+def main():
+    """Main compile function."""
+    print("⚡ PROMPT BUILDER MYPYC COMPILE")
+    print("=" * 60)
+
+    if not check_mypyc():
+        return
+
+    if not compile_module():
+        return
+
+    test_compiled()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ import pytest
 import asyncio
 import io
 import base64
+import json
 from unittest.mock import Mock, patch, AsyncMock
 from PIL import Image
 import numpy as np
@@ -201,7 +202,27 @@ class TestControlNetAdapter:
         # Verify it's a valid PNG
         edge_image = Image.open(io.BytesIO(edge_bytes))
         assert edge_image.mode == 'L'  # Grayscale
-    
+
+    def test_controlnet_preprocessing_cached(self):
+        """Test repeat preprocessing of the same image hits the edge cache."""
+        image_bytes = self.create_test_image(640, 480, color='gray')
+
+        first = self.adapter.preprocess_for_controlnet(image_bytes, target_resolution=(512, 512))
+
+        with patch.object(self.adapter, 'detect_edges') as mock_detect:
+            second = self.adapter.preprocess_for_controlnet(image_bytes, target_resolution=(512, 512))
+            mock_detect.assert_not_called()
+
+        assert second == first
+
+    def test_resolution_normalization_noop_at_target_size(self):
+        """Test images already at the target size are returned unchanged."""
+        processed = self.adapter.preprocess_image(self.create_test_image(512, 512))
+
+        normalized = self.adapter.normalize_resolution(processed, (512, 512))
+
+        assert normalized is processed
+
     def test_edge_map_validation(self):
         """Test edge map validation."""
         image_bytes = self.create_test_image()
@@ -446,6 +467,550 @@ class TestIntegration:
                     assert result['status'] == 'completed'
 
 
+def make_request(**overrides):
+    """Build a valid generation request for engine tests."""
+    params = dict(
+        primary_image=b'fake_image_data',
+        room_images={'north': b'fake_image_data'},
+        room_type='living',
+        furniture_style='modern',
+        wall_color='white',
+        flooring_material='hardwood'
+    )
+    params.update(overrides)
+    return GenerationRequest(**params)
+
+
+def mock_prompt_builder():
+    """Prompt builder stub returning fixed prompts."""
+    return Mock(
+        build_positive_prompt=Mock(return_value='positive prompt'),
+        build_negative_prompt=Mock(return_value='negative prompt')
+    )
+
+
+class TestHFRejectionCache:
+    """Test cases for the HF engine's negative cache of rejected requests."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from app.services.ai_engine import hf_img2img_engine
+        self.hf = hf_img2img_engine
+        self.hf._rejections.clear()
+
+        self.engine = hf_img2img_engine.HFEngine({'hf_api_key': 'test-key'})
+        self.engine.prompt_builder = mock_prompt_builder()
+        self.engine.controlnet_adapter = Mock(
+            preprocess_for_controlnet=Mock(return_value=b'edges')
+        )
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.hf._rejections.clear()
+
+    @pytest.mark.asyncio
+    async def test_failed_request_records_one_rejection(self):
+        """Test a request whose seeds all fail records a single rejection."""
+        error = self.hf.HFAPIError(400, 'bad request')
+
+        with patch.object(self.engine, '_generate_variation', AsyncMock(side_effect=error)):
+            result = await self.engine.generate_img2img(make_request(seeds=[1, 2, 3]))
+
+        assert result.success is False
+        assert len(self.hf._rejections) == 1
+        assert len(next(iter(self.hf._rejections.values()))) == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_rejections_short_circuit(self):
+        """Test requests are refused without calling HF after the threshold."""
+        error = self.hf.HFAPIError(422, 'unprocessable')
+        mock_variation = AsyncMock(side_effect=error)
+
+        with patch.object(self.engine, '_generate_variation', mock_variation):
+            for _ in range(self.hf.REJECTION_THRESHOLD):
+                await self.engine.generate_img2img(make_request(seeds=[1, 2, 3]))
+            calls_before = mock_variation.await_count
+
+            result = await self.engine.generate_img2img(make_request(seeds=[1, 2, 3]))
+
+        assert result.success is False
+        assert 'repeatedly rejected' in result.error_message
+        assert mock_variation.await_count == calls_before
+
+    @pytest.mark.asyncio
+    async def test_retryable_errors_not_recorded(self):
+        """Test rate limiting and server errors never count as rejections."""
+        for status in (429, 503):
+            error = self.hf.HFAPIError(status, 'try again')
+            with patch.object(self.engine, '_generate_variation', AsyncMock(side_effect=error)):
+                await self.engine.generate_img2img(make_request(seeds=[1, 2, 3]))
+
+        assert len(self.hf._rejections) == 0
+
+
+class TestHFHTTPClient:
+    """Test cases for the HF engine's shared HTTP/2 client."""
+
+    def test_client_kept_per_event_loop(self):
+        """Test each event loop gets its own client, reused within the loop."""
+        from app.services.ai_engine import hf_img2img_engine as hf
+
+        async def get_clients():
+            client = hf._get_http_client()
+            assert hf._get_http_client() is client
+            return client
+
+        first = asyncio.run(get_clients())
+        second = asyncio.run(get_clients())
+
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_requests_pass_engine_timeout(self):
+        """Test the engine's timeout is applied per request."""
+        from app.services.ai_engine import hf_img2img_engine as hf
+        engine = hf.HFEngine({'hf_api_key': 'test-key', 'timeout_seconds': 12})
+        client = Mock(post=AsyncMock(return_value=Mock(status_code=200, content=b'{}')))
+
+        with patch.object(hf, '_get_http_client', return_value=client):
+            await engine._call_inference_api({'prompt': 'room'})
+
+        assert client.post.await_args.kwargs['timeout'] == 12
+
+
+class TestHuggingFaceStreaming:
+    """Test cases for streaming FLUX variations."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from app.services.ai_engine import huggingface_engine
+        self.hf = huggingface_engine
+        self.hf._img_cache.clear()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.hf._img_cache.clear()
+
+    def make_engine(self, text_to_image, **config):
+        """Create an engine whose async client is replaced by a stub."""
+        engine = self.hf.HuggingFaceEngine({'hf_token': 'test-token', **config})
+        engine.aclient = Mock(text_to_image=AsyncMock(side_effect=text_to_image))
+        return engine
+
+    async def collect(self, engine):
+        """Drain the variation stream into a list."""
+        return [item async for item in engine.generate_img2img_stream(make_request())]
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_each_variation(self):
+        """Test every variation is streamed as a base64 JPEG."""
+        async def text_to_image(prompt, **kwargs):
+            return Image.new('RGB', (8, 8), color='white')
+
+        engine = self.make_engine(text_to_image)
+        items = await asyncio.wait_for(self.collect(engine), timeout=5)
+
+        assert sorted(index for index, _, _ in items) == [0, 1, 2]
+        for _, mime_type, payload in items:
+            assert mime_type == 'image/jpeg'
+            assert base64.b64decode(payload)[:3] == b'\xff\xd8\xff'
+        seeds = sorted(call.kwargs['seed'] for call in engine.aclient.text_to_image.await_args_list)
+        assert seeds == [self.hf.BASE_SEED, self.hf.BASE_SEED + 1, self.hf.BASE_SEED + 2]
+
+    @pytest.mark.asyncio
+    async def test_stream_stops_at_min_variations(self):
+        """Test the stream ends once min_variations are ready, cancelling the rest."""
+        cancelled = []
+
+        async def text_to_image(prompt, seed, **kwargs):
+            if seed == self.hf.BASE_SEED + 2:
+                try:
+                    await asyncio.sleep(60)
+                except asyncio.CancelledError:
+                    cancelled.append(seed)
+                    raise
+            return Image.new('RGB', (8, 8))
+
+        engine = self.make_engine(text_to_image, min_variations=2)
+        items = await asyncio.wait_for(self.collect(engine), timeout=5)
+        # Let the cancelled straggler observe its cancellation
+        await asyncio.sleep(0.01)
+
+        assert sorted(index for index, _, _ in items) == [0, 1]
+        assert cancelled == [self.hf.BASE_SEED + 2]
+
+    @pytest.mark.asyncio
+    async def test_stream_serves_cached_variations(self):
+        """Test a repeated request is served from the image cache."""
+        async def text_to_image(prompt, **kwargs):
+            return Image.new('RGB', (8, 8))
+
+        engine = self.make_engine(text_to_image)
+        first = await self.collect(engine)
+        engine.aclient.text_to_image.reset_mock()
+        second = await self.collect(engine)
+
+        engine.aclient.text_to_image.assert_not_awaited()
+        assert sorted(second) == sorted(first)
+
+    def test_min_variations_defaults_to_all(self):
+        """Test early exit is opt-in: by default every variation is awaited."""
+        engine = self.make_engine(AsyncMock())
+
+        assert engine.min_variations == self.hf.NUM_VARIATIONS
+
+    @pytest.mark.asyncio
+    async def test_stream_generates_misses_after_partial_cache_hit(self):
+        """Test cached variations do not stop the remaining ones being generated."""
+        async def text_to_image(prompt, **kwargs):
+            return Image.new('RGB', (8, 8))
+
+        engine = self.make_engine(text_to_image, min_variations=2)
+        for i in range(2):
+            prompt = engine._build_prompt(make_request(), i + 1)
+            key = self.hf._image_cache_key(engine.model_name, prompt, self.hf.BASE_SEED + i)
+            self.hf._image_cache_put(key, ('image/jpeg', f'cached-{i}'))
+
+        items = await asyncio.wait_for(self.collect(engine), timeout=5)
+
+        assert sorted(index for index, _, _ in items) == [0, 1, 2]
+        seeds = [call.kwargs['seed'] for call in engine.aclient.text_to_image.await_args_list]
+        assert seeds == [self.hf.BASE_SEED + 2]
+
+    def post_stream(self, client, fake_stream):
+        """POST to /design/generate/stream with the engine stream replaced."""
+        from main import app
+        from app.dependencies import get_current_user
+
+        engine = Mock(aclient=Mock())
+        engine.generate_img2img_stream = fake_stream
+        app.dependency_overrides[get_current_user] = lambda: {'uid': 'test-user'}
+        try:
+            with patch('app.routes.design.EngineFactory.create_engine', return_value=engine), \
+                 patch('app.routes.design.check_rate_limit', return_value=True):
+                response = client.post(
+                    '/api/design/generate/stream',
+                    json={'room_id': 'room-1', 'style': 'Modern'}
+                )
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_stream_route_emits_ndjson(self, client):
+        """Test /design/generate/stream frames each variation as one JSON line."""
+        async def fake_stream(request):
+            yield (1, 'image/jpeg', 'second')
+            yield (0, 'image/jpeg', 'first')
+
+        lines = self.post_stream(client, fake_stream)
+
+        assert lines == [
+            {'index': 1, 'mime': 'image/jpeg', 'image': 'second'},
+            {'index': 0, 'mime': 'image/jpeg', 'image': 'first'},
+        ]
+
+    def test_stream_route_reports_engine_error(self, client):
+        """Test an engine failure mid-stream ends with an error line."""
+        async def fake_stream(request):
+            yield (0, 'image/jpeg', 'first')
+            raise RuntimeError('provider down')
+
+        lines = self.post_stream(client, fake_stream)
+
+        assert lines[0] == {'index': 0, 'mime': 'image/jpeg', 'image': 'first'}
+        assert lines[-1] == {'error': 'Generation failed: provider down'}
+
+    def test_stream_route_reports_empty_result(self, client):
+        """Test a stream that produces no variations ends with an error line."""
+        async def fake_stream(request):
+            return
+            yield
+
+        lines = self.post_stream(client, fake_stream)
+
+        assert lines == [{'error': 'No designs generated'}]
+
+
+class TestInteriorVariationCancellation:
+    """Test cases for cancelling spare interior variation attempts."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from app.services.ai_engine.interior_design_specific_engine import InteriorDesignSpecificEngine
+        self.engine_cls = InteriorDesignSpecificEngine
+        self.engine = InteriorDesignSpecificEngine({'hf_api_key': 'test-key'})
+        self.engine.prompt_builder = mock_prompt_builder()
+
+    def fake_variations(self, failing=(), cancelled=None):
+        """Variation stub: indices 0-2 finish at once (or fail), spares stall."""
+        async def fake_variation(engine, request, seed, variation_index, *args):
+            if variation_index < 3:
+                await asyncio.sleep(0)
+                return None if variation_index in failing else f'image-{variation_index}'
+            if variation_index in failing:
+                return None
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(variation_index)
+                raise
+        return fake_variation
+
+    @pytest.mark.asyncio
+    async def test_spare_attempts_cancelled_once_enough_succeed(self):
+        """Test remaining attempts are cancelled after three variations succeed."""
+        cancelled = []
+
+        with patch.object(self.engine_cls, '_generate_single_variation',
+                          self.fake_variations(cancelled=cancelled)):
+            result = await asyncio.wait_for(
+                self.engine.generate_img2img(make_request(seeds=[1, 2, 3, 4, 5])),
+                timeout=5
+            )
+
+        assert result.success is True
+        assert result.generated_images == ['image-0', 'image-1', 'image-2']
+        assert result.seeds_used == [1, 2, 3]
+        assert sorted(cancelled) == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_spare_attempt_replaces_failed_variation(self):
+        """Test a spare seed fills in for a failed variation."""
+        cancelled = []
+
+        async def fake_variation(engine, request, seed, variation_index, *args):
+            # Variation 1 fails, 3 fills in for it and 4 never finishes
+            try:
+                await asyncio.sleep(0.01 * variation_index if variation_index < 4 else 60)
+            except asyncio.CancelledError:
+                cancelled.append(variation_index)
+                raise
+            return None if variation_index == 1 else f'image-{variation_index}'
+
+        with patch.object(self.engine_cls, '_generate_single_variation', fake_variation):
+            result = await asyncio.wait_for(
+                self.engine.generate_img2img(make_request(seeds=[1, 2, 3, 4, 5])),
+                timeout=5
+            )
+
+        assert result.generated_images == ['image-0', 'image-2', 'image-3']
+        assert result.seeds_used == [1, 3, 4]
+        assert cancelled == [4]
+
+    @pytest.mark.asyncio
+    async def test_all_variations_failing(self):
+        """Test the request fails when no variation succeeds."""
+        with patch.object(self.engine_cls, '_generate_single_variation',
+                          self.fake_variations(failing=(0, 1, 2))):
+            result = await self.engine.generate_img2img(make_request(seeds=[1, 2, 3]))
+
+        assert result.success is False
+        assert 'Failed to generate any images' in result.error_message
+
+
+class TestSDXLControlNetCache:
+    """Test cases for the SDXL engine's ControlNet conditioning cache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from collections import OrderedDict
+        from app.services.ai_engine import local_sdxl_img2img_engine
+        self.sdxl = local_sdxl_img2img_engine
+
+        edges = io.BytesIO()
+        Image.new('L', (8, 8)).save(edges, format='PNG')
+        # Bypass __init__, which needs torch; only the cache path is exercised
+        self.engine = self.sdxl.LocalSDXLEngine.__new__(self.sdxl.LocalSDXLEngine)
+        self.engine._control_cache = OrderedDict()
+        self.engine.pipeline = Mock()
+        self.engine.controlnet_adapter = Mock(
+            preprocess_for_controlnet=Mock(return_value=edges.getvalue())
+        )
+
+    def control_image(self, image_hash, height=1024, width=1024):
+        """Fetch conditioning with tensor creation stubbed out."""
+        with patch.object(self.sdxl.LocalSDXLEngine, '_to_device_tensor',
+                          side_effect=lambda *args: object()):
+            return self.engine._control_image(b'image', image_hash, height, width)
+
+    def test_same_image_and_resolution_hits_cache(self):
+        """Test a repeated image digest and resolution reuses the tensor."""
+        first = self.control_image(b'digest-a')
+        second = self.control_image(b'digest-a')
+
+        assert first is second
+        self.engine.controlnet_adapter.preprocess_for_controlnet.assert_called_once_with(
+            b'image', target_resolution=(1024, 1024), image_hash=b'digest-a'
+        )
+
+    def test_key_includes_digest_and_resolution(self):
+        """Test a different digest or resolution builds a new tensor."""
+        base = self.control_image(b'digest-a')
+        other_image = self.control_image(b'digest-b')
+        other_size = self.control_image(b'digest-a', height=768)
+
+        assert len({id(base), id(other_image), id(other_size)}) == 3
+        assert list(self.engine._control_cache) == [
+            (b'digest-a', (1024, 1024)),
+            (b'digest-b', (1024, 1024)),
+            (b'digest-a', (1024, 768)),
+        ]
+
+    def test_cache_is_bounded(self):
+        """Test the least recently used entry is evicted past the size limit."""
+        for i in range(self.sdxl.CONTROL_CACHE_MAXSIZE + 1):
+            self.control_image(b'digest-%d' % i)
+
+        assert len(self.engine._control_cache) == self.sdxl.CONTROL_CACHE_MAXSIZE
+        assert (b'digest-0', (1024, 1024)) not in self.engine._control_cache
+
+
+class TestSDXLSchedulerSelection:
+    """Test cases for the SDXL engine's scheduler selection."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        import logging
+        from app.services.ai_engine import local_sdxl_img2img_engine
+        self.sdxl = local_sdxl_img2img_engine
+
+        # Bypass __init__, which needs torch; diffusers is stubbed per test
+        self.engine = self.sdxl.LocalSDXLEngine.__new__(self.sdxl.LocalSDXLEngine)
+        self.engine.logger = logging.getLogger(__name__)
+        self.engine.pipeline = Mock()
+        self.diffusers = Mock()
+
+    def set_scheduler(self, name):
+        """Run _set_scheduler for a scheduler name; returns the original config."""
+        config = self.engine.pipeline.scheduler.config
+        self.engine.scheduler = name
+        with patch.dict(sys.modules, {'diffusers': self.diffusers}):
+            self.engine._set_scheduler()
+        return config
+
+    def test_dpmpp_2m_karras_uses_deterministic_solver(self):
+        """Test DPM++ 2M Karras is the ODE solver, so seeds reproduce."""
+        config = self.set_scheduler('dpmpp_2m_karras')
+
+        self.diffusers.DPMSolverMultistepScheduler.from_config.assert_called_once_with(
+            config, use_karras_sigmas=True, algorithm_type='dpmsolver++'
+        )
+        assert self.engine.pipeline.scheduler is \
+            self.diffusers.DPMSolverMultistepScheduler.from_config.return_value
+
+    def test_lcm_fuses_lora(self):
+        """Test LCM swaps the scheduler and fuses the LCM-LoRA."""
+        pipeline = self.engine.pipeline
+        config = self.set_scheduler('lcm')
+
+        self.diffusers.LCMScheduler.from_config.assert_called_once_with(config)
+        pipeline.load_lora_weights.assert_called_once_with(self.sdxl.LCM_LORA)
+        pipeline.fuse_lora.assert_called_once_with()
+
+    def test_unknown_scheduler_keeps_checkpoint_scheduler(self):
+        """Test an unrecognised name leaves the checkpoint's scheduler in place."""
+        scheduler = self.engine.pipeline.scheduler
+        self.set_scheduler('ddim')
+
+        assert self.engine.pipeline.scheduler is scheduler
+        self.diffusers.DPMSolverMultistepScheduler.from_config.assert_not_called()
+        self.diffusers.LCMScheduler.from_config.assert_not_called()
+
+
+class TestLocalSDXLEngineFactory:
+    """Test cases for the config-keyed LocalSDXLEngine factory."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from app.services.ai_engine.local_sdxl_img2img_engine import LocalSDXLEngineFactory
+        self.factory = LocalSDXLEngineFactory
+        self.factory._instances.clear()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.factory._instances.clear()
+
+    @staticmethod
+    def make_engine(config):
+        """Engine stub whose model load yields to the event loop."""
+        async def load_models():
+            await asyncio.sleep(0.01)
+            return True
+        return Mock(_load_models=AsyncMock(side_effect=load_models))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_share_one_engine(self):
+        """Test simultaneous first requests build and load a single engine."""
+        config = {'device': 'cpu', 'max_resolution': (1024, 1024)}
+
+        with patch('app.services.ai_engine.local_sdxl_img2img_engine.LocalSDXLEngine',
+                   side_effect=self.make_engine) as mock_engine:
+            first, second = await asyncio.gather(
+                self.factory.get_instance(config),
+                self.factory.get_instance(dict(config))
+            )
+
+        assert first is second
+        mock_engine.assert_called_once_with(config)
+        first._load_models.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_distinct_configs_get_distinct_engines(self):
+        """Test engines are keyed on the whole config, including unhashable values."""
+        with patch('app.services.ai_engine.local_sdxl_img2img_engine.LocalSDXLEngine',
+                   side_effect=self.make_engine):
+            default = await self.factory.get_instance({'device': 'cpu'})
+            lcm = await self.factory.get_instance({'device': 'cpu', 'scheduler': 'lcm'})
+            listed = await self.factory.get_instance({'device': 'cpu', 'seeds': [1, 2]})
+            again = await self.factory.get_instance({'seeds': [1, 2], 'device': 'cpu'})
+
+        assert default is not lcm
+        assert listed is again
+        assert len(self.factory._instances) == 3
+
+    @pytest.mark.asyncio
+    async def test_reset_instance_unloads_all(self):
+        """Test reset unloads every cached engine and releases CUDA memory."""
+        with patch('app.services.ai_engine.local_sdxl_img2img_engine.LocalSDXLEngine',
+                   side_effect=self.make_engine):
+            engines = [
+                await self.factory.get_instance({'device': 'cpu'}),
+                await self.factory.get_instance({'device': 'cuda'})
+            ]
+
+        self.factory.reset_instance()
+
+        for engine in engines:
+            engine.unload_models.assert_called_once_with(force=True)
+        assert self.factory._instances == {}
+
+
+class TestCompilePromptBuilderScript:
+    """Test cases for the mypyc compile script's module check."""
+
+    def setup_method(self):
+        """Load the script as a module."""
+        import importlib.util
+        path = backend_dir / 'scripts' / 'setup' / 'compile_prompt_builder.py'
+        spec = importlib.util.spec_from_file_location('compile_prompt_builder', path)
+        self.script = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.script)
+
+    def test_is_extension_accepts_extension_suffixes(self):
+        """Test every extension suffix this interpreter imports is accepted."""
+        import importlib.machinery
+        for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+            assert self.script.is_extension(f'/app/intent_prompt_builder{suffix}')
+
+    def test_is_extension_rejects_source(self):
+        """Test a pure Python module is not reported as compiled."""
+        assert not self.script.is_extension('/app/intent_prompt_builder.py')
+        assert not self.script.is_extension('/app/intent_prompt_builder.pyc')
+
+
 # Mock fixtures for external API testing
 @pytest.fixture
 def mock_replicate_response():